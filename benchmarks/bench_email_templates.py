@@ -0,0 +1,53 @@
+"""Benchmark the async updates email renderer.
+
+Usage: python -m benchmarks.bench_email_templates [--updates 500] [--runs 200]
+"""
+import argparse
+import random
+import statistics
+import string
+import time
+from src.core.email_templates import render_updates_email
+
+
+def make_updates(count, seed=0):
+    """Synthetic tracker updates with realistic lengths and some HTML-sensitive characters"""
+    rng = random.Random(seed)
+    words = ['fixed', 'deployed', 'reviewed', 'PR', '#123', 'bug', 'api', '<script>', 'a&b', 'tests', 'infra']
+    updates = {}
+    for member_id in range(count):
+        yesterday = ' '.join(rng.choice(words) for _ in range(rng.randint(5, 25)))
+        today = ' '.join(rng.choice(words) for _ in range(rng.randint(5, 25)))
+        updates[member_id] = {
+            'name': ''.join(rng.choice(string.ascii_letters) for _ in range(8)),
+            'time': f"{rng.randint(8, 10):02d}:{rng.randint(0, 59):02d}",
+            'message': f"Yesterday: {yesterday}\nToday: {today}"
+        }
+    return updates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--updates', type=int, default=500)
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    updates = make_updates(args.updates)
+    date_str = "Monday, October 19, 2026"
+    render_updates_email(date_str, updates)  # warm up
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        html, text = render_updates_email(date_str, updates)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(f"Rendered {args.updates} updates x {args.runs} runs "
+          f"(html {len(html) / 1024:.0f} KiB, text {len(text) / 1024:.0f} KiB)")
+    print(f"  mean {statistics.mean(timings):.3f} ms | p50 {timings[len(timings) // 2]:.3f} ms | "
+          f"p95 {timings[int(len(timings) * 0.95) - 1]:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+"""Synthetic-load benchmark of the bot's hot paths against an in-process fake guild.
+
+Drives the tracker (live async indexing, history backfill, voice churn), the
+attendance report, record saving, email rendering and the stats queries with
+a configurable guild size and traffic volume. Prints throughput and latency
+percentiles per stage, and saves the results as JSON so two versions can be
+compared with --compare.
+
+Usage: python -m benchmarks.bench_load [--members 1000] [--messages 10000] [--voice-events 2000]
+                                       [--lean] [--trace-memory] [--output results.json] [--compare old.json]
+"""
+import os
+
+# The fake guild needs no real channels; satisfy the required settings before config loads
+for _name in ('STANDUP_VOICE_CHANNEL_ID', 'ASYNC_UPDATE_CHANNEL_ID', 'REPORT_CHANNEL_ID'):
+    os.environ.setdefault(_name, '0')
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from benchmarks.fake_guild import FakeBot, FakeGuild, FakeVoiceState, make_messages, seed_history
+from config import settings
+from src.core.analytics import AnalyticsEngine
+from src.core.email_service import EmailService
+from src.core.utils import generate_attendance_report, last_n_days, save_attendance_record
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))]
+
+
+def peak_rss_mib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class Stage:
+    """Collects per-operation latencies for one benchmark stage"""
+
+    def __init__(self, name, trace_memory):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.latencies = []
+        self.units = 0
+        self._started = None
+
+    def __enter__(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self._started
+        self.alloc_peak_kib = None
+        if self.trace_memory:
+            self.alloc_peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+        self.rss_peak_mib = peak_rss_mib()
+
+    def record(self, started, units=1):
+        """Record one operation that began at ``started`` (perf_counter) and processed ``units`` items"""
+        self.latencies.append(time.perf_counter() - started)
+        self.units += units
+
+    def result(self):
+        latencies = sorted(self.latencies)
+        busy = sum(latencies)
+        result = {
+            'ops': len(latencies),
+            'units': self.units,
+            'seconds': round(busy, 6),
+            'units_per_second': round(self.units / busy, 1) if busy else None,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 4),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 4),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 4),
+            'max_ms': round(latencies[-1] * 1000, 4) if latencies else 0.0,
+            'rss_peak_mib': round(self.rss_peak_mib, 1) if self.rss_peak_mib is not None else None
+        }
+        if self.alloc_peak_kib is not None:
+            result['alloc_peak_kib'] = round(self.alloc_peak_kib, 1)
+        return result
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    guild = FakeGuild(args.members, lean=args.lean, seed=args.seed)
+    bot = FakeBot(guild, os.getcwd())
+    member_ids = list(guild.roster)
+    team = bot.add_bench_team('bench', member_ids)
+    tracker = team.tracker
+    results = {}
+
+    def stage(name):
+        return Stage(name, args.trace_memory)
+
+    now = datetime.now(team.timezone)
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    messages = make_messages(guild, args.messages, day_start, now - timedelta(seconds=1), seed=args.seed)
+    bot.get_channel(team.async_channel_id).load(messages)
+
+    # Live on_message indexing
+    with stage('async_ingest_live') as s:
+        for message in messages:
+            started = time.perf_counter()
+            tracker.handle_message(message)
+            s.record(started)
+    results[s.name] = s.result()
+
+    # History backfill of the whole day (first start, or after a reconnect gap)
+    with stage('async_backfill') as s:
+        for _ in range(args.runs):
+            tracker.async_index = type(tracker.async_index)(team.timezone, bot.update_parser)
+            bot.history.cursors.clear()
+            started = time.perf_counter()
+            highlights = await tracker.check_day_highlights()
+            s.record(started, units=len(messages))
+    results[s.name] = s.result()
+    results[s.name]['updates_found'] = len(highlights)
+
+    # Voice churn during a session, including the session snapshot each change writes
+    voice = bot.get_channel(team.standup_channel_id)
+    pool = [guild.roster[member_id] for member_id in member_ids[:args.voice_pool]]
+    voice.members = pool[:len(pool) // 2]
+    tracker.begin_session(datetime.now(team.timezone), datetime.now(team.timezone) + timedelta(hours=1))
+    tracker.async_updates_today = highlights
+    in_channel, out_of_channel = FakeVoiceState(voice), FakeVoiceState(None)
+    with stage('voice_churn') as s:
+        for _ in range(args.voice_events):
+            member = rng.choice(pool)
+            joined = member.id in tracker.present
+            before, after = (in_channel, out_of_channel) if joined else (out_of_channel, in_channel)
+            started = time.perf_counter()
+            tracker.handle_voice_state_update(member, before, after)
+            s.record(started)
+    tracker.end_session(datetime.now(team.timezone))
+    results[s.name] = s.result()
+    results[s.name]['attendees'] = len(tracker.attendance)
+
+    with stage('attendance_report') as s:
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            await generate_attendance_report(bot, team)
+            s.record(started)
+    results[s.name] = s.result()
+    results[s.name]['member_queries'] = guild.queries
+
+    # Each save needs a distinct (team, date) key, or the store skips it as already saved
+    with stage('save_attendance_record') as s:
+        for i in range(args.runs):
+            team.id = f"bench-save-{i}"
+            started = time.perf_counter()
+            await save_attendance_record(bot, team)
+            s.record(started)
+        team.id = 'bench'
+    results[s.name] = s.result()
+
+    with stage('email_content') as s:
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            EmailService(team)._generate_email_content()
+            s.record(started, units=len(tracker.async_updates_today))
+    results[s.name] = s.result()
+
+    # Stats commands over seeded history
+    seed_history(bot, team, args.history_days, seed=args.seed)
+    start_date, end_date = last_n_days(team, args.history_days * 7 // 5 + 2)
+    stats_members = rng.sample(member_ids, min(len(member_ids), args.runs))
+
+    with stage('stats_team_rollup') as s:
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            bot.store.team_stats(team.id, start_date, end_date)
+            s.record(started)
+    results[s.name] = s.result()
+
+    with stage('stats_matrix_build') as s:
+        for _ in range(args.runs):
+            analytics = AnalyticsEngine(bot.store)
+            started = time.perf_counter()
+            analytics.matrix(team.id)
+            s.record(started)
+    results[s.name] = s.result()
+
+    matrix = bot.analytics.matrix(team.id)
+    with stage('stats_member') as s:
+        for member_id in stats_members:
+            started = time.perf_counter()
+            matrix.member_stats(member_id, start_date, end_date)
+            s.record(started)
+    results[s.name] = s.result()
+
+    with stage('stats_leaderboard') as s:
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            matrix.leaderboard(start_date, end_date, team.member_ids)
+            s.record(started)
+    results[s.name] = s.result()
+
+    if bot.journal._compaction:
+        await bot.journal._compaction
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(stages, baseline=None):
+    print(f"  {'stage':<24} {'ops':>7} {'units/s':>12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, result in stages.items():
+        rate = f"{result['units_per_second']:,.0f}" if result['units_per_second'] else '-'
+        line = (f"  {name:<24} {result['ops']:>7} {rate:>12} {result['p50_ms']:>9.3f} "
+                f"{result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['max_ms']:>9.3f}")
+        old = (baseline or {}).get(name)
+        if old and old['p95_ms']:
+            line += f"  (p95 {(result['p95_ms'] / old['p95_ms'] - 1) * 100:+.0f}% vs baseline)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=1000, help='guild members, all on the team roster (100 to 50000)')
+    parser.add_argument('--messages', type=int, default=10000, help='async channel messages for the day')
+    parser.add_argument('--voice-events', type=int, default=2000, help='voice joins/leaves during the session')
+    parser.add_argument('--voice-pool', type=int, default=500, help='members who take part in voice churn')
+    parser.add_argument('--history-days', type=int, default=60, help='past sessions seeded for the stats queries')
+    parser.add_argument('--runs', type=int, default=20, help='repetitions of the per-session stages')
+    parser.add_argument('--lean', action='store_true', help='simulate MEMBER_CACHE=lean (no members cached up front)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='report peak Python allocations per stage (slows the timed code)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help=f'results file (default: {RESULTS_DIR}/load_<members>_<time>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare p95 latencies against')
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output or os.path.join(
+        RESULTS_DIR, f"load_{args.members}m_{time.strftime('%Y%m%d-%H%M%S')}.json"))
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['stages']
+
+    # Observer mode (no voice connection) and the stub email transport keep everything in-process
+    settings.voice_mode = 'observer'
+    settings.email_transport = 'stub'
+    settings.from_email = settings.from_email or 'bench@example.com'
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)  # trackers write their snapshots under ./data
+        try:
+            stages = asyncio.run(run(args))
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        'benchmark': 'load',
+        'revision': git_revision(),
+        'created_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'stages': stages
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{args.members} members ({'lean' if args.lean else 'full'} cache), {args.messages} messages, "
+          f"{args.voice_events} voice events, {args.history_days} days of history")
+    print_results(stages, baseline)
+    print(f"Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark async update detection for accuracy and throughput.
+
+Compares the section parser with the old "mentions yesterday and today" rule
+on a generated labelled corpus, then on the hand-labelled real-world messages
+alone, listing every message the parser gets wrong there.
+
+Usage: python -m benchmarks.bench_update_parser [--size 5000] [--runs 20] [--languages en,es,bn]
+"""
+import argparse
+import time
+from benchmarks.update_corpus import CHATTER, REAL_WORLD, make_corpus
+from src.core.update_parser import UpdateParser
+
+
+def legacy_is_update(content):
+    content_lower = content.lower()
+    return 'yesterday' in content_lower and 'today' in content_lower
+
+
+def score(samples, predict):
+    """(precision, recall) of a detector against the labels"""
+    true_pos = false_pos = false_neg = 0
+    for message, expected in samples:
+        predicted = predict(message)
+        if predicted and expected:
+            true_pos += 1
+        elif predicted:
+            false_pos += 1
+        elif expected:
+            false_neg += 1
+    precision = true_pos / (true_pos + false_pos) if true_pos + false_pos else 0.0
+    recall = true_pos / (true_pos + false_neg) if true_pos + false_neg else 0.0
+    return precision, recall
+
+
+def section_accuracy(samples, parser):
+    """Share of labelled updates whose extracted sections match exactly"""
+    updates = [(message, expected) for message, expected in samples if expected]
+    exact = sum(1 for message, expected in updates if parser.parse(message).to_dict() == expected)
+    return exact / len(updates) if updates else 0.0
+
+
+def misses(samples, parser):
+    """Labelled samples whose detection or extracted sections don't match"""
+    wrong = []
+    for message, expected in samples:
+        parsed = parser.parse(message)
+        got = parsed.to_dict() if parsed.is_update else None
+        if got != expected:
+            wrong.append((message, expected, got))
+    return wrong
+
+
+def throughput(samples, predict, runs):
+    started = time.perf_counter()
+    for _ in range(runs):
+        for message, _ in samples:
+            predict(message)
+    return len(samples) * runs / (time.perf_counter() - started)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--size', type=int, default=5000)
+    arg_parser.add_argument('--runs', type=int, default=20)
+    arg_parser.add_argument('--languages', default='en,es,bn')
+    args = arg_parser.parse_args()
+
+    samples = make_corpus(args.size)
+    parser = UpdateParser(languages=args.languages.split(','))
+    detectors = [('legacy keyword rule', legacy_is_update), ('section parser', parser.is_update)]
+
+    print(f"Corpus: {len(samples)} messages, {sum(1 for _, expected in samples if expected)} updates")
+    for name, predict in detectors:
+        precision, recall = score(samples, predict)
+        rate = throughput(samples, predict, args.runs)
+        print(f"  {name:<20} precision {precision:6.1%} | recall {recall:6.1%} | {rate:,.0f} msg/s")
+    print(f"  section extraction exact match: {section_accuracy(samples, parser):.1%}")
+
+    real_world = REAL_WORLD + [(message, None) for message in CHATTER]
+    print(f"Real-world set: {len(real_world)} messages, {len(REAL_WORLD)} updates")
+    for name, predict in detectors:
+        precision, recall = score(real_world, predict)
+        print(f"  {name:<20} precision {precision:6.1%} | recall {recall:6.1%}")
+    print(f"  section extraction exact match: {section_accuracy(real_world, parser):.1%}")
+    for message, expected, got in misses(real_world, parser):
+        print(f"  miss: {message!r}\n    expected {expected}\n    got      {got}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""In-process stand-ins for the Discord objects the bot touches, for offline load tests.
+
+The fakes cover exactly the attributes and coroutines the tracker, report,
+storage and stats code paths use. Nothing talks to Discord: channel history is
+served from an in-memory list, sends are counted, and member queries resolve
+from the fake roster, so what's measured is the bot's own work.
+"""
+import bisect
+import os
+import random
+from datetime import datetime, timedelta
+import discord
+import pytz
+from benchmarks.update_corpus import make_corpus
+from src.core.analytics import AnalyticsEngine
+from src.core.gateway import GatewayRouting
+from src.core.history import HistoryScanner
+from src.core.journal import AttendanceJournal
+from src.core.members import MemberCache
+from src.core.outbound import OutboundQueue
+from src.core.outbox import EmailOutbox, StubTransport
+from src.core.storage import AttendanceStore
+from src.core.teams import Team
+from src.core.tracker import StandupTracker
+from src.core.update_parser import UpdateParser
+
+VOICE_CHANNEL_ID = 1001
+ASYNC_CHANNEL_ID = 1002
+REPORT_CHANNEL_ID = 1003
+
+
+class FakeMember:
+    def __init__(self, member_id, name, bot=False):
+        self.id = member_id
+        self.display_name = name
+        self.bot = bot
+
+
+class FakeMessage:
+    def __init__(self, message_id, author, content, created_at, channel=None):
+        self.id = message_id
+        self.author = author
+        self.content = content
+        self.created_at = created_at
+        self.channel = channel
+
+
+class FakeVoiceState:
+    def __init__(self, channel):
+        self.channel = channel
+
+
+class FakeGuild:
+    """A roster of members; with ``lean=True`` none are cached until queried, like MEMBER_CACHE=lean"""
+
+    def __init__(self, member_count, lean=False, seed=0):
+        rng = random.Random(seed)
+        self.name = 'Benchmark Guild'
+        self.roster = {
+            member_id: FakeMember(member_id, f"member-{member_id}-{rng.randrange(10_000)}")
+            for member_id in range(10_000, 10_000 + member_count)
+        }
+        self.lean = lean
+        self._cache = {} if lean else dict(self.roster)
+        self.queries = 0
+
+    def member(self, member_id, name, bot=False):
+        """The roster entry for ``member_id``, added (and renamed) as seen in recorded events"""
+        member = self.roster.get(member_id)
+        if member is None:
+            member = self.roster[member_id] = FakeMember(member_id, name, bot)
+            if not self.lean:
+                self._cache[member_id] = member
+        member.display_name = name
+        return member
+
+    @property
+    def members(self):
+        return list(self._cache.values())
+
+    def get_member(self, member_id):
+        return self._cache.get(member_id)
+
+    async def query_members(self, user_ids=None, limit=5, cache=True):
+        self.queries += 1
+        found = [self.roster[member_id] for member_id in user_ids[:limit] if member_id in self.roster]
+        if cache:
+            self._cache.update((member.id, member) for member in found)
+        return found
+
+
+class FakeVoiceChannel(discord.VoiceChannel):
+    """Passes the tracker's ``isinstance(channel, discord.VoiceChannel)`` check"""
+
+    members = ()  # shadows the parent's property so instances can hold a plain list
+
+    def __init__(self, channel_id, guild):
+        self.id = channel_id
+        self.name = 'standup'
+        self.guild = guild
+        self.members = []
+
+
+class FakeTextChannel:
+    """Serves ``history()`` pages from an in-memory, ID-sorted message list"""
+
+    def __init__(self, channel_id, guild):
+        self.id = channel_id
+        self.name = f'channel-{channel_id}'
+        self.guild = guild
+        self.messages = []
+        self._ids = []
+        self.sent = 0
+
+    def load(self, messages):
+        self.messages = sorted(messages, key=lambda message: message.id)
+        self._ids = [message.id for message in self.messages]
+
+    def post(self, message):
+        index = bisect.bisect_left(self._ids, message.id)
+        self._ids.insert(index, message.id)
+        self.messages.insert(index, message)
+
+    def get(self, message_id):
+        index = bisect.bisect_left(self._ids, message_id)
+        if index < len(self._ids) and self._ids[index] == message_id:
+            return self.messages[index]
+        return None
+
+    def delete(self, message_id):
+        index = bisect.bisect_left(self._ids, message_id)
+        if index < len(self._ids) and self._ids[index] == message_id:
+            del self._ids[index]
+            del self.messages[index]
+
+    async def history(self, limit=100, after=None, before=None, oldest_first=True):
+        low = bisect.bisect_right(self._ids, after.id) if after else 0
+        high = bisect.bisect_left(self._ids, before.id) if before else len(self._ids)
+        for message in self.messages[low:min(high, low + limit)]:
+            yield message
+
+    async def send(self, content=None, embed=None, embeds=None, file=None):
+        self.sent += 1
+
+
+class FakeBot(GatewayRouting):
+    """The slice of StandupBot that trackers, reports, storage and stats use, wired to fakes.
+
+    Gateway events go through StandupBot's own routing and handlers
+    (GatewayRouting). ``channels`` can be shared between bots, so a restarted
+    bot sees the history and voice state its predecessor left behind.
+    """
+
+    def __init__(self, guild, directory, channels=None):
+        self.guild = guild
+        self.voice_clients = []
+        self.teams = {}
+        self.update_parser = UpdateParser()
+        self.history = HistoryScanner(os.path.join(directory, 'history_cursors.json'))
+        self.member_cache = MemberCache()
+        self.store = AttendanceStore(os.path.join(directory, 'standup.db'))
+        self.journal = AttendanceJournal(directory)
+        self.analytics = AnalyticsEngine(self.store)
+        self.outbox = EmailOutbox(StubTransport(), os.path.join(directory, 'outbox'))
+        self.outbound = OutboundQueue(burst=0)  # sends are instant; don't pace them
+        self.scheduler = None
+        self.recorder = None
+        self.channels = {} if channels is None else channels
+        self.reindex_channels()
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def add_team(self, team):
+        """Add a team whose tracker is set, creating fake channels for any of its channel IDs not seen yet"""
+        if team.standup_channel_id not in self.channels:
+            self.channels[team.standup_channel_id] = FakeVoiceChannel(team.standup_channel_id, self.guild)
+        for channel_id in (team.async_channel_id, team.report_channel_id):
+            if channel_id not in self.channels:
+                self.channels[channel_id] = FakeTextChannel(channel_id, self.guild)
+        super().add_team(team)
+
+    def add_bench_team(self, team_id, member_ids, timezone=pytz.UTC):
+        """A team on the fake channels whose cutoff is far enough ahead that every update counts"""
+        team = Team(team_id, team_id, VOICE_CHANNEL_ID, ASYNC_CHANNEL_ID, REPORT_CHANNEL_ID,
+                    timezone=timezone, start=(23, 58), end=(23, 59), async_cutoff=(23, 59),
+                    member_ids=member_ids, to_emails=['team@example.com'])
+        team.tracker = StandupTracker(self, team)
+        self.add_team(team)
+        return team
+
+
+def make_messages(guild, count, day_start, day_end, seed=0):
+    """``count`` async-channel messages spread over [day_start, day_end), about a third of them updates"""
+    rng = random.Random(seed)
+    corpus = [message for message, _ in make_corpus(min(count, 5000), seed=seed)]
+    authors = list(guild.roster.values())
+    span = max((day_end - day_start).total_seconds(), 1)
+    messages = []
+    for i in range(count):
+        created_at = day_start + timedelta(seconds=span * i / count)
+        message_id = discord.utils.time_snowflake(created_at) + i % 4096
+        messages.append(FakeMessage(message_id, rng.choice(authors), rng.choice(corpus), created_at))
+    return messages
+
+
+def seed_history(bot, team, days, seed=0):
+    """Store ``days`` past weekday sessions with random voice and async participation"""
+    rng = random.Random(seed)
+    day = datetime.now(team.timezone).date()
+    saved = 0
+    while saved < days:
+        day -= timedelta(days=1)
+        if day.weekday() >= 5:
+            continue
+        voice = [member_id for member_id in team.member_ids if rng.random() < 0.7]
+        async_only = [member_id for member_id in team.member_ids if member_id not in voice and rng.random() < 0.5]
+        bot.store.save_record({
+            'team': team.id,
+            'date': day.isoformat(),
+            'day': day.strftime('%A'),
+            'start_time': f"{day.isoformat()}T11:00:00+00:00",
+            'end_time': f"{day.isoformat()}T11:15:00+00:00",
+            'voice_attendance': voice,
+            'voice_count': len(voice),
+            'voice_durations': {str(member_id): rng.randint(60, 900) for member_id in voice},
+            'late_joins': {str(member_id): rng.randint(1, 300) for member_id in voice if rng.random() < 0.1},
+            'async_updates': {str(member_id): {'name': str(member_id), 'time': '10:30'} for member_id in async_only},
+            'async_count': len(async_only),
+            'total_participation': len(voice) + len(async_only)
+        })
+        saved += 1
@@ -0,0 +1,438 @@
+"""Replay gateway events through the bot on a simulated clock, days of standups in seconds.
+
+Boots the bot through the same steps as standup_bot.main (src/core/startup.py)
+against the in-process fake guild (benchmarks/fake_guild.py), and delivers
+events through StandupBot's own gateway handlers (src/core/gateway.py). Time is a SimulatedClock that jumps
+straight to the next scheduled deadline or event, so a month of precheck,
+start, attendance samples and end runs at thousands of times real time.
+Events come from a recording (RECORD_EVENTS_FILE) or are generated with
+--synthetic. --restart stops the bot at a moment and boots a fresh one on
+the same data directory, like a process restart. --move-channels (synthetic,
+teams from .env) moves the team to new standup and async channels on that
+day and applies it with a config reload at that moment: the team posts in
+the new async channel from the morning on, with stray updates left in the
+old one, so the day's count only comes out right if the reload drops the
+old channel's updates and backfills the new one.
+
+Prints one line per day with the stored session's start and end, flags
+missed weekdays, weekend sessions, starts or ends off schedule and (synthetic)
+async update counts that differ from what was posted, and exits with status 1
+if any day was flagged.
+
+Usage: python -m benchmarks.replay --synthetic [--start 2026-03-02] [--days 28] [--timezone America/New_York]
+                                   [--members 12] [--restart 2026-03-04T11:05 ...] [--downtime 120]
+                                   [--move-channels 2026-03-04T10:00]
+       python -m benchmarks.replay events.jsonl [--start ...] [--days ...] (teams from .env / TEAMS_FILE)
+"""
+import os
+
+# The fake guild needs no real channels; satisfy the required settings before config loads
+for _name, _value in (('STANDUP_VOICE_CHANNEL_ID', '1001'), ('ASYNC_UPDATE_CHANNEL_ID', '1002'),
+                      ('REPORT_CHANNEL_ID', '1003')):
+    os.environ.setdefault(_name, _value)
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+import discord
+import config
+from benchmarks.fake_guild import FakeBot, FakeGuild, FakeMessage, FakeTextChannel, FakeVoiceChannel, FakeVoiceState
+from benchmarks.update_corpus import make_corpus
+from config import settings, Settings
+from src.core import clock
+from src.core.clock import SimulatedClock
+from src.core.config_reload import reload_config
+from src.core.startup import boot
+from src.core.storage import AttendanceStore
+from src.core.teams import load_teams
+from src.core.update_parser import UpdateParser
+
+# How far a stored start or end may be from the schedule before the day is flagged
+DRIFT_TOLERANCE = timedelta(minutes=1)
+
+# Where --move-channels moves the team
+MOVED_CHANNELS = {'STANDUP_VOICE_CHANNEL_ID': 2001, 'ASYNC_UPDATE_CHANNEL_ID': 2002}
+
+
+def apply_env(values):
+    """Override environment variables the way a restart or /reload_config would read them"""
+    config._PROCESS_ENV.update({name: str(value) for name, value in values.items()})
+
+
+class Replay:
+    """One simulated deployment: the Discord side (guild, channels) and the bot process, which can restart"""
+
+    def __init__(self, guild, directory, roster=None):
+        self.guild = guild
+        self.directory = directory
+        self.roster = roster  # member IDs for teams configured without TEAM_MEMBER_IDS
+        self.channels = {}
+        self.bot = None
+        self.boots = 0
+        self.events = 0
+        self.fired = 0
+
+    def boot(self):
+        """Start a bot process through the same boot steps as standup_bot.main, then connect it"""
+        bot = FakeBot(self.guild, self.directory, self.channels)
+        teams = load_teams()
+        for team in teams:
+            if not team.member_ids and self.roster:
+                team.member_ids = list(self.roster)
+        boot(bot, teams)
+        self.bot = bot
+        self.boots += 1
+        self.bot.start_tracking()
+
+    def stop(self):
+        """Kill the process: nothing is flushed beyond what the bot already wrote"""
+        if self.bot:
+            self.bot.store.close()
+        self.bot = None
+
+    def _voice_state(self, channel_id):
+        if not channel_id:
+            return FakeVoiceState(None)
+        channel = self.channels.get(channel_id)
+        return FakeVoiceState(channel if channel is not None else SimpleNamespace(id=channel_id))  # untracked channel
+
+    async def dispatch(self, event):
+        """Apply one recorded event to the Discord side, then deliver it to a running bot's gateway handlers"""
+        self.events += 1
+        kind = event['type']
+        bot = self.bot
+        if kind == 'voice':
+            member = self.guild.member(event['member'], event['name'], event.get('bot', False))
+            for channel_id, joined in ((event['before'], False), (event['after'], True)):
+                channel = self.channels.get(channel_id)
+                if channel is not None and hasattr(channel, 'members'):
+                    channel.members = [m for m in channel.members if m.id != member.id] + ([member] if joined else [])
+            if bot:
+                await bot.on_voice_state_update(member, self._voice_state(event['before']),
+                                                self._voice_state(event['after']))
+        elif kind in ('message', 'edit'):
+            author = self.guild.member(event['member'], event['name'], event.get('bot', False))
+            channel = self.channels.get(event['channel'])
+            message = FakeMessage(event['id'], author, event['content'], datetime.fromisoformat(event['created_at']),
+                                  channel if channel is not None else SimpleNamespace(id=event['channel']))
+            if channel is not None and hasattr(channel, 'post'):
+                channel.delete(message.id)
+                channel.post(message)
+            if bot and kind == 'message':
+                await bot.on_message(message)
+            elif bot:
+                await bot.on_raw_message_edit(SimpleNamespace(channel_id=event['channel'], message_id=message.id,
+                                                              message=message))
+        elif kind == 'delete':
+            channel = self.channels.get(event['channel'])
+            for message_id in event['ids']:
+                if channel is not None and hasattr(channel, 'delete'):
+                    channel.delete(message_id)
+            if bot and len(event['ids']) == 1:
+                await bot.on_raw_message_delete(SimpleNamespace(channel_id=event['channel'], message_id=event['ids'][0]))
+            elif bot:
+                await bot.on_raw_bulk_message_delete(SimpleNamespace(channel_id=event['channel'],
+                                                                     message_ids=set(event['ids'])))
+        elif kind == 'disconnect' and bot:
+            await bot.on_disconnect()
+        elif kind == 'resumed' and bot:
+            await bot.on_resumed()
+        elif kind == 'ready' and bot:
+            bot.start_tracking()
+        elif kind == 'reload':
+            apply_env(event['env'])
+            if bot:
+                reload_config(bot)
+            else:
+                settings.update(Settings.load())  # picked up by the next boot
+        elif kind == 'stop':
+            self.stop()
+        elif kind == 'start' and not bot:
+            self.boot()
+
+    async def run(self, sim, events, until, speed=0):
+        """Jump ``sim`` from deadline to event to deadline until ``until``; returns wall seconds taken"""
+        sim_started, wall_started = sim.now(timezone.utc), time.perf_counter()
+        while True:
+            deadline = self.bot.scheduler.next_deadline() if self.bot else None
+            next_event = events[0][0] if events else None
+            target = min(when for when in (deadline, next_event, until) if when is not None)
+            if speed:
+                # Pace simulated time at ``speed`` times real time
+                lag = (target - sim_started).total_seconds() / speed - (time.perf_counter() - wall_started)
+                if lag > 0:
+                    await asyncio.sleep(lag)
+            sim.set(target)
+            if target >= until:
+                break
+            while events and events[0][0] <= target:
+                await self.dispatch(heapq.heappop(events)[2])
+            if self.bot:
+                self.fired += await self.bot.scheduler.run_due(clock.now(settings.timezone))
+                await self.bot.scheduler.join()  # finish at this instant before the clock moves on
+            await asyncio.sleep(0)  # let spawned tasks (journal compaction) run
+        if self.bot and self.bot.journal._compaction:
+            await self.bot.journal._compaction
+        return time.perf_counter() - wall_started
+
+
+def local_time(team, day, hour, minute):
+    return team.timezone.localize(datetime(day.year, day.month, day.day, hour, minute))
+
+
+def load_events(path):
+    """Recorded events as a heap of (time, sequence, event)"""
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for seq, line in enumerate(f):
+            if line.strip():
+                event = json.loads(line)
+                events.append((datetime.fromisoformat(event['at']), seq, event))
+    heapq.heapify(events)
+    return events
+
+
+def synthetic_events(teams, guild, first_day, days, seed=0, expected=None, move_at=None):
+    """A working team's traffic: updates before the cutoff, voice joins around the standup, weekend chatter.
+
+    ``expected`` is filled with (team id, day) -> IDs of the members whose
+    update should count. From ``move_at``'s day on, traffic goes to
+    MOVED_CHANNELS; that morning a few members also post in the old async
+    channel, which must not count.
+    """
+    rng = random.Random(seed)
+    parser = UpdateParser.from_config()
+    expected = {} if expected is None else expected
+    corpus = make_corpus(2000, seed=seed)
+    updates = [message for message, language in corpus if language]
+    chatter = [message for message, language in corpus if not language]
+    ids = itertools.count()
+    events = []
+
+    def add(when, event):
+        event['at'] = when.astimezone(timezone.utc).isoformat()
+        events.append((when.astimezone(timezone.utc), next(ids), event))
+
+    def message(channel, member, when, content):
+        created_at = when.astimezone(timezone.utc)
+        add(when, {'type': 'message', 'id': discord.utils.time_snowflake(created_at) + next(ids) % 4096,
+                   'channel': channel, 'member': member.id, 'name': member.display_name,
+                   'bot': False, 'content': content, 'created_at': created_at.isoformat()})
+
+    def voice(channel, member, when, joined):
+        add(when, {'type': 'voice', 'member': member.id, 'name': member.display_name, 'bot': False,
+                   'before': None if joined else channel, 'after': channel if joined else None})
+
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        for team in teams:
+            members = [guild.roster[member_id] for member_id in team.member_ids if member_id in guild.roster]
+
+            cutoff = local_time(team, day, team.cutoff_hour, team.cutoff_minute)
+            start = local_time(team, day, team.start_hour, team.start_minute)
+            end = local_time(team, day, team.end_hour, team.end_minute)
+            morning = local_time(team, day, 7, 0)
+            moved = move_at is not None and day >= move_at.astimezone(team.timezone).date()
+            async_channel = MOVED_CHANNELS['ASYNC_UPDATE_CHANNEL_ID'] if moved else team.async_channel_id
+            voice_channel = MOVED_CHANNELS['STANDUP_VOICE_CHANNEL_ID'] if moved else team.standup_channel_id
+            counted = expected.setdefault((team.id, day), set())
+            for member in members:
+                if day.weekday() >= 5:
+                    if rng.random() < 0.1:
+                        message(async_channel, member, morning + timedelta(hours=rng.uniform(0, 8)), rng.choice(chatter))
+                    continue
+                if rng.random() < 0.6:
+                    window = max((cutoff - morning).total_seconds() - 60, 60)
+                    content = rng.choice(updates)
+                    message(async_channel, member, morning + timedelta(seconds=rng.uniform(0, window)), content)
+                    if parser.is_update(content):
+                        counted.add(member.id)
+                elif moved and day == move_at.astimezone(team.timezone).date() and rng.random() < 0.5:
+                    # Posted where the team used to post, before the move was announced
+                    window = max((move_at - morning).total_seconds(), 60)
+                    message(team.async_channel_id, member, morning + timedelta(seconds=rng.uniform(0, window)),
+                            rng.choice(updates))
+                if rng.random() < 0.2:
+                    message(async_channel, member, morning + timedelta(hours=rng.uniform(0, 9)), rng.choice(chatter))
+                if rng.random() < 0.7:
+                    joined = start + timedelta(minutes=rng.uniform(-3, 8))
+                    left = end + timedelta(minutes=rng.uniform(-5, 3))
+                    voice(voice_channel, member, joined, True)
+                    if rng.random() < 0.1:  # dropped and came back
+                        drop = joined + (left - joined) * rng.uniform(0.2, 0.8)
+                        voice(voice_channel, member, drop, False)
+                        voice(voice_channel, member, drop + timedelta(seconds=rng.uniform(10, 120)), True)
+                    voice(voice_channel, member, left, False)
+    heapq.heapify(events)
+    return events
+
+
+def add_restarts(events, restarts, downtime, tz):
+    """Stop and start events; they sort before any recorded event at the same instant"""
+    for i, when in enumerate(restarts):
+        stop_at = (when if when.tzinfo else tz.localize(when)).astimezone(timezone.utc)
+        heapq.heappush(events, (stop_at, -2 * i - 2, {'type': 'stop'}))
+        heapq.heappush(events, (stop_at + timedelta(seconds=downtime), -2 * i - 1, {'type': 'start'}))
+
+
+def add_channel_move(events, replay, when, tz):
+    """Fake channels for MOVED_CHANNELS, plus the reload that moves the team to them at ``when``"""
+    replay.channels[MOVED_CHANNELS['STANDUP_VOICE_CHANNEL_ID']] = FakeVoiceChannel(
+        MOVED_CHANNELS['STANDUP_VOICE_CHANNEL_ID'], replay.guild)
+    replay.channels[MOVED_CHANNELS['ASYNC_UPDATE_CHANNEL_ID']] = FakeTextChannel(
+        MOVED_CHANNELS['ASYNC_UPDATE_CHANNEL_ID'], replay.guild)
+    reload_at = (when if when.tzinfo else tz.localize(when)).astimezone(timezone.utc)
+    heapq.heappush(events, (reload_at, -1_000_000, {'type': 'reload', 'env': MOVED_CHANNELS}))
+
+
+def day_report(store, team, first_day, days, expected=None):
+    """(lines, flagged days) comparing the stored sessions with the team's schedule and, if given, the
+    members whose async update should have counted"""
+    sessions = {}
+    for row in store.sessions(team.id):
+        sessions.setdefault(row['date'], []).append(row)
+    lines, flagged = [], 0
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        rows = sessions.get(day.isoformat(), [])
+        scheduled_start = local_time(team, day, team.start_hour, team.start_minute)
+        scheduled_end = local_time(team, day, team.end_hour, team.end_minute)
+        notes = []
+        if day.weekday() < 5 and not rows:
+            notes.append('MISSING')
+        if day.weekday() >= 5 and rows:
+            notes.append('WEEKEND SESSION')
+        if len(rows) > 1:
+            notes.append(f'{len(rows)} SESSIONS')
+        times = '-'
+        if rows:
+            started = datetime.fromisoformat(rows[0]['start_time']).astimezone(team.timezone)
+            ended = datetime.fromisoformat(rows[0]['end_time']).astimezone(team.timezone)
+            times = f"{started.strftime('%H:%M:%S')}-{ended.strftime('%H:%M:%S %Z')}"
+            if abs(started - scheduled_start) > DRIFT_TOLERANCE:
+                notes.append(f"start {(started - scheduled_start).total_seconds():+.0f}s")
+            if abs(ended - scheduled_end) > DRIFT_TOLERANCE:
+                notes.append(f"end {(ended - scheduled_end).total_seconds():+.0f}s")
+            counted = (expected or {}).get((team.id, day))
+            if counted is not None and rows[0]['async_count'] != len(counted):
+                notes.append(f"async expected {len(counted)}")
+        if notes:
+            flagged += 1
+        counts = f"{rows[0]['voice_count']:>5} {rows[0]['async_count']:>5}" if rows else f"{'':>5} {'':>5}"
+        lines.append(f"  {day.isoformat()} {day.strftime('%a')}  {times:<22} {counts}  {', '.join(notes)}")
+    return lines, flagged
+
+
+async def run(args):
+    tz = settings.timezone
+    first_day = date.fromisoformat(args.start) if args.start else None
+    guild = FakeGuild(args.members if args.synthetic else 0, seed=args.seed)
+    expected = None
+    move_at = datetime.fromisoformat(args.move_channels) if args.move_channels else None
+    if move_at and not move_at.tzinfo:
+        move_at = tz.localize(move_at)
+
+    if args.synthetic:
+        first_day = first_day or date(2026, 3, 2)
+        replay = Replay(guild, 'data', roster=list(guild.roster))
+        teams = load_teams()
+        for team in teams:
+            team.member_ids = team.member_ids or list(guild.roster)
+        expected = {}
+        events = synthetic_events(teams, guild, first_day, args.days, args.seed, expected, move_at)
+        if move_at:
+            add_channel_move(events, replay, move_at, tz)
+    else:
+        replay = Replay(guild, 'data')
+        events = load_events(args.events)
+        if not first_day:
+            if not events:
+                raise SystemExit(f"{args.events} has no events")
+            first_day = events[0][0].astimezone(tz).date()
+    add_restarts(events, [datetime.fromisoformat(value) for value in args.restart], args.downtime, tz)
+
+    last_day = first_day + timedelta(days=args.days)
+    begin = tz.localize(datetime(first_day.year, first_day.month, first_day.day))
+    until = tz.localize(datetime(last_day.year, last_day.month, last_day.day))
+    while events and events[0][0] < begin:
+        heapq.heappop(events)  # recorded before the replayed range
+
+    sim = SimulatedClock(begin)
+    previous = clock.use(sim)
+    try:
+        replay.boot()
+        wall = await replay.run(sim, events, until, args.speed)
+        store = replay.bot.store if replay.bot else AttendanceStore(os.path.join('data', 'standup.db'))
+        print(f"{args.days} day(s) from {first_day.isoformat()} ({tz.zone}), {replay.events} event(s), "
+              f"{replay.fired} scheduled event(s) fired, {replay.boots} boot(s)")
+        flagged = 0
+        for team in load_teams():
+            print(f"\n{team.name} ({team.schedule_label})")
+            print(f"  {'date':<14} {'session':<22} {'voice':>5} {'async':>5}  flags")
+            lines, team_flagged = day_report(store, team, first_day, args.days, expected)
+            print('\n'.join(lines))
+            flagged += team_flagged
+        simulated = (until - begin).total_seconds()
+        print(f"\nSimulated {simulated / 86400:.1f} day(s) in {wall:.2f}s wall time ({simulated / wall:,.0f}x real time)")
+        return flagged
+    finally:
+        clock.use(previous)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('events', nargs='?', help='JSONL recording from RECORD_EVENTS_FILE')
+    parser.add_argument('--synthetic', action='store_true', help='generate traffic instead of reading a recording')
+    parser.add_argument('--start', help='first day to replay, YYYY-MM-DD (default: first recorded day, 2026-03-02 synthetic)')
+    parser.add_argument('--days', type=int, default=28)
+    parser.add_argument('--timezone', help='default team timezone (default: TIMEZONE from .env)')
+    parser.add_argument('--members', type=int, default=12, help='synthetic team size')
+    parser.add_argument('--restart', action='append', default=[], metavar='WHEN',
+                        help='stop the bot at this local ISO time and boot a fresh one (repeatable)')
+    parser.add_argument('--downtime', type=float, default=120, help='seconds the bot stays down on each restart')
+    parser.add_argument('--move-channels', metavar='WHEN',
+                        help='synthetic: move the team to new channels that day, reloading the config at this local ISO time')
+    parser.add_argument('--speed', type=float, default=0,
+                        help='pace at this multiple of real time, e.g. 1000 (default: as fast as possible)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help="show the bot's own log output")
+    args = parser.parse_args()
+    if not args.synthetic and not args.events:
+        parser.error('give a recorded events file or --synthetic')
+    if args.move_channels and (not args.synthetic or settings.teams_file):
+        parser.error('--move-channels needs --synthetic and the team from .env (no TEAMS_FILE)')
+    if args.events:
+        args.events = os.path.abspath(args.events)
+
+    # Observer mode (no voice connection) and the stub email transport keep everything in-process.
+    # Set as environment overrides so config reloads during the replay keep them.
+    overrides = {'VOICE_MODE': 'observer', 'EMAIL_TRANSPORT': 'stub',
+                 'FROM_EMAIL': settings.from_email or 'replay@example.com'}
+    if args.timezone:
+        overrides['TIMEZONE'] = args.timezone  # teams without their own timezone inherit it
+    apply_env(overrides)
+    settings.update(Settings.load())
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)  # trackers write their snapshots under ./data
+        try:
+            flagged = asyncio.run(run(args))
+        finally:
+            os.chdir(cwd)
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == '__main__':
+    main()
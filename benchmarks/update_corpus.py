@@ -0,0 +1,149 @@
+"""Deterministic labelled corpus of async-channel messages for the update parser.
+
+Each sample is ``(message, expected)`` where ``expected`` is ``None`` for
+chatter that isn't a day highlight, or the ``{'yesterday', 'today',
+'blockers'}`` sections the parser should extract. ``REAL_WORLD`` holds
+hand-labelled messages in the shapes people actually post; the generated
+corpus mixes them in alongside the templated updates.
+"""
+import random
+
+TASKS = [
+    'fixed the login bug', 'reviewed PR #123', 'deployed the api', 'wrote tests for billing',
+    'paired with Sam on infra', 'migrated the cron jobs', 'updated the docs', 'profiled the report query',
+    'cleaned up feature flags', 'triaged support tickets', 'refactored the email service',
+]
+PLANS = [
+    'deploy to production', 'finish the dashboard', 'write the migration', 'review open PRs',
+    'start on the search epic', 'fix flaky CI', 'sync with design', 'ship the hotfix',
+]
+BLOCKERS = ['waiting on API keys', 'need access to staging', 'none', 'blocked on design review']
+
+SPANISH = (['arreglé el login', 'revisé el PR'], ['desplegar a producción', 'escribir pruebas'], ['ninguno'])
+BENGALI = (['বাগ ঠিক করেছি', 'রিভিউ করেছি'], ['ডিপ্লয় করব', 'টেস্ট লিখব'], ['নেই'])
+
+# Messages that mention the keywords without being updates
+CHATTER = [
+    "today is yesterday's rerun",
+    "Yesterday's meeting moved to today",
+    "Is the build from yesterday deployed today or tomorrow",
+    "Anyone know why the todays_report job failed",
+    "lunch today?",
+    "Great demo yesterday everyone!",
+    "standup notes from yesterdays sync are in the doc, today's agenda is pinned",
+    "The deploy happened yesterday afternoon and today morning",
+    "Today:\nWill work on feature X",
+    "Yesterday:\nFixed a bug",
+    "Who's on call today",
+    "pushing the release to Thursday",
+    "ok",
+    "Yesterday:\nToday:",
+    "Hi all, running late today",
+    "Can someone review my PR from yesterday? Today is the deadline",
+    "today I learned python has a walrus operator",
+    "Reminder: demo is today at 3pm, slides from yesterday are in the drive",
+    "Did anyone see the outage yesterday",
+    "thanks for the help yesterday!",
+    "no standup today?",
+    "Plan: ship it",
+    "What did we decide yesterday about the schema",
+    "OOO today, back tomorrow",
+    "@here the build is red since yesterday, today's release is on hold",
+    "👍",
+    "lol same",
+]
+
+# Hand-labelled messages in real-world shapes: greetings, emoji and numbered
+# labels, labels with words in front, inline sections and prose updates
+REAL_WORLD = [
+    ("What I did yesterday: fixed the login bug\nWhat I will do today: deploy to production",
+     {'yesterday': 'fixed the login bug', 'today': 'deploy to production', 'blockers': None}),
+    ("✅ Yesterday: reviewed PR #123\n🎯 Today: finish the dashboard",
+     {'yesterday': 'reviewed PR #123', 'today': 'finish the dashboard', 'blockers': None}),
+    ("Done yesterday: migrated the cron jobs\nPlan today: write the migration",
+     {'yesterday': 'migrated the cron jobs', 'today': 'write the migration', 'blockers': None}),
+    ("Hi all! Yesterday: updated the docs Today: review open PRs",
+     {'yesterday': 'updated the docs', 'today': 'review open PRs', 'blockers': None}),
+    ("Yesterday I worked on the billing tests and today I will fix flaky CI",
+     {'yesterday': 'I worked on the billing tests', 'today': 'I will fix flaky CI', 'blockers': None}),
+    ("1. Yesterday: triaged support tickets\n2. Today: sync with design\n3. Blockers: none",
+     {'yesterday': 'triaged support tickets', 'today': 'sync with design', 'blockers': 'none'}),
+    ("Yesterday, I paired with Sam on infra. Today, I'll ship the hotfix.",
+     {'yesterday': 'I paired with Sam on infra.', 'today': "I'll ship the hotfix.", 'blockers': None}),
+    ("Good morning!\n\n**Yesterday**\n- profiled the report query\n\n**Today**\n- start on the search epic",
+     {'yesterday': '- profiled the report query', 'today': '- start on the search epic', 'blockers': None}),
+    ("> Yesterday: cleaned up feature flags\n> Today: deploy the api\n> Blockers: need access to staging",
+     {'yesterday': 'cleaned up feature flags', 'today': 'deploy the api', 'blockers': 'need access to staging'}),
+    ("🔙 Yesterday - wrote tests for billing\n🔜 Today - review open PRs\n🚧 Blockers - waiting on API keys",
+     {'yesterday': 'wrote tests for billing', 'today': 'review open PRs', 'blockers': 'waiting on API keys'}),
+    ("Update: yesterday: refactored the email service; today: write the migration",
+     {'yesterday': 'refactored the email service', 'today': 'write the migration', 'blockers': None}),
+    ("yday: on-call, quiet\ntoday: fix flaky CI",
+     {'yesterday': 'on-call, quiet', 'today': 'fix flaky CI', 'blockers': None}),
+    ("Finished the dashboard yesterday, then today I'll sync with design",
+     {'yesterday': 'Finished the dashboard', 'today': "I'll sync with design", 'blockers': None}),
+    ("Yesterday - reviewed PRs\nToday - nothing planned yet, picking up tickets\nBlocked by: flaky staging",
+     {'yesterday': 'reviewed PRs', 'today': 'nothing planned yet, picking up tickets', 'blockers': 'flaky staging'}),
+]
+
+
+def _bullets(items):
+    return '\n'.join(f"- {item}" for item in items)
+
+
+def _english_update(rng):
+    done = rng.sample(TASKS, rng.randint(1, 3))
+    plan = rng.sample(PLANS, rng.randint(1, 2))
+    blocker = rng.choice(BLOCKERS) if rng.random() < 0.4 else None
+    style = rng.randrange(6)
+
+    if style == 0:
+        message = f"Yesterday:\n{_bullets(done)}\n\nToday:\n{_bullets(plan)}"
+        expected = {'yesterday': _bullets(done), 'today': _bullets(plan)}
+    elif style == 1:
+        message = f"**Yesterday:** {', '.join(done)}\n**Today:** {', '.join(plan)}"
+        expected = {'yesterday': ', '.join(done), 'today': ', '.join(plan)}
+    elif style == 2:
+        message = f"Yesterday I {done[0]}, today I'll {plan[0]}"
+        expected = {'yesterday': f"I {done[0]}", 'today': f"I'll {plan[0]}"}
+    elif style == 3:
+        message = f"{done[0].capitalize()} yesterday, will {plan[0]} today"
+        expected = {'yesterday': done[0].capitalize(), 'today': f"will {plan[0]}"}
+    elif style == 4:
+        message = f"Y'day - {'; '.join(done)}\nToday's plan - {'; '.join(plan)}"
+        expected = {'yesterday': '; '.join(done), 'today': '; '.join(plan)}
+    else:
+        message = f"# Today\n{_bullets(plan)}\n# Yesterday\n{_bullets(done)}"
+        expected = {'yesterday': _bullets(done), 'today': _bullets(plan)}
+
+    expected['blockers'] = None
+    if blocker and style != 2 and style != 3:
+        message += f"\nBlockers: {blocker}"
+        expected['blockers'] = blocker
+    return message, expected
+
+
+def _translated_update(rng, words, keywords):
+    done, plan, blockers = words
+    yesterday, today, blocker_word = keywords
+    y, t, b = rng.choice(done), rng.choice(plan), rng.choice(blockers)
+    return f"{yesterday}: {y}\n{today}: {t}\n{blocker_word}: {b}", {'yesterday': y, 'today': t, 'blockers': b}
+
+
+def make_corpus(size=5000, seed=0):
+    """``size`` labelled samples; roughly 80% updates (mostly English) and 20% chatter"""
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.6:
+            samples.append(_english_update(rng))
+        elif roll < 0.65:
+            samples.append(_translated_update(rng, SPANISH, ('Ayer', 'Hoy', 'Bloqueos')))
+        elif roll < 0.7:
+            samples.append(_translated_update(rng, BENGALI, ('গতকাল', 'আজ', 'বাধা')))
+        elif roll < 0.8:
+            samples.append(rng.choice(REAL_WORLD))
+        else:
+            samples.append((rng.choice(CHATTER), None))
+    return samples
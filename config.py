@@ -1,60 +1,266 @@
+import json
+import logging
 import os
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 import pytz
 
-# Load environment variables
-load_dotenv()
-
-# Discord Configuration (Required)
-DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
-STANDUP_CHANNEL_ID = int(os.getenv('STANDUP_VOICE_CHANNEL_ID'))
-ASYNC_UPDATE_CHANNEL_ID = int(os.getenv('ASYNC_UPDATE_CHANNEL_ID'))
-REPORT_CHANNEL_ID = int(os.getenv('REPORT_CHANNEL_ID'))
-
-# Timezone Configuration
-TIMEZONE = pytz.timezone(os.getenv('TIMEZONE', 'Asia/Dhaka'))
-
-# Standup Times (24-hour format)
-STANDUP_START_HOUR = int(os.getenv('STANDUP_START_HOUR', '11'))
-STANDUP_START_MINUTE = int(os.getenv('STANDUP_START_MINUTE', '0'))
-STANDUP_END_HOUR = int(os.getenv('STANDUP_END_HOUR', '11'))
-STANDUP_END_MINUTE = int(os.getenv('STANDUP_END_MINUTE', '15'))
-
-# Async Update Cutoff Time (when to stop checking for async updates)
-# Default is standup start time, but can be set independently
-ASYNC_CUTOFF_HOUR = int(os.getenv('ASYNC_CUTOFF_HOUR', str(STANDUP_START_HOUR)))
-ASYNC_CUTOFF_MINUTE = int(os.getenv('ASYNC_CUTOFF_MINUTE', str(STANDUP_START_MINUTE)))
-
-# Pre-standup Check Time (when to check async updates before standup)
-PRECHECK_HOUR = int(os.getenv('PRECHECK_HOUR', '10'))
-PRECHECK_MINUTE = int(os.getenv('PRECHECK_MINUTE', '55'))
-
-# Team Members (Optional - for tracking absent members)
-# Set via environment variable TEAM_MEMBER_IDS (comma-separated)
-# Example: TEAM_MEMBER_IDS=123456789012345678,234567890123456789
-_team_ids_env = os.getenv('TEAM_MEMBER_IDS', '')
-if _team_ids_env:
-    # Parse from environment (comma-separated list)
-    TEAM_MEMBER_IDS = [int(id.strip()) for id in _team_ids_env.split(',') if id.strip()]
-else:
-    # Empty list if not configured - bot will still work but won't track absences
-    TEAM_MEMBER_IDS = []
-    print("⚠️  TEAM_MEMBER_IDS not set - absence tracking disabled")
-
-# Email Configuration (Required for email summaries)
-FROM_EMAIL = os.getenv('FROM_EMAIL')
-TO_EMAILS = os.getenv('TO_EMAILS', '')  # Comma-separated list of email addresses
-RESEND_API_KEY = os.getenv('RESEND_API_KEY')
-
-# Parse TO_EMAILS into a list
-if TO_EMAILS:
-    TO_EMAILS_LIST = [email.strip() for email in TO_EMAILS.split(',') if email.strip()]
-else:
-    TO_EMAILS_LIST = []
-    print("⚠️  TO_EMAILS not set - email summaries disabled")
-
-# Validate email configuration
-if not FROM_EMAIL:
-    print("⚠️  FROM_EMAIL not set - email summaries disabled")
-if not RESEND_API_KEY:
-    print("⚠️  RESEND_API_KEY not set - email summaries disabled")
\ No newline at end of file
+ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+EMAIL_TRANSPORTS = ('resend', 'stub')
+VOICE_MODES = ('connect', 'observer')
+MEMBER_CACHE_MODES = ('full', 'lean')
+UPDATE_LANGUAGE_CODES = ('en', 'es', 'pt', 'de', 'fr', 'bn')
+UPDATE_SECTIONS = ('yesterday', 'today', 'blockers')
+LOG_FORMATS = ('text', 'json')
+LOG_LEVEL_NAMES = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+FINALIZE_SINKS = ('voice', 'report', 'email', 'webhook', 'file')
+
+log = logging.getLogger(__name__)
+
+# Variables set in the real environment win over .env, as with load_dotenv()
+_PROCESS_ENV = dict(os.environ)
+
+
+class ConfigError(ValueError):
+    """A missing or invalid configuration value"""
+
+
+def _get(env, name, default=None):
+    value = env.get(name)
+    if value is None or value.strip() == '':
+        return default
+    return value.strip()
+
+
+def _int(env, name, default=None, low=None, high=None):
+    value = _get(env, name, default)
+    if value is None:
+        raise ConfigError(f"{name} is required")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ConfigError(f"{name} must be an integer (got {value!r})") from None
+    if (low is not None and number < low) or (high is not None and number > high):
+        raise ConfigError(f"{name} must be between {low} and {high} (got {number})")
+    return number
+
+
+def _bool(env, name, default='false'):
+    return _get(env, name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+def _level(name, value):
+    level = value.strip().upper()
+    if level not in LOG_LEVEL_NAMES:
+        raise ConfigError(f"{name} must be one of {', '.join(LOG_LEVEL_NAMES)} (got {value!r})")
+    return level
+
+
+def _csv(env, name):
+    return [item.strip() for item in (_get(env, name) or '').split(',') if item.strip()]
+
+
+def _keywords_file(path):
+    """Extra section keywords from a JSON file mapping section names to lists of words"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            keywords = json.load(f)
+    except OSError as e:
+        raise ConfigError(f"UPDATE_KEYWORDS_FILE could not be read: {e}") from None
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"UPDATE_KEYWORDS_FILE is not valid JSON: {e}") from None
+    if not isinstance(keywords, dict):
+        raise ConfigError("UPDATE_KEYWORDS_FILE must map section names to lists of words")
+    for section, words in keywords.items():
+        if section not in UPDATE_SECTIONS:
+            raise ConfigError(f"UPDATE_KEYWORDS_FILE has unknown section {section!r} "
+                              f"(expected {', '.join(UPDATE_SECTIONS)})")
+        if not isinstance(words, list) or not all(isinstance(word, str) and word.strip() for word in words):
+            raise ConfigError(f"UPDATE_KEYWORDS_FILE section {section!r} must be a list of words")
+    return keywords
+
+
+class Settings:
+    """Validated bot settings.
+
+    Built from the process environment plus ``.env``. There is one shared
+    instance, ``config.settings``, and code reads it at use time. A reload
+    (``!reload_config`` or SIGHUP) updates that instance in place, so nothing
+    holds stale values.
+    """
+
+    discord_token: str | None
+    teams_file: str | None
+    voice_mode: str
+    member_cache: str
+    standup_channel_id: int
+    async_update_channel_id: int
+    report_channel_id: int
+    timezone: pytz.BaseTzInfo
+    standup_start: tuple[int, int]
+    standup_end: tuple[int, int]
+    async_cutoff: tuple[int, int]
+    precheck: tuple[int, int]
+    team_member_ids: list[int]
+    from_email: str | None
+    to_emails: list[str]
+    resend_api_key: str | None
+    email_transport: str
+    finalize_timeout: int
+    finalize_timeouts: dict[str, int]
+    finalize_webhook_urls: list[str]
+    finalize_export_dir: str | None
+    update_languages: list[str]
+    update_keywords_file: str | None
+    update_keywords: dict[str, list[str]]
+    command_sync_guild_id: int | None
+    force_command_sync: bool
+    metrics_host: str
+    metrics_port: int
+    log_level: str
+    log_levels: dict[str, str]
+    log_format: str
+    trace_buffer_size: int
+    record_events_file: str | None
+
+    def __init__(self, env):
+        # Discord Configuration (Required)
+        self.discord_token = _get(env, 'DISCORD_TOKEN')
+
+        # Multi-team definitions (Optional - JSON file, see wiki/Configuration.md)
+        # When set, the channel IDs below are only used as fallbacks and may be omitted
+        self.teams_file = _get(env, 'TEAMS_FILE')
+        channel_default = '0' if self.teams_file else None
+        self.standup_channel_id = _int(env, 'STANDUP_VOICE_CHANNEL_ID', channel_default, low=0)
+        self.async_update_channel_id = _int(env, 'ASYNC_UPDATE_CHANNEL_ID', channel_default, low=0)
+        self.report_channel_id = _int(env, 'REPORT_CHANNEL_ID', channel_default, low=0)
+
+        # Voice mode: 'connect' joins the standup channel; 'observer' tracks it from
+        # gateway voice states alone (no voice connection, PyNaCl not needed)
+        self.voice_mode = _get(env, 'VOICE_MODE', 'connect').lower()
+        if self.voice_mode not in VOICE_MODES:
+            raise ConfigError(f"VOICE_MODE must be one of {', '.join(VOICE_MODES)}")
+
+        # Member cache: 'full' chunks every guild member (members + presences intents);
+        # 'lean' caches voice participants only and fetches team members on demand
+        self.member_cache = _get(env, 'MEMBER_CACHE', 'full').lower()
+        if self.member_cache not in MEMBER_CACHE_MODES:
+            raise ConfigError(f"MEMBER_CACHE must be one of {', '.join(MEMBER_CACHE_MODES)}")
+
+        # Timezone Configuration
+        timezone = _get(env, 'TIMEZONE', 'Asia/Dhaka')
+        try:
+            self.timezone = pytz.timezone(timezone)
+        except pytz.UnknownTimeZoneError:
+            raise ConfigError(f"TIMEZONE {timezone!r} is not a known timezone") from None
+
+        # Standup Times (24-hour format)
+        self.standup_start = self._time(env, 'STANDUP_START', '11', '0')
+        self.standup_end = self._time(env, 'STANDUP_END', '11', '15')
+        if self.standup_end <= self.standup_start:
+            raise ConfigError("STANDUP_END must be after STANDUP_START")
+
+        # Async Update Cutoff Time (when to stop checking for async updates)
+        # Default is standup start time, but can be set independently
+        self.async_cutoff = self._time(env, 'ASYNC_CUTOFF', *map(str, self.standup_start))
+
+        # Pre-standup Check Time (when to check async updates before standup)
+        self.precheck = self._time(env, 'PRECHECK', '10', '55')
+
+        # Team Members (Optional - for tracking absent members)
+        # Example: TEAM_MEMBER_IDS=123456789012345678,234567890123456789
+        try:
+            self.team_member_ids = [int(member_id) for member_id in _csv(env, 'TEAM_MEMBER_IDS')]
+        except ValueError:
+            raise ConfigError("TEAM_MEMBER_IDS must be comma-separated Discord user IDs") from None
+
+        # Email Configuration (Required for email summaries)
+        self.from_email = _get(env, 'FROM_EMAIL')
+        self.to_emails = _csv(env, 'TO_EMAILS')
+        self.resend_api_key = _get(env, 'RESEND_API_KEY')
+
+        # Email transport: 'resend' (default) or 'stub' (logs emails locally instead of sending)
+        self.email_transport = _get(env, 'EMAIL_TRANSPORT', 'resend').lower()
+        if self.email_transport not in EMAIL_TRANSPORTS:
+            raise ConfigError(f"EMAIL_TRANSPORT must be one of {', '.join(EMAIL_TRANSPORTS)}")
+
+        # End-of-standup fan-out: seconds each sink may take (default, then sink=SECONDS overrides)
+        # and optional extra sinks for the saved record (webhook URLs, a directory of JSON files)
+        self.finalize_timeout = _int(env, 'FINALIZE_TIMEOUT', '30', 1, 3600)
+        self.finalize_timeouts = {}
+        for item in _csv(env, 'FINALIZE_TIMEOUTS'):
+            name, sep, seconds = item.partition('=')
+            if not sep or name.strip() not in FINALIZE_SINKS:
+                raise ConfigError(f"FINALIZE_TIMEOUTS entry {item!r} must look like sink=SECONDS, "
+                                  f"sink one of {', '.join(FINALIZE_SINKS)}")
+            self.finalize_timeouts[name.strip()] = _int({'FINALIZE_TIMEOUTS': seconds}, 'FINALIZE_TIMEOUTS', low=1, high=3600)
+        self.finalize_webhook_urls = _csv(env, 'FINALIZE_WEBHOOK_URLS')
+        self.finalize_export_dir = _get(env, 'FINALIZE_EXPORT_DIR')
+
+        # Async Update Parsing
+        self.update_languages = _csv(env, 'UPDATE_LANGUAGES') or ['en']
+        unknown = set(self.update_languages) - set(UPDATE_LANGUAGE_CODES)
+        if unknown:
+            raise ConfigError(f"UPDATE_LANGUAGES has unsupported language(s): {', '.join(sorted(unknown))}")
+        self.update_keywords_file = _get(env, 'UPDATE_KEYWORDS_FILE')
+        self.update_keywords = _keywords_file(self.update_keywords_file) if self.update_keywords_file else {}
+
+        # Slash command sync: only when the command tree changed, optionally to one guild (instant, for development)
+        self.command_sync_guild_id = _int(env, 'COMMAND_SYNC_GUILD_ID', '0', low=0) or None
+        self.force_command_sync = _bool(env, 'FORCE_COMMAND_SYNC')
+
+        # Prometheus metrics endpoint (0 = disabled); read at startup only
+        self.metrics_port = _int(env, 'METRICS_PORT', '0', 0, 65535)
+        self.metrics_host = _get(env, 'METRICS_HOST', '127.0.0.1')
+
+        # Logging: default level, per-module overrides (module=LEVEL,...) and 'text' or 'json' output
+        self.log_level = _level('LOG_LEVEL', _get(env, 'LOG_LEVEL', 'INFO'))
+        self.log_levels = {}
+        for item in _csv(env, 'LOG_LEVELS'):
+            name, sep, level = item.partition('=')
+            if not sep or not name.strip():
+                raise ConfigError(f"LOG_LEVELS entry {item!r} must look like module=LEVEL")
+            self.log_levels[name.strip()] = _level('LOG_LEVELS', level)
+        self.log_format = _get(env, 'LOG_FORMAT', 'text').lower()
+        if self.log_format not in LOG_FORMATS:
+            raise ConfigError(f"LOG_FORMAT must be one of {', '.join(LOG_FORMATS)}")
+
+        # Tracing: finished spans kept for /export_trace (0 = tracing off)
+        self.trace_buffer_size = _int(env, 'TRACE_BUFFER_SIZE', '10000', 0, 1_000_000)
+
+        # Record tracked gateway events to a JSONL file for benchmarks/replay.py (unset = off); read at startup only
+        self.record_events_file = _get(env, 'RECORD_EVENTS_FILE')
+
+    @staticmethod
+    def _time(env, prefix, default_hour, default_minute):
+        return (_int(env, f'{prefix}_HOUR', default_hour, 0, 23),
+                _int(env, f'{prefix}_MINUTE', default_minute, 0, 59))
+
+    @classmethod
+    def load(cls, env_file=ENV_FILE):
+        """Read settings from the process environment, falling back to the .env file"""
+        env = dotenv_values(env_file) if os.path.exists(env_file) else {}
+        env.update(_PROCESS_ENV)
+        return cls(env)
+
+    def update(self, other):
+        """Take over another Settings' values; returns the names of the fields that changed"""
+        changed = {name for name, value in vars(other).items() if getattr(self, name, None) != value}
+        self.__dict__.update(vars(other))
+        return changed
+
+    def warn_missing(self):
+        if not self.team_member_ids:
+            log.warning("⚠️  TEAM_MEMBER_IDS not set - absence tracking disabled")
+        if not self.to_emails:
+            log.warning("⚠️  TO_EMAILS not set - email summaries disabled")
+        if not self.from_email:
+            log.warning("⚠️  FROM_EMAIL not set - email summaries disabled")
+        if not self.resend_api_key:
+            log.warning("⚠️  RESEND_API_KEY not set - email summaries disabled")
+
+
+try:
+    settings = Settings.load()
+except ConfigError as e:
+    print(f"❌ Configuration error: {e}")
+    raise SystemExit(1)
@@ -1,63 +1,141 @@
 import discord
 from discord.ext import commands
-import asyncio
-import json
-import os
-from datetime import datetime
-from config import TIMEZONE, STANDUP_START_HOUR, STANDUP_START_MINUTE, STANDUP_END_HOUR, STANDUP_END_MINUTE
+import io
+import logging
+import time
+from src.core import clock
+
+log = logging.getLogger(__name__)
 
 
 def register_commands(bot):
     """Register all bot commands"""
 
+    async def resolve_team(ctx, team_name):
+        """Team named in the command, else the team owning this channel, else the default"""
+        team = bot.get_team(team_name, ctx.channel.id)
+        if not team:
+            await bot.outbound.send(ctx.channel, f"❌ Unknown team: {team_name}", urgent=True)
+        return team
+
     @bot.command(name='test_standup')
     @commands.has_permissions(administrator=True)
-    async def test_standup(ctx):
+    async def test_standup(ctx, team_name: str = None):
         """Test standup manually (Admin only)"""
         from src.core.utils import start_standup, end_standup
 
-        if not bot.is_standup_active:
-            bot.is_standup_active = True
+        team = await resolve_team(ctx, team_name)
+        if not team:
+            return
+
+        if not team.is_standup_active:
+            team.is_standup_active = True
 
             # Check for async updates first
-            await ctx.send("🔍 Checking for async updates...")
-            bot.tracker.async_updates_today = await bot.tracker.check_day_highlights()
+            await bot.outbound.send(ctx.channel, "🔍 Checking for async updates...", urgent=True)
+            team.tracker.async_updates_today = await team.tracker.check_day_highlights()
 
             # Send status message
-            async_count = len(bot.tracker.async_updates_today)
-            await ctx.send(
+            async_count = len(team.tracker.async_updates_today)
+            await bot.outbound.send(
+                ctx.channel,
                 f"✅ Found {async_count} async update(s)\n"
-                f"⏱️ Standup test started! Will end in 30 seconds..."
+                f"⏱️ Standup test started! Will end in 30 seconds...",
+                urgent=True
             )
 
-            await start_standup(bot)
+            await start_standup(bot, team)
 
             # Auto-end after 30 seconds for testing
-            await asyncio.sleep(30)
-            await end_standup(bot)
-            bot.is_standup_active = False
+            await clock.sleep(30)
+            await end_standup(bot, team)
+            team.is_standup_active = False
         else:
-            await ctx.send("⚠️ Standup is already active!")
+            await bot.outbound.send(ctx.channel, "⚠️ Standup is already active!", urgent=True)
 
     @bot.command(name='force_end_standup')
     @commands.has_permissions(administrator=True)
-    async def force_end_standup(ctx):
+    async def force_end_standup(ctx, team_name: str = None):
         """Force end the current standup session (Admin only)"""
         from src.core.utils import end_standup
 
-        if bot.is_standup_active:
-            await ctx.send("🛑 Force ending standup session...")
-            await end_standup(bot)
-            bot.is_standup_active = False
-            await ctx.send("✅ Standup session ended successfully!")
+        team = await resolve_team(ctx, team_name)
+        if not team:
+            return
+
+        if team.is_standup_active:
+            await bot.outbound.send(ctx.channel, "🛑 Force ending standup session...", urgent=True)
+            await end_standup(bot, team)
+            team.is_standup_active = False
+            await bot.outbound.send(ctx.channel, "✅ Standup session ended successfully!", urgent=True)
+        else:
+            await bot.outbound.send(ctx.channel, "ℹ️ No active standup session to end.", urgent=True)
+
+    @bot.command(name='reload_config')
+    @commands.has_permissions(administrator=True)
+    async def reload_config_command(ctx):
+        """Reload .env and the teams file without restarting (Admin only)"""
+        from config import ConfigError
+        from src.core.config_reload import reload_config
+
+        try:
+            changes = reload_config(bot)
+        except ConfigError as e:
+            await bot.outbound.send(ctx.channel, f"❌ Configuration reload failed, keeping the current settings: {e}",
+                                    urgent=True)
+            return
+
+        if changes:
+            await bot.outbound.send(ctx.channel, "🔄 Configuration reloaded:\n" + "\n".join(f"• {change}" for change in changes),
+                                    urgent=True)
         else:
-            await ctx.send("ℹ️ No active standup session to end.")
+            await bot.outbound.send(ctx.channel, "🔄 Configuration reloaded - no changes", urgent=True)
+
+    @bot.command(name='log_level')
+    @commands.has_permissions(administrator=True)
+    async def log_level_command(ctx, logger_name: str = None, level: str = None):
+        """Show log levels, or set one module's level until the next restart/reload (Admin only)"""
+        from src.core.logs import set_level, configured_levels
+
+        if logger_name and level:
+            try:
+                name = set_level(logger_name, level)
+            except ValueError as e:
+                await bot.outbound.send(ctx.channel, f"❌ {e}", urgent=True)
+                return
+            await bot.outbound.send(ctx.channel, f"🪵 {name} now logs at {level.upper()}", urgent=True)
+            return
+
+        levels = configured_levels()
+        await bot.outbound.send(ctx.channel, "🪵 Log levels:\n" + "\n".join(f"• {name}: {value}" for name, value in levels.items()),
+                                urgent=True)
+
+    @bot.command(name='export_trace')
+    @commands.has_permissions(administrator=True)
+    async def export_trace_command(ctx):
+        """Download the recent tracing spans as a Chrome trace (Admin only)"""
+        from src.core.tracing import tracer
+
+        if not tracer.spans:
+            note = "" if tracer.enabled else " (tracing is off: TRACE_BUFFER_SIZE=0)"
+            await bot.outbound.send(ctx.channel, f"ℹ️ No spans recorded yet{note}", urgent=True)
+            return
+        trace_file = discord.File(io.BytesIO(tracer.export()), filename=f"standup_trace_{time.strftime('%Y%m%d-%H%M%S')}.json")
+        await bot.outbound.send(ctx.channel,
+                                f"🧵 {len(tracer.spans)} span(s) - open in chrome://tracing or https://ui.perfetto.dev",
+                                file=trace_file, urgent=True)
 
     @bot.command(name='attendance')
-    async def check_attendance(ctx):
+    async def check_attendance(ctx, team_name: str = None):
         """Check current standup attendance"""
-        if bot.is_standup_active:
-            current = await bot.tracker.track_attendance()
+        team = await resolve_team(ctx, team_name)
+        if not team:
+            return
+
+        # A newer snapshot replaces one still waiting to be sent in this channel
+        key = f"attendance:{team.id}"
+        if team.is_standup_active:
+            current = await team.tracker.track_attendance()
             if current:
                 names = [m['name'] for m in current]
                 embed = discord.Embed(
@@ -66,16 +144,20 @@ def register_commands(bot):
                                "\n".join(f"• {name}" for name in names),
                     color=discord.Color.blue()
                 )
-                await ctx.send(embed=embed)
+                await bot.outbound.send(ctx.channel, embed=embed, key=key, urgent=True)
             else:
-                await ctx.send("No one is currently in the standup channel.")
+                await bot.outbound.send(ctx.channel, "No one is currently in the standup channel.", key=key, urgent=True)
         else:
-            await ctx.send("Standup is not currently active.")
+            await bot.outbound.send(ctx.channel, "Standup is not currently active.", key=key, urgent=True)
 
     @bot.command(name='async_check')
-    async def check_async(ctx):
+    async def check_async(ctx, team_name: str = None):
         """Check today's async updates"""
-        updates = await bot.tracker.check_day_highlights()
+        team = await resolve_team(ctx, team_name)
+        if not team:
+            return
+
+        updates = await team.tracker.check_day_highlights()
         if updates:
             embed = discord.Embed(
                 title="📝 Today's Async Updates",
@@ -90,38 +172,36 @@ def register_commands(bot):
                     inline=False
                 )
 
-            await ctx.send(embed=embed)
+            await bot.outbound.send(ctx.channel, embed=embed, urgent=True)
         else:
-            await ctx.send("No async updates found for today before cutoff time.")
+            await bot.outbound.send(ctx.channel, "No async updates found for today before cutoff time.", urgent=True)
 
     @bot.command(name='standup_stats')
-    async def standup_stats(ctx, days: int = 7):
+    async def standup_stats(ctx, days: int = 7, team_name: str = None):
         """Get standup statistics for the last N days"""
-        # Load attendance records
-        current_month = datetime.now(TIMEZONE).strftime("%Y_%m")
-        filename = f'data/attendance_{current_month}.json'
+        from src.core.utils import last_n_days
 
-        if not os.path.exists(filename):
-            await ctx.send("No attendance data available yet.")
+        team = await resolve_team(ctx, team_name)
+        if not team:
             return
 
-        with open(filename, 'r') as f:
-            records = json.load(f)
-
-        # Get last N days of records
-        recent_records = records[-days:] if len(records) > days else records
+        # Daily rollups for the last N calendar days, across month boundaries
+        start_date, end_date = last_n_days(team, days)
+        stats = bot.store.team_stats(team.id, start_date, end_date)
+        recent_records = stats['daily']
 
         if not recent_records:
-            await ctx.send("No records found.")
+            await bot.outbound.send(ctx.channel, f"No attendance data for the last {days} days.", urgent=True)
             return
 
         # Calculate statistics
-        total_voice = sum(r['voice_count'] for r in recent_records)
-        total_async = sum(r['async_count'] for r in recent_records)
-        avg_participation = sum(r['total_participation'] for r in recent_records) / len(recent_records)
+        total_voice = stats['total_voice']
+        total_async = stats['total_async']
+        avg_participation = stats['total_participation'] / stats['days']
 
         embed = discord.Embed(
-            title=f"📈 Standup Statistics (Last {len(recent_records)} days)",
+            title=f"📈 Standup Statistics (Last {days} days)",
+            description=f"**Standup Days:** {stats['days']} ({start_date} to {end_date})",
             color=discord.Color.blue()
         )
 
@@ -148,7 +228,36 @@ def register_commands(bot):
                 inline=False
             )
 
-        await ctx.send(embed=embed)
+        await bot.outbound.send(ctx.channel, embed=embed, urgent=True)
+
+    @bot.command(name='member_stats')
+    async def member_stats(ctx, member: discord.Member = None, days: int = 30, team_name: str = None):
+        """Participation rate, streaks and lateness for a member over the last N days"""
+        from src.core.utils import last_n_days, build_member_stats_embed
+
+        team = await resolve_team(ctx, team_name)
+        if not team:
+            return
+
+        member = member or ctx.author
+        start_date, end_date = last_n_days(team, days)
+        stats = bot.analytics.matrix(team.id).member_stats(member.id, start_date, end_date)
+        await bot.outbound.send(ctx.channel, embed=build_member_stats_embed(member.display_name, stats, days), urgent=True)
+
+    @bot.command(name='team_leaderboard')
+    async def team_leaderboard(ctx, days: int = 30, team_name: str = None):
+        """Rank team members by participation over the last N days"""
+        from src.core.utils import last_n_days, build_leaderboard_embed
+
+        team = await resolve_team(ctx, team_name)
+        if not team:
+            return
+
+        start_date, end_date = last_n_days(team, days)
+        ranked = bot.analytics.matrix(team.id).leaderboard(start_date, end_date, team.member_ids)
+        if ctx.guild:
+            await bot.member_cache.resolve(ctx.guild, [member_id for member_id, _ in ranked])
+        await bot.outbound.send(ctx.channel, embed=build_leaderboard_embed(ctx.guild, ranked, days), urgent=True)
 
     @bot.command(name='help_standup')
     async def help_standup(ctx):
@@ -160,34 +269,39 @@ def register_commands(bot):
         )
 
         commands_list = [
-            ("!attendance", "Check current standup attendance"),
-            ("!async_check", "View today's async updates"),
-            ("!standup_stats [days]", "Get statistics for last N days (default: 7)"),
-            ("!test_standup", "Test standup manually (Admin only)"),
-            ("!force_end_standup", "Force end current standup (Admin only)"),
+            ("!attendance [team]", "Check current standup attendance"),
+            ("!async_check [team]", "View today's async updates"),
+            ("!standup_stats [days] [team]", "Get statistics for last N days (default: 7)"),
+            ("!member_stats [@member] [days] [team]", "Participation, streaks and lateness (default: you, 30 days)"),
+            ("!team_leaderboard [days] [team]", "Rank members by participation (default: 30 days)"),
+            ("!test_standup [team]", "Test standup manually (Admin only)"),
+            ("!force_end_standup [team]", "Force end current standup (Admin only)"),
+            ("!reload_config", "Reload .env and the teams file without restarting (Admin only)"),
+            ("!export_trace", "Download recent tracing spans as a Chrome trace (Admin only)"),
+            ("!log_level [module] [level]", "Show or change log levels, e.g. `!log_level src.core.tracker DEBUG` (Admin only)"),
             ("!help_standup", "Show this help message")
         ]
 
         for cmd, desc in commands_list:
             embed.add_field(name=cmd, value=desc, inline=False)
 
-        embed.add_field(
-            name="Schedule",
-            value=f"**Daily Standup:** {STANDUP_START_HOUR:02d}:{STANDUP_START_MINUTE:02d} - "
-                  f"{STANDUP_END_HOUR:02d}:{STANDUP_END_MINUTE:02d} (Asia/Dhaka)\n"
-                  f"**Async Cutoff:** {STANDUP_START_HOUR:02d}:{STANDUP_START_MINUTE:02d}",
-            inline=False
-        )
+        for team in bot.teams.values():
+            embed.add_field(
+                name=f"Schedule - {team.name}" if len(bot.teams) > 1 else "Schedule",
+                value=f"**Daily Standup:** {team.schedule_label}\n"
+                      f"**Async Cutoff:** {team.cutoff_hour:02d}:{team.cutoff_minute:02d}",
+                inline=False
+            )
 
-        await ctx.send(embed=embed)
+        await bot.outbound.send(ctx.channel, embed=embed, urgent=True)
 
     @bot.event
     async def on_command_error(ctx, error):
         """Error handling"""
         if isinstance(error, commands.MissingPermissions):
-            await ctx.send("❌ You don't have permission to use this command.")
+            await bot.outbound.send(ctx.channel, "❌ You don't have permission to use this command.", urgent=True)
         elif isinstance(error, commands.CommandNotFound):
             pass  # Ignore unknown commands
         else:
-            print(f"Error: {error}")
-            await ctx.send(f"An error occurred: {str(error)}")
+            log.error("Command %s failed: %s", ctx.command, error, exc_info=error)
+            await bot.outbound.send(ctx.channel, f"An error occurred: {str(error)}", urgent=True)
@@ -1,19 +1,35 @@
 import discord
+import io
+import logging
+import time
 from discord import app_commands
-import json
-import os
-from datetime import datetime
-from config import TIMEZONE, STANDUP_START_HOUR, STANDUP_START_MINUTE, STANDUP_END_HOUR, STANDUP_END_MINUTE
+from config import LOG_LEVEL_NAMES
+from src.core import clock
+from src.core.tracing import tracer
+
+log = logging.getLogger(__name__)
 
 
 def register_slash_commands(bot):
     """Register slash commands for the bot"""
 
+    async def resolve_team(interaction, team_name):
+        """Team named in the command, else the team owning this channel, else the default"""
+        team = bot.get_team(team_name, interaction.channel_id)
+        if not team:
+            await interaction.response.send_message(f"❌ Unknown team: {team_name}", ephemeral=True)
+        return team
+
     @bot.tree.command(name="attendance", description="Check current standup attendance")
-    async def attendance_slash(interaction: discord.Interaction):
+    @app_commands.describe(team="Team name (default: this channel's team)")
+    async def attendance_slash(interaction: discord.Interaction, team: str = None):
         """Check current standup attendance"""
-        if bot.is_standup_active:
-            current = await bot.tracker.track_attendance()
+        team = await resolve_team(interaction, team)
+        if not team:
+            return
+
+        if team.is_standup_active:
+            current = await team.tracker.track_attendance()
             if current:
                 names = [m['name'] for m in current]
                 embed = discord.Embed(
@@ -29,11 +45,16 @@ def register_slash_commands(bot):
             await interaction.response.send_message("Standup is not currently active.")
 
     @bot.tree.command(name="async_check", description="Check today's async updates")
-    async def async_check_slash(interaction: discord.Interaction):
+    @app_commands.describe(team="Team name (default: this channel's team)")
+    async def async_check_slash(interaction: discord.Interaction, team: str = None):
         """Check today's async updates"""
+        team = await resolve_team(interaction, team)
+        if not team:
+            return
+
         await interaction.response.defer()
 
-        updates = await bot.tracker.check_day_highlights()
+        updates = await team.tracker.check_day_highlights()
         if updates:
             embed = discord.Embed(
                 title="📝 Today's Async Updates",
@@ -53,36 +74,35 @@ def register_slash_commands(bot):
             await interaction.followup.send("No async updates found for today before cutoff time.")
 
     @bot.tree.command(name="standup_stats", description="Get standup statistics")
-    @app_commands.describe(days="Number of days to include (default: 7)")
-    async def standup_stats_slash(interaction: discord.Interaction, days: int = 7):
+    @app_commands.describe(days="Number of days to include (default: 7)",
+                           team="Team name (default: this channel's team)")
+    async def standup_stats_slash(interaction: discord.Interaction, days: int = 7, team: str = None):
         """Get standup statistics for the last N days"""
-        await interaction.response.defer()
-
-        # Load attendance records
-        current_month = datetime.now(TIMEZONE).strftime("%Y_%m")
-        filename = f'data/attendance_{current_month}.json'
+        from src.core.utils import last_n_days
 
-        if not os.path.exists(filename):
-            await interaction.followup.send("No attendance data available yet.")
+        team = await resolve_team(interaction, team)
+        if not team:
             return
 
-        with open(filename, 'r') as f:
-            records = json.load(f)
+        await interaction.response.defer()
 
-        # Get last N days of records
-        recent_records = records[-days:] if len(records) > days else records
+        # Daily rollups for the last N calendar days, across month boundaries
+        start_date, end_date = last_n_days(team, days)
+        stats = bot.store.team_stats(team.id, start_date, end_date)
+        recent_records = stats['daily']
 
         if not recent_records:
-            await interaction.followup.send("No records found.")
+            await interaction.followup.send(f"No attendance data for the last {days} days.")
             return
 
         # Calculate statistics
-        total_voice = sum(r['voice_count'] for r in recent_records)
-        total_async = sum(r['async_count'] for r in recent_records)
-        avg_participation = sum(r['total_participation'] for r in recent_records) / len(recent_records)
+        total_voice = stats['total_voice']
+        total_async = stats['total_async']
+        avg_participation = stats['total_participation'] / stats['days']
 
         embed = discord.Embed(
-            title=f"📈 Standup Statistics (Last {len(recent_records)} days)",
+            title=f"📈 Standup Statistics (Last {days} days)",
+            description=f"**Standup Days:** {stats['days']} ({start_date} to {end_date})",
             color=discord.Color.blue()
         )
 
@@ -111,33 +131,132 @@ def register_slash_commands(bot):
 
         await interaction.followup.send(embed=embed)
 
+    @bot.tree.command(name="member_stats", description="Participation, streaks and lateness for a member")
+    @app_commands.describe(member="Member to look up (default: you)",
+                           days="Number of days to include (default: 30)",
+                           team="Team name (default: this channel's team)")
+    async def member_stats_slash(interaction: discord.Interaction, member: discord.Member = None,
+                                 days: int = 30, team: str = None):
+        """Participation rate, streaks and lateness for a member over the last N days"""
+        from src.core.utils import last_n_days, build_member_stats_embed
+
+        team = await resolve_team(interaction, team)
+        if not team:
+            return
+
+        await interaction.response.defer()
+
+        member = member or interaction.user
+        start_date, end_date = last_n_days(team, days)
+        stats = bot.analytics.matrix(team.id).member_stats(member.id, start_date, end_date)
+        await interaction.followup.send(embed=build_member_stats_embed(member.display_name, stats, days))
+
+    @bot.tree.command(name="team_leaderboard", description="Rank team members by participation")
+    @app_commands.describe(days="Number of days to include (default: 30)",
+                           team="Team name (default: this channel's team)")
+    async def team_leaderboard_slash(interaction: discord.Interaction, days: int = 30, team: str = None):
+        """Rank team members by participation over the last N days"""
+        from src.core.utils import last_n_days, build_leaderboard_embed
+
+        team = await resolve_team(interaction, team)
+        if not team:
+            return
+
+        await interaction.response.defer()
+
+        # Building the matrix and resolving members (lean cache mode) can outlast Discord's 3s reply window
+        start_date, end_date = last_n_days(team, days)
+        ranked = bot.analytics.matrix(team.id).leaderboard(start_date, end_date, team.member_ids)
+        if interaction.guild:
+            await bot.member_cache.resolve(interaction.guild, [member_id for member_id, _ in ranked])
+        await interaction.followup.send(embed=build_leaderboard_embed(interaction.guild, ranked, days))
+
+    @bot.tree.command(name="reload_config", description="Reload .env and the teams file without restarting (Admin only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def reload_config_slash(interaction: discord.Interaction):
+        """Reload .env and the teams file without restarting (Admin only)"""
+        from config import ConfigError
+        from src.core.config_reload import reload_config
+
+        try:
+            changes = reload_config(bot)
+        except ConfigError as e:
+            await interaction.response.send_message(
+                f"❌ Configuration reload failed, keeping the current settings: {e}", ephemeral=True
+            )
+            return
+
+        if changes:
+            await interaction.response.send_message(
+                "🔄 Configuration reloaded:\n" + "\n".join(f"• {change}" for change in changes)
+            )
+        else:
+            await interaction.response.send_message("🔄 Configuration reloaded - no changes")
+
+    @bot.tree.command(name="log_level", description="Show log levels, or set one module's level (Admin only)")
+    @app_commands.describe(module="Logger name, e.g. src.core.tracker or discord (root for the default)",
+                           level="New level (leave empty to list the current levels)")
+    @app_commands.choices(level=[app_commands.Choice(name=name, value=name) for name in LOG_LEVEL_NAMES])
+    @app_commands.checks.has_permissions(administrator=True)
+    async def log_level_slash(interaction: discord.Interaction, module: str = None, level: str = None):
+        """Show log levels, or set one module's level until the next restart/reload (Admin only)"""
+        from src.core.logs import set_level, configured_levels
+
+        if module and level:
+            name = set_level(module, level)
+            await interaction.response.send_message(f"🪵 {name} now logs at {level}", ephemeral=True)
+            return
+
+        levels = configured_levels()
+        await interaction.response.send_message(
+            "🪵 Log levels:\n" + "\n".join(f"• {name}: {value}" for name, value in levels.items()), ephemeral=True
+        )
+
+    @bot.tree.command(name="export_trace", description="Download the recent tracing spans as a Chrome trace (Admin only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def export_trace_slash(interaction: discord.Interaction):
+        """Download the recent tracing spans as a Chrome trace (Admin only)"""
+        if not tracer.spans:
+            note = "" if tracer.enabled else " (tracing is off: TRACE_BUFFER_SIZE=0)"
+            await interaction.response.send_message(f"ℹ️ No spans recorded yet{note}", ephemeral=True)
+            return
+        trace_file = discord.File(io.BytesIO(tracer.export()), filename=f"standup_trace_{time.strftime('%Y%m%d-%H%M%S')}.json")
+        await interaction.response.send_message(
+            f"🧵 {len(tracer.spans)} span(s) - open in chrome://tracing or https://ui.perfetto.dev",
+            file=trace_file, ephemeral=True
+        )
+
     @bot.tree.command(name="test_standup", description="Test standup manually (Admin only)")
+    @app_commands.describe(team="Team name (default: this channel's team)")
     @app_commands.checks.has_permissions(administrator=True)
-    async def test_standup_slash(interaction: discord.Interaction):
+    async def test_standup_slash(interaction: discord.Interaction, team: str = None):
         """Test standup manually (Admin only)"""
         from src.core.utils import start_standup, end_standup
-        import asyncio
 
-        if not bot.is_standup_active:
-            bot.is_standup_active = True
+        team = await resolve_team(interaction, team)
+        if not team:
+            return
+
+        if not team.is_standup_active:
+            team.is_standup_active = True
 
             # Check for async updates first
             await interaction.response.send_message("🔍 Checking for async updates...")
-            bot.tracker.async_updates_today = await bot.tracker.check_day_highlights()
+            team.tracker.async_updates_today = await team.tracker.check_day_highlights()
 
             # Send status message
-            async_count = len(bot.tracker.async_updates_today)
+            async_count = len(team.tracker.async_updates_today)
             await interaction.followup.send(
                 f"✅ Found {async_count} async update(s)\n"
                 f"⏱️ Standup test started! Will end in 30 seconds..."
             )
 
-            await start_standup(bot)
+            await start_standup(bot, team)
 
             # Auto-end after 30 seconds for testing
-            await asyncio.sleep(30)
-            await end_standup(bot)
-            bot.is_standup_active = False
+            await clock.sleep(30)
+            await end_standup(bot, team)
+            team.is_standup_active = False
         else:
             await interaction.response.send_message("⚠️ Standup is already active!")
 
@@ -154,20 +273,25 @@ def register_slash_commands(bot):
             ("</attendance:0>", "Check current standup attendance"),
             ("</async_check:0>", "View today's async updates"),
             ("</standup_stats:0>", "Get statistics for last N days (default: 7)"),
+            ("</member_stats:0>", "Participation, streaks and lateness for a member"),
+            ("</team_leaderboard:0>", "Rank team members by participation"),
             ("</test_standup:0>", "Test standup manually (Admin only)"),
+            ("</reload_config:0>", "Reload .env and the teams file without restarting (Admin only)"),
+            ("</export_trace:0>", "Download recent tracing spans as a Chrome trace (Admin only)"),
+            ("</log_level:0>", "Show or change log levels per module (Admin only)"),
             ("</help:0>", "Show this help message")
         ]
 
         for cmd, desc in commands_list:
             embed.add_field(name=cmd, value=desc, inline=False)
 
-        embed.add_field(
-            name="📅 Schedule",
-            value=f"**Daily Standup:** {STANDUP_START_HOUR:02d}:{STANDUP_START_MINUTE:02d} - "
-                  f"{STANDUP_END_HOUR:02d}:{STANDUP_END_MINUTE:02d} (Asia/Dhaka)\n"
-                  f"**Async Cutoff:** {STANDUP_START_HOUR:02d}:{STANDUP_START_MINUTE:02d}",
-            inline=False
-        )
+        for team in bot.teams.values():
+            embed.add_field(
+                name=f"📅 Schedule - {team.name}" if len(bot.teams) > 1 else "📅 Schedule",
+                value=f"**Daily Standup:** {team.schedule_label}\n"
+                      f"**Async Cutoff:** {team.cutoff_hour:02d}:{team.cutoff_minute:02d}",
+                inline=False
+            )
 
         embed.add_field(
             name="📝 Async Update Format",
@@ -180,10 +304,12 @@ def register_slash_commands(bot):
     # Error handler for slash commands
     @bot.tree.error
     async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+        tracer.finish(interaction.extras.get('span'), error)
         if isinstance(error, app_commands.errors.MissingPermissions):
             await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
         else:
-            print(f"Slash command error: {error}")
+            log.error("Slash command %s failed: %s", interaction.command and interaction.command.name, error,
+                      exc_info=error)
             if not interaction.response.is_done():
                 await interaction.response.send_message(f"An error occurred: {str(error)}", ephemeral=True)
             else:
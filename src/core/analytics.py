@@ -0,0 +1,166 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+NO_LATENESS = -1
+
+
+def _bits_in(mask, lo, hi):
+    """Bits lo..hi-1 of mask, shifted down to start at bit 0"""
+    return (mask >> lo) & ((1 << (hi - lo)) - 1)
+
+
+def _current_streak(bits, width):
+    """Consecutive set bits counting down from the top (most recent) column"""
+    missed = ~bits & ((1 << width) - 1)
+    if not missed:
+        return width
+    return width - missed.bit_length()
+
+
+def _longest_streak(bits):
+    """Longest run of set bits (each AND with itself shifted drops one bit from every run)"""
+    longest = 0
+    while bits:
+        bits &= bits << 1
+        longest += 1
+    return longest
+
+
+class ParticipationMatrix:
+    """A team's member × standup-day participation matrix.
+
+    Columns are the days the team held a standup, in date order. Each member's
+    row is stored as a Python int used as a bitset (bit i = column i) for voice
+    and for async participation, so range queries are a shift, a mask and a
+    popcount rather than a walk over records. Join lateness is kept in one
+    array per member, aligned with the columns.
+    """
+
+    def __init__(self):
+        self.days = []    # ISO dates, ascending
+        self.voice = {}   # member_id -> bitset
+        self.async_ = {}  # member_id -> bitset
+        self.late = {}    # member_id -> array of late seconds per column (NO_LATENESS if none)
+
+    @classmethod
+    def from_rows(cls, days, member_rows):
+        """Build from standup dates and (member_id, date, voice, async, late_seconds) rows"""
+        matrix = cls()
+        matrix.days = list(days)
+        column = {day: i for i, day in enumerate(matrix.days)}
+        size = (len(matrix.days) + 7) // 8
+
+        # Fill byte buffers first and convert once; OR-ing into a growing int per row is quadratic
+        voice_bytes, async_bytes = {}, {}
+        for member_id, day, voice, is_async, late_seconds in member_rows:
+            col = column.get(day)
+            if col is None:
+                continue
+            for flag, buffers in ((voice, voice_bytes), (is_async, async_bytes)):
+                if flag:
+                    buffer = buffers.get(member_id)
+                    if buffer is None:
+                        buffer = buffers[member_id] = bytearray(size)
+                    buffer[col >> 3] |= 1 << (col & 7)
+            if late_seconds is not None:
+                matrix._late_row(member_id)[col] = late_seconds
+
+        matrix.voice = {member_id: int.from_bytes(buffer, 'little') for member_id, buffer in voice_bytes.items()}
+        matrix.async_ = {member_id: int.from_bytes(buffer, 'little') for member_id, buffer in async_bytes.items()}
+        return matrix
+
+    def _late_row(self, member_id):
+        row = self.late.get(member_id)
+        if row is None:
+            row = self.late[member_id] = array('l', [NO_LATENESS]) * len(self.days)
+        return row
+
+    def _set(self, member_id, col, voice, is_async, late_seconds):
+        bit = 1 << col
+        if voice:
+            self.voice[member_id] = self.voice.get(member_id, 0) | bit
+        if is_async:
+            self.async_[member_id] = self.async_.get(member_id, 0) | bit
+        if late_seconds is not None:
+            row = self._late_row(member_id)
+            if row[col] == NO_LATENESS or late_seconds < row[col]:
+                row[col] = late_seconds
+
+    def add_record(self, record):
+        """Fold in a newly saved record; returns False if it predates the matrix (rebuild needed)"""
+        day = record['date']
+        if self.days and day < self.days[-1]:
+            return False
+        if not self.days or day != self.days[-1]:
+            self.days.append(day)
+            for row in self.late.values():
+                row.append(NO_LATENESS)
+        col = len(self.days) - 1
+
+        late_joins = record.get('late_joins', {})
+        async_ids = {int(member_id) for member_id in record.get('async_updates', {})}
+        voice_ids = {int(member_id) for member_id in record.get('voice_attendance', [])}
+        for member_id in voice_ids | async_ids:
+            self._set(member_id, col, member_id in voice_ids, member_id in async_ids,
+                      late_joins.get(str(member_id)))
+        return True
+
+    def columns(self, start_date, end_date):
+        """Column range [lo, hi) covering the ISO dates start..end inclusive"""
+        return bisect_left(self.days, start_date), bisect_right(self.days, end_date)
+
+    def members(self):
+        return set(self.voice) | set(self.async_)
+
+    def member_stats(self, member_id, start_date, end_date):
+        """Participation, voice/async split, streaks and lateness for one member over a range"""
+        lo, hi = self.columns(start_date, end_date)
+        width = hi - lo
+        voice = _bits_in(self.voice.get(member_id, 0), lo, hi) if width else 0
+        async_ = _bits_in(self.async_.get(member_id, 0), lo, hi) if width else 0
+        participated = voice | async_
+
+        late_values = [value for value in self.late.get(member_id, ())[lo:hi] if value != NO_LATENESS]
+        return {
+            'standups': width,
+            'participated': participated.bit_count(),
+            'participation_rate': participated.bit_count() / width * 100 if width else 0.0,
+            'voice': voice.bit_count(),
+            'async_only': (async_ & ~voice).bit_count(),
+            'current_streak': _current_streak(participated, width) if width else 0,
+            'longest_streak': _longest_streak(participated),
+            'avg_lateness': sum(late_values) / len(late_values) if late_values else None,
+        }
+
+    def leaderboard(self, start_date, end_date, member_ids=None, limit=10):
+        """Members ranked by participation rate, then current streak, over a range"""
+        candidates = set(member_ids) if member_ids else self.members()
+        ranked = []
+        for member_id in candidates:
+            stats = self.member_stats(member_id, start_date, end_date)
+            ranked.append((member_id, stats))
+        ranked.sort(key=lambda item: (item[1]['participation_rate'], item[1]['current_streak']), reverse=True)
+        return ranked[:limit]
+
+
+class AnalyticsEngine:
+    """Per-team participation matrices, built once from the store and kept current on save"""
+
+    def __init__(self, store):
+        self.store = store
+        self._matrices = {}
+
+    def matrix(self, team_id):
+        matrix = self._matrices.get(team_id)
+        if matrix is None:
+            matrix = self._matrices[team_id] = ParticipationMatrix.from_rows(
+                self.store.standup_dates(team_id), self.store.member_daily_rows(team_id)
+            )
+        return matrix
+
+    def record_saved(self, record):
+        """Apply a saved record to its team's matrix, rebuilding if it lands before the last column"""
+        team_id = record['team']
+        matrix = self._matrices.get(team_id)
+        if matrix is not None and not matrix.add_record(record):
+            del self._matrices[team_id]
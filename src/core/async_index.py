@@ -0,0 +1,189 @@
+from datetime import date, datetime
+import pytz
+from src.core.update_parser import UpdateParser
+
+
+def message_time(message, timezone):
+    """A message's creation time in the given timezone"""
+    return message.created_at.replace(tzinfo=pytz.UTC).astimezone(timezone)
+
+
+class AsyncUpdateIndex:
+    """Per-day index of async updates, keyed by author, fed live from on_message.
+
+    Edits and deletes (raw gateway events) update entries in place, so the
+    index reflects each message's final content without rescanning history.
+    The index also tracks which stretches of time it has seen completely, so
+    callers know when (and from where) a history backfill is needed: before the
+    first connect, and across any disconnect/reconnect gap.
+    """
+
+    # Days of updates to keep in memory
+    RETAIN_DAYS = 2
+
+    def __init__(self, timezone, parser=None):
+        self.timezone = timezone
+        self.parser = parser or UpdateParser()
+        self.days = {}            # date -> {author_id: {message_id: (created_at, entry)}}
+        self.locations = {}       # message_id -> (date, author_id) for edit/delete lookups
+        self.covered_from = None  # complete coverage from this time onwards (minus gaps)
+        self.gaps = []            # [(start, end)] ranges missed while disconnected
+        self._disconnected_at = None
+
+    def mark_connected(self, now):
+        """Gateway (re)connected; live events are flowing again"""
+        if self.covered_from is None:
+            self.covered_from = now
+        elif self._disconnected_at is not None:
+            self.gaps.append((self._disconnected_at, now))
+        self._disconnected_at = None
+
+    def mark_resumed(self):
+        """Gateway session resumed; Discord replays missed events, so there's no gap"""
+        self._disconnected_at = None
+
+    def mark_disconnected(self, now):
+        """Gateway dropped; messages from now until reconnect must be backfilled"""
+        if self.covered_from is not None and self._disconnected_at is None:
+            self._disconnected_at = now
+
+    def missing_ranges(self, since, now):
+        """Time ranges after ``since`` that haven't been seen live or backfilled"""
+        if self.covered_from is None:
+            return [(since, now)]
+
+        ranges = []
+        if self.covered_from > since:
+            ranges.append((since, self.covered_from))
+        ranges.extend((max(start, since), end) for start, end in self.gaps if end > since)
+        if self._disconnected_at is not None:
+            ranges.append((max(self._disconnected_at, since), now))
+        return ranges
+
+    def mark_covered(self, since, now):
+        """Record that everything from ``since`` up to ``now`` has been backfilled"""
+        if self.covered_from is None or self.covered_from > since:
+            self.covered_from = since
+        self.gaps = [(start, end) for start, end in self.gaps if end <= since]
+        if self._disconnected_at is not None:
+            self._disconnected_at = now
+
+    def to_dict(self):
+        """JSON-safe copy of the indexed updates and coverage"""
+        return {
+            'covered_from': self.covered_from.isoformat() if self.covered_from else None,
+            'days': {
+                day.isoformat(): [
+                    [author_id, message_id, created_at.isoformat(), entry]
+                    for author_id, messages in authors.items()
+                    for message_id, (created_at, entry) in messages.items()
+                ]
+                for day, authors in self.days.items()
+            }
+        }
+
+    def restore(self, data, seen_until):
+        """Load a saved index; everything after ``seen_until`` is treated as a gap"""
+        self.days = {}
+        self.locations = {}
+        for day, rows in data.get('days', {}).items():
+            day = date.fromisoformat(day)
+            authors = self.days.setdefault(day, {})
+            for author_id, message_id, created_at, entry in rows:
+                created_at = datetime.fromisoformat(created_at).astimezone(self.timezone)
+                authors.setdefault(author_id, {})[message_id] = (created_at, entry)
+                self.locations[message_id] = (day, author_id)
+
+        covered_from = data.get('covered_from')
+        self.covered_from = datetime.fromisoformat(covered_from) if covered_from else None
+        self.gaps = []
+        self._disconnected_at = seen_until if self.covered_from else None
+
+    def add(self, message):
+        """Index a message if it's an async update; returns True if it was added"""
+        if message.author.bot:
+            return False
+        parsed = self.parser.parse(message.content)
+        if not parsed.is_update:
+            return False
+
+        # A backfill can re-see a message that was already edited live; keep its revision count
+        previous = self._get(message.id)
+        revisions = previous[1].get('revisions', 0) if previous else 0
+        self._put(message, parsed, revisions)
+        return True
+
+    def edit(self, message):
+        """Re-parse an edited message; returns True if the index changed.
+
+        An edit can turn a message into an update (e.g. the "today" part was
+        added later), change an update's sections, or turn it back into chatter.
+        """
+        if message.author.bot:
+            return False
+        previous = self._get(message.id)
+        if previous and previous[1]['message'] == message.content:
+            return False  # embed unfurls and pins also arrive as edits
+
+        parsed = self.parser.parse(message.content)
+        if not parsed.is_update:
+            return self.remove(message.id)
+
+        revisions = previous[1].get('revisions', 0) + 1 if previous else 1
+        self._put(message, parsed, revisions)
+        return True
+
+    def remove(self, message_id):
+        """Drop a deleted (or no longer valid) message; returns True if it was indexed"""
+        location = self.locations.pop(message_id, None)
+        if location is None:
+            return False
+        day, author_id = location
+        authors = self.days.get(day, {})
+        messages = authors.get(author_id, {})
+        messages.pop(message_id, None)
+        if not messages:
+            authors.pop(author_id, None)
+        return True
+
+    def _get(self, message_id):
+        location = self.locations.get(message_id)
+        if location is None:
+            return None
+        day, author_id = location
+        return self.days[day][author_id][message_id]
+
+    def _put(self, message, parsed, revisions):
+        created_at = message_time(message, self.timezone)
+        entry = {
+            'name': message.author.display_name,
+            'message': message.content,
+            'yesterday': parsed.yesterday,
+            'today': parsed.today,
+            'blockers': parsed.blockers,
+            'time': created_at.strftime("%H:%M"),
+            'message_id': message.id,
+            'revisions': revisions
+        }
+        day = self.days.setdefault(created_at.date(), {})
+        day.setdefault(message.author.id, {})[message.id] = (created_at, entry)
+        self.locations[message.id] = (created_at.date(), message.author.id)
+
+        self._prune(created_at.date())
+
+    def updates_for(self, day, cutoff):
+        """Earliest update per author on ``day`` posted before ``cutoff``"""
+        earliest = []
+        for author_id, messages in self.days.get(day, {}).items():
+            created_at, entry = min(messages.values(), key=lambda item: item[0])
+            if created_at < cutoff:
+                earliest.append((created_at, author_id, entry))
+        earliest.sort(key=lambda item: item[0])
+        return {author_id: dict(entry) for _, author_id, entry in earliest}
+
+    def _prune(self, latest):
+        for day in sorted(self.days)[:-self.RETAIN_DAYS]:
+            if day < latest:
+                for messages in self.days.pop(day).values():
+                    for message_id in messages:
+                        self.locations.pop(message_id, None)
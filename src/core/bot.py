@@ -1,40 +1,159 @@
+import asyncio
 import discord
+import logging
+import signal
+from discord import app_commands
 from discord.ext import commands
+from config import settings
+from src.core.analytics import AnalyticsEngine
+from src.core import metrics
+from src.core.command_sync import sync_command_tree
+from src.core.config_reload import reload_on_signal
+from src.core.gateway import GatewayRouting
+from src.core.history import HistoryScanner
+from src.core.journal import AttendanceJournal
+from src.core.members import MemberCache, configure_intents
+from src.core.outbound import OutboundQueue
+from src.core.outbox import EmailOutbox, ResendTransport, StubTransport
+from src.core.recorder import GatewayRecorder
+from src.core.storage import AttendanceStore
+from src.core.teams import DEFAULT_TEAM_ID
+from src.core.tracing import tracer
+from src.core.update_parser import UpdateParser
 
+log = logging.getLogger(__name__)
 
-class StandupBot(commands.Bot):
+
+class TracedCommandTree(app_commands.CommandTree):
+    """Opens a span for every slash command; on_app_command_completion or the error handler closes it"""
+
+    async def interaction_check(self, interaction):
+        if interaction.command:
+            span = tracer.start(f"command.{interaction.command.qualified_name}", kind='slash', user=interaction.user.id)
+            # The command runs in this task, so spans it starts nest under the command
+            tracer.activate(span)
+            interaction.extras['span'] = span
+        return True
+
+
+class StandupBot(GatewayRouting, commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.guilds = True
         intents.voice_states = True
-        intents.members = True
-        intents.presences = True
+        cache_options = configure_intents(intents)
 
-        super().__init__(command_prefix='!', intents=intents)
+        super().__init__(command_prefix='!', intents=intents, tree_cls=TracedCommandTree, **cache_options)
 
         self.attendance_data = {}
         self.async_updates = {}
-        self.is_standup_active = False
-        self.tracker = None  # Will be set after initialization
-        self.standup_scheduler = None
-        self.minute_checker = None
+        self.teams = {}  # team_id -> Team, set via add_team()
+        self.scheduler = None
+        self.history = HistoryScanner()
+        self.member_cache = MemberCache()
+        self.update_parser = UpdateParser.from_config()
+        self.store = AttendanceStore()
+        self.journal = AttendanceJournal()
+        self.analytics = AnalyticsEngine(self.store)
+        self.outbox = EmailOutbox(self._email_transport())
+        self.outbound = OutboundQueue()
+        self.metrics_server = None
+        self.recorder = GatewayRecorder(settings.record_events_file) if settings.record_events_file else None
+        self.reindex_channels()
+
+    def _email_transport(self):
+        if settings.email_transport == 'stub':
+            return StubTransport()
+        return ResendTransport(settings.resend_api_key)
+
+    @property
+    def default_team(self):
+        """The env-configured team, or the first team from the teams file"""
+        return self.teams.get(DEFAULT_TEAM_ID) or next(iter(self.teams.values()), None)
+
+    @property
+    def tracker(self):
+        team = self.default_team
+        return team.tracker if team else None
+
+    @property
+    def is_standup_active(self):
+        return any(team.is_standup_active for team in self.teams.values())
+
+    def get_team(self, name=None, channel_id=None):
+        """Resolve a team by id/name, then by the channel a command was used in"""
+        if name:
+            key = name.lower()
+            for team in self.teams.values():
+                if team.id.lower() == key or team.name.lower() == key:
+                    return team
+            return None
+        if channel_id is not None:
+            for team in self.teams.values():
+                if channel_id in team.channel_ids():
+                    return team
+        return self.default_team
+
+    async def on_connect(self):
+        self.member_cache.mark_connected()
 
     async def on_ready(self):
-        from config import STANDUP_START_HOUR, STANDUP_START_MINUTE, STANDUP_END_HOUR, STANDUP_END_MINUTE
+        log.info('✅ %s has connected to Discord!', self.user)
+        if self.recorder:
+            self.recorder.connection('ready')
+        self.member_cache.mark_ready()
+        for team in self.teams.values():
+            log.info('⏰ %s: standup %s', team.name, team.schedule_label)
+        self.start_tracking()
+
+        # Start the deadline scheduler and email outbox (on_ready fires again after reconnects)
+        self.scheduler.start()
+        self.outbox.start()
+        next_deadline = self.scheduler.next_deadline()
+        if next_deadline:
+            log.info('⏳ Next scheduled event: %s', next_deadline.strftime("%Y-%m-%d %H:%M %Z"))
+
+        # With the lean member cache, fetch team rosters now rather than on the first report
+        await self.member_cache.prefetch_team_members(self)
+        self.member_cache.report(self)
 
-        print(f'✅ {self.user} has connected to Discord!')
-        print(f'📍 Timezone: Asia/Dhaka')
-        print(f'⏰ Standup Time: {STANDUP_START_HOUR:02d}:{STANDUP_START_MINUTE:02d} - {STANDUP_END_HOUR:02d}:{STANDUP_END_MINUTE:02d}')
+    async def invoke(self, ctx):
+        if ctx.command is None:
+            return await super().invoke(ctx)
+        with tracer.span(f"command.{ctx.command.qualified_name}", kind='prefix', user=ctx.author.id) as span:
+            await super().invoke(ctx)
+            if span and ctx.command_failed:
+                span.attrs['failed'] = True
 
-        # Start background tasks
-        self.standup_scheduler.start()
-        self.minute_checker.start()
+    async def on_app_command_completion(self, interaction, command):
+        tracer.finish(interaction.extras.get('span'))
+
+    async def on_message(self, message):
+        await super().on_message(message)
+        await self.process_commands(message)
 
     async def setup_hook(self):
+        # kill -HUP reloads .env and the teams file without reconnecting
+        if hasattr(signal, 'SIGHUP'):
+            try:
+                asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_on_signal, self)
+            except NotImplementedError:
+                pass
+
+        # Optional Prometheus endpoint (METRICS_PORT)
+        self.metrics_server = await metrics.start_server(self)
+
         try:
-            await self.tree.sync()
-            print("✅ Slash commands synced")
+            await sync_command_tree(self)
         except Exception as e:
-            print(f"⚠️ Slash command sync failed: {e}")
-            print("Note: Prefix commands (!) will still work")
+            log.warning("⚠️ Slash command sync failed: %s (prefix commands (!) will still work)", e)
+
+    async def close(self):
+        for team in self.teams.values():
+            await team.tracker.flush_snapshots()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        if self.recorder:
+            self.recorder.close()
+        await super().close()
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+
+class SystemClock:
+    """Wall-clock time"""
+
+    def now(self, tz=None):
+        return datetime.now(tz)
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+
+class SimulatedClock:
+    """Time that only moves when told to"""
+
+    def __init__(self, start):
+        if start.tzinfo is None:
+            raise ValueError("SimulatedClock needs a timezone-aware start time")
+        self._now = start.astimezone(timezone.utc)
+
+    def now(self, tz=None):
+        if tz is None:
+            return self._now.astimezone().replace(tzinfo=None)  # naive local time, like datetime.now()
+        return self._now.astimezone(tz)
+
+    def set(self, when):
+        """Jump to ``when``; time never moves backwards"""
+        when = when.astimezone(timezone.utc)
+        if when > self._now:
+            self._now = when
+
+    def advance(self, seconds):
+        self._now += timedelta(seconds=seconds)
+
+    async def sleep(self, seconds):
+        self.advance(seconds)
+        await asyncio.sleep(0)
+
+
+# Everything that asks for the current time goes through now(), so a replay can
+# swap in a SimulatedClock and run weeks of standups in seconds (benchmarks/replay.py)
+_clock = SystemClock()
+
+
+def now(tz=None):
+    """Current time from the active clock (pass the team's timezone, as with datetime.now)"""
+    return _clock.now(tz)
+
+
+async def sleep(seconds):
+    await _clock.sleep(seconds)
+
+
+def use(clock):
+    """Make ``clock`` the active clock; returns the previous one"""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
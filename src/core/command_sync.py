@@ -0,0 +1,41 @@
+import hashlib
+import json
+import discord
+import logging
+from config import settings
+
+log = logging.getLogger(__name__)
+
+
+def command_tree_hash(tree, guild=None):
+    """Stable hash of the command payload a sync would upload for ``guild`` (or globally)"""
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    payload.sort(key=lambda command: (command.get('type', 1), command['name']))
+    blob = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+async def sync_command_tree(bot):
+    """Sync slash commands only when the registered tree differs from the last successful sync.
+
+    A global sync is a rate-limited upsert of every command that takes a while
+    to propagate, so it's skipped when nothing changed. The hash of each
+    successful sync is kept in the store per application and scope. With
+    COMMAND_SYNC_GUILD_ID set, commands are copied to and synced with that
+    guild only, which takes effect immediately. Returns True if a sync ran.
+    """
+    guild = discord.Object(id=settings.command_sync_guild_id) if settings.command_sync_guild_id else None
+    if guild:
+        bot.tree.copy_global_to(guild=guild)
+
+    scope = f"guild {guild.id}" if guild else "globally"
+    digest = command_tree_hash(bot.tree, guild)
+    key = f"command_tree_hash:{bot.application_id}:{guild.id if guild else 'global'}"
+    if not settings.force_command_sync and bot.store.get_meta(key) == digest:
+        log.info("✅ Slash commands unchanged since last sync (%s) - skipping sync", scope)
+        return False
+
+    synced = await bot.tree.sync(guild=guild)
+    bot.store.set_meta(key, digest)
+    log.info("✅ Synced %d slash command(s) %s", len(synced), scope)
+    return True
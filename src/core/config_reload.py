@@ -0,0 +1,140 @@
+import copy
+import logging
+from config import settings, Settings, ConfigError
+from src.core import clock
+from src.core.logs import apply_levels
+from src.core.tasks import plan_day, resume_session
+from src.core.tracing import tracer
+from src.core.teams import load_teams, SCHEDULE_FIELDS, CHANNEL_FIELDS
+from src.core.tracker import StandupTracker
+from src.core.update_parser import UpdateParser
+
+log = logging.getLogger(__name__)
+
+PARSER_SETTINGS = {'update_languages', 'update_keywords'}
+EMAIL_SETTINGS = {'email_transport', 'resend_api_key'}
+LOG_SETTINGS = {'log_level', 'log_levels'}
+
+
+def _today_tag(team):
+    """Scheduler tag of the team's events for its current day (see plan_day)"""
+    return f"{team.id}:{clock.now(team.timezone).date().isoformat()}"
+
+
+def _switch_channels(bot, team, changed):
+    """Drop live state gathered from a team's old standup or async channel"""
+    tracker = team.tracker
+    if 'standup_channel_id' in changed:
+        # Members in the old channel leave, members already in the new one join
+        tracker.sync_voice_channel()
+    if 'async_channel_id' in changed:
+        tracker.reset_async_index()
+        if team.is_standup_active:
+            async def rescan():
+                if team.is_standup_active:
+                    tracker.async_updates_today = await tracker.check_day_highlights()
+
+            # The running session's highlights came from the old channel
+            bot.scheduler.schedule(clock.now(team.timezone), 'async rescan', rescan, tag=_today_tag(team))
+
+
+def reload_config(bot):
+    """Re-read .env and the teams file and apply them without reconnecting.
+
+    Teams are updated in place, so trackers and in-flight sessions carry on.
+    Only teams whose schedule changed get their pending events cancelled and
+    the day re-planned; other teams' timers are untouched. Raises ConfigError
+    (leaving the running configuration as it was) if the new one is invalid.
+    Returns a list of the changes applied.
+    """
+    new_settings = Settings.load()
+    previous = copy.copy(settings)
+    changed_settings = settings.update(new_settings)
+    try:
+        # Teams and the parser read their defaults from the settings just applied
+        new_teams = load_teams()
+        parser = UpdateParser.from_config() if changed_settings & PARSER_SETTINGS else None
+    except (ConfigError, OSError, ValueError) as e:
+        settings.update(previous)
+        raise ConfigError(str(e)) from None
+
+    changes = []
+    if parser:
+        bot.update_parser = parser
+        for team in bot.teams.values():
+            team.tracker.async_index.parser = parser
+        changes.append(f"update keywords: {', '.join(settings.update_languages)}")
+    if changed_settings & EMAIL_SETTINGS:
+        bot.outbox.transport = bot._email_transport()
+        changes.append(f"email transport: {settings.email_transport}")
+    if 'trace_buffer_size' in changed_settings:
+        tracer.resize(settings.trace_buffer_size)
+        changes.append(f"trace buffer: {settings.trace_buffer_size} span(s)")
+    if changed_settings & LOG_SETTINGS:
+        apply_levels(previous.log_levels)
+        changes.append(f"log levels: {settings.log_level}"
+                       + ''.join(f", {name}={level}" for name, level in settings.log_levels.items()))
+
+    reindex = False
+    for new_team in new_teams:
+        team = bot.teams.get(new_team.id)
+        if team is None:
+            new_team.tracker = StandupTracker(bot, new_team)
+            new_team.tracker.restore_async_index()
+            bot.add_team(new_team)
+            plan_day(bot, bot.scheduler, new_team, clock.now(new_team.timezone).date())
+            changes.append(f"added team {new_team.name} ({new_team.schedule_label})")
+            continue
+
+        old_tag = _today_tag(team)
+        changed = team.update_from(new_team)
+        if not changed:
+            continue
+
+        if changed & set(SCHEDULE_FIELDS):
+            # Re-arm just this team: drop today's pending events and plan the day again
+            bot.scheduler.cancel(old_tag)
+            bot.scheduler.cancel(_today_tag(team))
+            team.tracker.async_index.timezone = team.timezone
+            plan_day(bot, bot.scheduler, team, clock.now(team.timezone).date())
+            if team.is_standup_active:
+                # The running session ends by the new schedule, counted from when it started
+                tracker = team.tracker
+                tracker.ends_at = team.session_end(tracker.start_time.astimezone(team.timezone))
+                tracker.session_snapshot.mark_dirty()
+                resume_session(bot, bot.scheduler, team)
+            changes.append(f"re-armed {team.name}: {team.schedule_label}")
+        if changed & set(CHANNEL_FIELDS):
+            reindex = True
+            _switch_channels(bot, team, changed)
+        other = sorted(changed - set(SCHEDULE_FIELDS))
+        if other:
+            changes.append(f"updated {team.name}: {', '.join(other)}")
+
+    new_ids = {team.id for team in new_teams}
+    for team in list(bot.teams.values()):
+        if team.id in new_ids:
+            continue
+        if team.is_standup_active:
+            changes.append(f"kept {team.name} until its running standup ends (reload again to remove it)")
+            continue
+        bot.scheduler.cancel(_today_tag(team))
+        bot.remove_team(team)
+        changes.append(f"removed team {team.name}")
+
+    if reindex:
+        bot.reindex_channels()
+
+    if changes:
+        log.info("🔄 Configuration reloaded:\n%s", "\n".join(f"   • {change}" for change in changes))
+    else:
+        log.info("🔄 Configuration reloaded: no changes")
+    return changes
+
+
+def reload_on_signal(bot):
+    """SIGHUP handler: reload and report problems instead of raising into the event loop"""
+    try:
+        reload_config(bot)
+    except ConfigError as e:
+        log.error("❌ Configuration reload failed, keeping the current settings: %s", e)
@@ -0,0 +1,99 @@
+from html import escape
+
+# Static parts are built once at import; rendering only joins them with the
+# escaped per-update fragments into a single buffer.
+
+_BASE_CSS = (
+    "body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: %s; margin: 0 auto; padding: 20px; }\n"
+    ".header { background: linear-gradient(135deg, #667eea 0%%, #764ba2 100%%); color: white; padding: 30px; border-radius: 10px; text-align: center; margin-bottom: 30px; }\n"
+    ".header h1 { margin: 0; font-size: 24px; }\n"
+    ".header p { margin: 10px 0 0 0; opacity: 0.9; }\n"
+    ".footer { text-align: center; color: #6c757d; font-size: 14px; margin-top: 40px; padding-top: 20px; border-top: 1px solid #e9ecef; }\n"
+)
+
+_EMPTY_CSS = _BASE_CSS % '600px' + (
+    ".no-updates { background: #f8f9fa; padding: 30px; border-radius: 8px; text-align: center; color: #6c757d; }\n"
+)
+
+_UPDATES_CSS = _BASE_CSS % '800px' + (
+    ".summary { background: #f8f9fa; padding: 20px; border-radius: 8px; margin-bottom: 30px; text-align: center; }\n"
+    ".summary h2 { color: #495057; margin-top: 0; }\n"
+    ".count { font-size: 32px; font-weight: bold; color: #28a745; margin: 10px 0; }\n"
+    ".team-update { background: white; padding: 20px; margin: 15px 0; border-radius: 8px; border-left: 4px solid #28a745; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }\n"
+    ".team-update .author { font-weight: bold; color: #495057; font-size: 18px; margin-bottom: 5px; }\n"
+    ".team-update .time { color: #6c757d; font-size: 14px; margin-bottom: 10px; }\n"
+    ".team-update .message { color: #333; line-height: 1.5; }\n"
+)
+
+
+def _head(css):
+    return (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+        '<title>Daily Dev Team Updates</title>\n'
+        f'<style>\n{css}</style>\n</head>\n<body>\n'
+        '<div class="header">\n<h1>👥 Daily Dev Team Updates</h1>\n<p>'
+    )
+
+
+_EMPTY_HEAD = _head(_EMPTY_CSS)
+_UPDATES_HEAD = _head(_UPDATES_CSS)
+_HEADER_CLOSE = '</p>\n</div>\n'
+_FOOTER = '<div class="footer">\n<p>Generated by Discord Standup Bot</p>\n</div>\n</body>\n</html>\n'
+
+_NO_UPDATES_BODY = (
+    '<div class="no-updates">\n<h3>No team updates submitted today</h3>\n'
+    '<p>All team members participated in the voice standup.</p>\n</div>\n'
+)
+_NO_UPDATES_TEXT = (
+    "\nNo team updates submitted today.\n"
+    "All team members participated in the voice standup.\n\n"
+    "Generated by Discord Standup Bot"
+)
+
+_SUMMARY_OPEN = '<div class="summary">\n<h2>Team Updates Submitted</h2>\n<div class="count">'
+_SUMMARY_CLOSE = '</div>\n</div>\n'
+_UPDATE_OPEN = '<div class="team-update">\n<div class="author">'
+_UPDATE_TIME = '</div>\n<div class="time">Posted at '
+_UPDATE_MESSAGE = '</div>\n<div class="message">'
+_UPDATE_CLOSE = '</div>\n</div>\n'
+
+
+def _escape_message(message):
+    """Escape user content and keep its line breaks"""
+    return escape(message).replace('\n', '<br>\n')
+
+
+def render_updates_email(date_str, updates):
+    """Render the HTML and plain-text bodies of the dev team updates email in one pass.
+
+    ``updates`` is the tracker's ``{member_id: {'name', 'time', 'message'}}``
+    mapping. Names, times and messages are HTML-escaped.
+    """
+    text = ["DAILY DEV TEAM UPDATES\n", date_str, "\n"]
+
+    if not updates:
+        html = [_EMPTY_HEAD, escape(date_str), _HEADER_CLOSE, _NO_UPDATES_BODY, _FOOTER]
+        text.append(_NO_UPDATES_TEXT)
+        return ''.join(html), ''.join(text)
+
+    count = str(len(updates))
+    html = [_UPDATES_HEAD, escape(date_str), _HEADER_CLOSE, _SUMMARY_OPEN, count, _SUMMARY_CLOSE]
+    text.extend(("\nTeam Updates Submitted: ", count, "\n\n"))
+
+    html_append = html.append
+    text_append = text.append
+    for data in updates.values():
+        name, time, message = data['name'], data['time'], data['message']
+        html_append(_UPDATE_OPEN)
+        html_append(escape(name))
+        html_append(_UPDATE_TIME)
+        html_append(escape(time))
+        html_append(_UPDATE_MESSAGE)
+        html_append(_escape_message(message))
+        html_append(_UPDATE_CLOSE)
+
+        text_append(f"{name} (Posted at {time})\n{message}\n\n")
+
+    html_append(_FOOTER)
+    text_append("Generated by Discord Standup Bot")
+    return ''.join(html), ''.join(text)
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from urllib.parse import urlparse
+import aiohttp
+from config import settings
+from src.core import metrics
+from src.core.tracing import tracer
+
+log = logging.getLogger(__name__)
+
+
+class Sink:
+    """One destination a finished standup fans out to; ``kind`` picks its timeout (FINALIZE_TIMEOUTS)"""
+
+    def __init__(self, name, kind, deliver):
+        self.name = name
+        self.kind = kind
+        self.deliver = deliver  # coroutine function taking the saved record
+
+    @property
+    def timeout(self):
+        return settings.finalize_timeouts.get(self.kind, settings.finalize_timeout)
+
+
+def default_sinks(bot, team):
+    """Leave voice, post the report, queue the email, plus any configured webhooks and export directory"""
+    from src.core.utils import generate_attendance_report, send_email_summary
+
+    async def voice(record):
+        await team.tracker.leave_standup_channel()
+
+    async def report(record):
+        with metrics.REPORT_SECONDS.time(team.id):
+            await generate_attendance_report(bot, team)
+
+    async def email(record):
+        await send_email_summary(bot, team)
+
+    sinks = [Sink('voice', 'voice', voice), Sink('report', 'report', report), Sink('email', 'email', email)]
+    for url in settings.finalize_webhook_urls:
+        sinks.append(Sink(f"webhook:{urlparse(url).netloc}", 'webhook', _webhook(url)))
+    if settings.finalize_export_dir:
+        sinks.append(Sink('file', 'file', _export(settings.finalize_export_dir)))
+    return sinks
+
+
+def _webhook(url):
+    async def deliver(record):
+        async with aiohttp.ClientSession() as session:
+            async with session.post(url, json=record) as response:
+                response.raise_for_status()
+    return deliver
+
+
+def _export(directory):
+    def write(record):
+        os.makedirs(directory, exist_ok=True)
+        started = (record.get('start_time') or '')[11:19].replace(':', '')
+        path = os.path.join(directory, f"{record['team']}_{record['date']}_{started}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp_path, path)
+
+    async def deliver(record):
+        await asyncio.to_thread(write, record)
+    return deliver
+
+
+async def _run_sink(sink, record):
+    started = time.perf_counter()
+    with tracer.span(f"end_standup.{sink.kind}", sink=sink.name):
+        try:
+            await asyncio.wait_for(sink.deliver(record), sink.timeout)
+            result = 'ok'
+        except asyncio.TimeoutError:
+            result = 'timeout'
+            log.warning("⏱️ %s sink timed out after %ds", sink.name, sink.timeout)
+        except Exception as e:
+            result = 'error'
+            log.exception("❌ %s sink failed: %s", sink.name, e)
+    elapsed = time.perf_counter() - started
+    metrics.FINALIZE_SINK_SECONDS.observe(elapsed, sink.kind, result)
+    return sink.name, result, elapsed
+
+
+async def fan_out(record, sinks):
+    """Deliver a saved record to every sink concurrently.
+
+    Each sink runs under its own timeout, and a sink that fails or hangs
+    never delays or cancels the others. Returns (name, result, seconds) per sink.
+    """
+    results = await asyncio.gather(*(_run_sink(sink, record) for sink in sinks))
+    log.info("📤 Fan-out for %s: %s", record['team'],
+             ', '.join(f"{name} {result} {seconds:.2f}s" for name, result, seconds in results))
+    return results
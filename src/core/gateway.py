@@ -0,0 +1,82 @@
+from src.core import clock
+
+
+class GatewayRouting:
+    """Routes gateway events to the trackers of the teams whose channels they touch.
+
+    Mixed into StandupBot. The replay harness's FakeBot mixes it in too, so
+    replayed events go through the same handlers as live ones. Expects
+    ``teams`` (team_id -> Team) and ``recorder`` (a GatewayRecorder or None)
+    on the bot; call ``reindex_channels()`` once before adding teams.
+    """
+
+    def add_team(self, team):
+        """Register a team whose tracker shares this bot's gateway connection"""
+        self.teams[team.id] = team
+        self._voice_index.setdefault(team.standup_channel_id, []).append(team.tracker)
+        self._async_index.setdefault(team.async_channel_id, []).append(team.tracker)
+
+    def remove_team(self, team):
+        del self.teams[team.id]
+        self.reindex_channels()
+
+    def reindex_channels(self):
+        """Rebuild the channel -> tracker routing after teams' channels change"""
+        self._voice_index = {}  # voice channel id -> [StandupTracker]
+        self._async_index = {}  # async update channel id -> [StandupTracker]
+        for team in self.teams.values():
+            self._voice_index.setdefault(team.standup_channel_id, []).append(team.tracker)
+            self._async_index.setdefault(team.async_channel_id, []).append(team.tracker)
+
+    def start_tracking(self):
+        """On (re)connect: seed live voice state and resume live message indexing"""
+        for team in self.teams.values():
+            # Seed live voice state; voice_state_update events keep it current from here
+            team.tracker.sync_voice_channel()
+
+            # Live message indexing resumes; anything missed while offline gets backfilled
+            team.tracker.async_index.mark_connected(clock.now(team.timezone))
+
+    async def on_voice_state_update(self, member, before, after):
+        channel_ids = {state.channel.id for state in (before, after) if state.channel}
+        if self.recorder and not channel_ids.isdisjoint(self._voice_index):
+            self.recorder.voice(member, before, after)
+        for channel_id in channel_ids:
+            for tracker in self._voice_index.get(channel_id, ()):
+                tracker.handle_voice_state_update(member, before, after)
+
+    async def on_disconnect(self):
+        if self.recorder:
+            self.recorder.connection('disconnect')
+        for team in self.teams.values():
+            team.tracker.async_index.mark_disconnected(clock.now(team.timezone))
+
+    async def on_resumed(self):
+        if self.recorder:
+            self.recorder.connection('resumed')
+        for team in self.teams.values():
+            team.tracker.async_index.mark_resumed()
+
+    async def on_message(self, message):
+        if self.recorder and message.channel.id in self._async_index:
+            self.recorder.message(message)
+        for tracker in self._async_index.get(message.channel.id, ()):
+            tracker.handle_message(message)
+
+    async def on_raw_message_edit(self, payload):
+        if self.recorder and payload.channel_id in self._async_index:
+            self.recorder.edit(payload.message)
+        for tracker in self._async_index.get(payload.channel_id, ()):
+            tracker.handle_message_edit(payload)
+
+    async def on_raw_message_delete(self, payload):
+        if self.recorder and payload.channel_id in self._async_index:
+            self.recorder.delete(payload.channel_id, [payload.message_id])
+        for tracker in self._async_index.get(payload.channel_id, ()):
+            tracker.handle_message_delete([payload.message_id])
+
+    async def on_raw_bulk_message_delete(self, payload):
+        if self.recorder and payload.channel_id in self._async_index:
+            self.recorder.delete(payload.channel_id, payload.message_ids)
+        for tracker in self._async_index.get(payload.channel_id, ()):
+            tracker.handle_message_delete(payload.message_ids)
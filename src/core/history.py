@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+import time
+import discord
+from src.core import metrics, ratelimit
+from src.core.tracing import tracer
+
+log = logging.getLogger(__name__)
+
+CURSOR_FILE = 'data/history_cursors.json'
+PAGE_SIZE = 100
+
+
+class ScanStats:
+    """Cost of one history scan"""
+
+    def __init__(self):
+        self.pages = 0
+        self.messages = 0
+        self.rate_limit_wait = 0.0
+        self.duration = 0.0
+
+    def __str__(self):
+        return (f"{self.messages} messages in {self.pages} page(s), "
+                f"{self.duration:.2f}s ({self.rate_limit_wait:.2f}s rate-limited)")
+
+
+class HistoryScanner:
+    """Pages through channel history, resuming from a per-channel cursor kept on disk.
+
+    The cursor is the newest message ID the caller has fully processed, so a
+    later scan only fetches messages posted after it and its cost depends on
+    new traffic rather than on the size of the channel.
+    """
+
+    def __init__(self, path=CURSOR_FILE):
+        self.path = path
+        self.cursors = {}
+        self.last_stats = None
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.cursors = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning("⚠️ Ignoring unreadable history cursors in %s: %s", self.path, e)
+
+    def save(self):
+        """Persist cursors atomically"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.cursors, f)
+        os.replace(tmp_path, self.path)
+
+    def get_cursor(self, key):
+        return self.cursors.get(str(key))
+
+    def set_cursor(self, key, message_id):
+        if message_id > self.cursors.get(str(key), 0):
+            self.cursors[str(key)] = message_id
+
+    async def scan(self, channel, after, before=None, key=None):
+        """Yield every message after ``after`` (and before ``before``), oldest first.
+
+        ``after`` may be a datetime; it's advanced to the channel's cursor when
+        the cursor is newer. The cursor is moved as messages are yielded, but
+        only written to disk by ``save()`` once the caller has stored them.
+        ``key`` names the cursor (default: the channel ID), so consumers that
+        keep separate state for the same channel don't skip each other's messages.
+        """
+        key = key or channel.id
+        stats = ScanStats()
+        self.last_stats = stats
+        started = time.perf_counter()
+        waited_before = ratelimit.monitor.total_wait
+
+        position = discord.utils.time_snowflake(after) if not isinstance(after, int) else after
+        cursor = self.get_cursor(key)
+        if cursor and cursor > position:
+            position = cursor
+        before_obj = discord.Object(id=discord.utils.time_snowflake(before)) if before else None
+
+        try:
+            while True:
+                with tracer.span('history.page', channel=channel.id, page=stats.pages + 1) as span:
+                    page = [
+                        message async for message in channel.history(
+                            limit=PAGE_SIZE, after=discord.Object(id=position), before=before_obj, oldest_first=True
+                        )
+                    ]
+                    if span:
+                        span.attrs['messages'] = len(page)
+                stats.pages += 1
+                for message in page:
+                    stats.messages += 1
+                    position = max(position, message.id)
+                    yield message
+                    self.set_cursor(key, message.id)
+                if len(page) < PAGE_SIZE:
+                    break
+        finally:
+            stats.duration = time.perf_counter() - started
+            stats.rate_limit_wait = ratelimit.monitor.total_wait - waited_before
+            metrics.HISTORY_SCAN_SECONDS.observe(stats.duration)
+            metrics.HISTORY_MESSAGES.inc(stats.messages)
+            metrics.HISTORY_PAGES.inc(stats.pages)
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from src.core.teams import DEFAULT_TEAM_ID
+
+log = logging.getLogger(__name__)
+
+JOURNAL_FILE = 'attendance_journal.jsonl'
+
+
+def attendance_filename(team_id, month, directory='data'):
+    """Monthly snapshot file for a team; the default team keeps the original file name"""
+    if team_id == DEFAULT_TEAM_ID:
+        return os.path.join(directory, f'attendance_{month}.json')
+    return os.path.join(directory, f'attendance_{team_id}_{month}.json')
+
+
+def record_key(record):
+    """Identity of a record, used to keep replays and compactions idempotent"""
+    return (record.get('team', DEFAULT_TEAM_ID), record['date'], record.get('start_time'))
+
+
+def _fsync_dir(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AttendanceJournal:
+    """Crash-safe attendance persistence: an fsync'd append-only journal plus monthly snapshots.
+
+    Saving a record appends one JSON line to the journal, so the cost doesn't
+    depend on how big the month is. Compaction later folds journaled records
+    into the monthly ``attendance_*.json`` snapshots by writing a temp file and
+    renaming it over the old one, so a crash never leaves a truncated snapshot.
+    """
+
+    def __init__(self, directory='data'):
+        self.directory = directory
+        self.path = os.path.join(directory, JOURNAL_FILE)
+        self.compacting_path = f"{self.path}.compacting"
+        self._lock = threading.Lock()
+        self._compaction = None
+
+    def append(self, record):
+        """Durably append one record"""
+        os.makedirs(self.directory, exist_ok=True)
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            with open(self.path, 'a+b') as f:
+                # Never glue a record onto a line torn by an earlier crash
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        line = '\n' + line
+                f.write(line.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def schedule_compaction(self):
+        """Compact in a worker thread unless a compaction is already running"""
+        if self._compaction and not self._compaction.done():
+            return self._compaction
+        self._compaction = asyncio.create_task(asyncio.to_thread(self.compact))
+        return self._compaction
+
+    def compact(self):
+        """Fold journaled records into the monthly snapshots; returns records written"""
+        written = 0
+        # A leftover .compacting file (crash mid-compaction) is finished first,
+        # then the live journal is rotated and compacted
+        for _ in range(2):
+            with self._lock:
+                # Rotate so appends can continue while we work on a frozen file
+                if not os.path.exists(self.compacting_path):
+                    if not os.path.exists(self.path):
+                        break
+                    os.replace(self.path, self.compacting_path)
+            written += self._compact_rotated()
+
+        if written:
+            log.info("🗜️ Compacted %d journaled record(s) into monthly snapshots", written)
+        return written
+
+    def _compact_rotated(self):
+        records = self._read(self.compacting_path)
+        by_file = {}
+        for record in records:
+            month = record['date'][:7].replace('-', '_')
+            filename = attendance_filename(record.get('team', DEFAULT_TEAM_ID), month, self.directory)
+            by_file.setdefault(filename, []).append(record)
+
+        written = 0
+        for filename, new_records in by_file.items():
+            written += self._merge_snapshot(filename, new_records)
+
+        os.remove(self.compacting_path)
+        _fsync_dir(self.directory)
+        return written
+
+    def recover(self):
+        """Records left in the journal by a previous run (replayed by compaction)"""
+        return self._read(self.compacting_path) + self._read(self.path)
+
+    def _read(self, path):
+        if not os.path.exists(path):
+            return []
+        records = []
+        with open(path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A torn final line from a crash mid-append; everything before it is intact
+                    log.warning("⚠️ Ignoring unreadable journal line %d in %s", line_number, path)
+        return records
+
+    def _merge_snapshot(self, filename, new_records):
+        if os.path.exists(filename):
+            with open(filename, 'r') as f:
+                records = json.load(f)
+        else:
+            records = []
+
+        seen = {record_key(record) for record in records}
+        added = 0
+        for record in new_records:
+            key = record_key(record)
+            if key not in seen:
+                seen.add(key)
+                records.append(record)
+                added += 1
+        if not added:
+            return 0
+
+        tmp_path = f"{filename}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(records, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filename)
+        return added
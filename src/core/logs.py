@@ -0,0 +1,136 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from config import settings, LOG_LEVEL_NAMES
+
+# Attributes every LogRecord has; anything else was passed via ``extra=`` and becomes a JSON field
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and any ``extra`` fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Freezes the message on the calling thread but, unlike the stock handler,
+    keeps the traceback separate so the JSON output has it as its own field"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None  # owns the real (blocking) output handler
+
+# Loggers whose records the bot itself reads (see require_level), with the highest level they may have
+_ceilings = {}
+
+
+def setup_logging():
+    """Route all logging through a queue so the event loop never blocks on stdout.
+
+    Records are put on an unbounded queue by a handler on the root logger;
+    a background QueueListener thread formats and writes them. discord.py logs
+    through the same pipeline (the bot is run with ``log_handler=None``).
+    """
+    global _listener
+    if _listener:
+        return
+    output = logging.StreamHandler(sys.stdout)
+    if settings.log_format == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s %(levelname)-7s %(name)s: %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [_QueueHandler(log_queue)]
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    apply_levels()
+
+
+def apply_levels(previous=None):
+    """Apply LOG_LEVEL and LOG_LEVELS; loggers only named in ``previous`` go back to inheriting"""
+    logging.getLogger().setLevel(settings.log_level)
+    for name in (set(previous or ()) | set(_ceilings)) - set(settings.log_levels):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    for name, level in settings.log_levels.items():
+        logging.getLogger(name).setLevel(level)
+    _apply_ceilings()
+
+
+def set_level(name, level):
+    """Change one logger's level at runtime ('root' or '' for the default); returns the logger name"""
+    level = level.upper()
+    if level not in LOG_LEVEL_NAMES:
+        raise ValueError(f"level must be one of {', '.join(LOG_LEVEL_NAMES)}")
+    logger = logging.getLogger(None if name in ('', 'root') else name)
+    logger.setLevel(level)
+    for pinned, ceiling in _ceilings.items():
+        # A pinned logger that only holds its ceiling follows its parents again
+        if pinned != logger.name and pinned not in settings.log_levels \
+                and logging.getLogger(pinned).level == ceiling:
+            logging.getLogger(pinned).setLevel(logging.NOTSET)
+    _apply_ceilings()
+    return logger.name
+
+
+def require_level(name, level):
+    """Keep ``name`` logging at ``level`` or below whatever LOG_LEVEL, LOG_LEVELS or /log_level say.
+
+    For loggers whose records the bot consumes itself, e.g. the rate-limit
+    monitor reading discord.py's 429 warnings. The records are still written
+    out like any other.
+    """
+    _ceilings[name] = level
+    _apply_ceilings()
+
+
+def _apply_ceilings():
+    for name, ceiling in _ceilings.items():
+        logger = logging.getLogger(name)
+        if logger.getEffectiveLevel() > ceiling:
+            logger.setLevel(ceiling)
+
+
+def configured_levels():
+    """Loggers with an explicit level, for the log_level command"""
+    levels = {'root': logging.getLevelName(logging.getLogger().level)}
+    for name, logger in sorted(logging.root.manager.loggerDict.items()):
+        if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET:
+            levels[name] = logging.getLevelName(logger.level)
+    return levels
+
+
+def shutdown_logging():
+    """Flush queued records (call before the process exits)"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+import discord
+from config import settings
+
+log = logging.getLogger(__name__)
+
+# Discord's limit on user IDs per gateway member request
+MEMBER_CHUNK_SIZE = 100
+
+
+def configure_intents(intents):
+    """Apply the member cache policy to the bot's intents; returns extra Client options.
+
+    'full' keeps the members and presences intents and chunks every guild on
+    connect. 'lean' drops both, so only members in voice channels are cached
+    from gateway events. Team members and report names are then fetched on
+    demand, 100 IDs per request.
+    """
+    if settings.member_cache == 'lean':
+        intents.members = False
+        intents.presences = False
+        return {
+            'member_cache_flags': discord.MemberCacheFlags.from_intents(intents),
+            'chunk_guilds_at_startup': False
+        }
+    intents.members = True
+    intents.presences = True
+    return {}
+
+
+class MemberCache:
+    """Lazy member resolution plus cache size and startup chunking timings"""
+
+    def __init__(self):
+        self.connected_at = None
+        self.startup_seconds = None   # connect -> ready, including guild chunking in 'full' mode
+        self.prefetch_seconds = None  # team member prefetch in 'lean' mode
+        self.requests = 0
+        self.fetched = 0
+
+    def mark_connected(self):
+        if self.connected_at is None:
+            self.connected_at = time.perf_counter()
+
+    def mark_ready(self):
+        if self.startup_seconds is None and self.connected_at is not None:
+            self.startup_seconds = time.perf_counter() - self.connected_at
+
+    @staticmethod
+    def size(bot):
+        """Members currently cached across all guilds"""
+        return sum(len(guild.members) for guild in bot.guilds)
+
+    async def resolve(self, guild, member_ids):
+        """Make sure the given members are cached, fetching the missing ones in chunks; returns how many were fetched"""
+        missing = [member_id for member_id in set(member_ids) if guild.get_member(member_id) is None]
+        fetched = 0
+        for i in range(0, len(missing), MEMBER_CHUNK_SIZE):
+            chunk = missing[i:i + MEMBER_CHUNK_SIZE]
+            try:
+                members = await guild.query_members(user_ids=chunk, limit=len(chunk), cache=True)
+            except (asyncio.TimeoutError, discord.HTTPException) as e:
+                log.warning("⚠️ Could not fetch %d member(s) from %s: %s", len(chunk), guild.name, e)
+                break
+            self.requests += 1
+            fetched += len(members)
+        self.fetched += fetched
+        return fetched
+
+    async def prefetch_team_members(self, bot):
+        """Warm the cache with every team's roster (lean mode only; full mode already chunked)"""
+        if settings.member_cache != 'lean' or self.prefetch_seconds is not None:
+            return
+        started = time.perf_counter()
+        for team in bot.teams.values():
+            channel = bot.get_channel(team.report_channel_id) or bot.get_channel(team.standup_channel_id)
+            if channel and team.member_ids:
+                await self.resolve(channel.guild, team.member_ids)
+        self.prefetch_seconds = time.perf_counter() - started
+
+    def report(self, bot):
+        startup = f"{self.startup_seconds:.2f}s" if self.startup_seconds is not None else "n/a"
+        line = (f"👥 Member cache ({settings.member_cache}): {self.size(bot)} member(s) in "
+                f"{len(bot.guilds)} guild(s), connect-to-ready {startup}")
+        if self.prefetch_seconds is not None:
+            line += f", team prefetch {self.prefetch_seconds:.2f}s ({self.requests} request(s))"
+        log.info(line)
@@ -0,0 +1,220 @@
+import bisect
+import logging
+import math
+import time
+from contextlib import contextmanager
+from aiohttp import web
+from config import settings
+
+log = logging.getLogger(__name__)
+
+# Seconds; covers a sub-millisecond SQLite write up to a multi-page history scan
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base for the metric types; values are kept per label-value tuple"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.function = None
+        # Unlabelled counters and gauges report 0 before their first update
+        self._values = {} if self.labelnames or self.kind == 'histogram' else {(): 0}
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {labels}")
+        return tuple(str(label) for label in labels)
+
+    def set_function(self, function):
+        """Compute the value at scrape time: ``function()`` returns a number, or a
+        dict of label-value tuple -> number for labelled metrics"""
+        self.function = function
+
+    def samples(self):
+        values = self._values
+        if self.function:
+            result = self.function()
+            values = result if isinstance(result, dict) else {(): result}
+        for labels, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, *labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, *labels):
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+        state['counts'][bisect.bisect_left(self.buckets, value)] += 1
+        state['sum'] += value
+        state['count'] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        """Observe the duration of the ``with`` block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def samples(self):
+        for labels, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state['counts']):
+                cumulative += count
+                le = (('le', _format_value(bound)),)
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, le), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, labels), state['sum']
+            yield f"{self.name}_count", _format_labels(self.labelnames, labels), state['count']
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+HISTORY_SCAN_SECONDS = registry.register(Histogram(
+    'standup_history_scan_seconds', 'Duration of channel history scans'))
+HISTORY_MESSAGES = registry.register(Counter(
+    'standup_history_messages_scanned_total', 'Messages fetched by history scans'))
+HISTORY_PAGES = registry.register(Counter(
+    'standup_history_pages_total', 'History pages requested from Discord'))
+SCHEDULER_DRIFT_SECONDS = registry.register(Histogram(
+    'standup_scheduler_drift_seconds', 'How late scheduled events fired', ('event',),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 30, 60, 300, 3600)))
+GATEWAY_LATENCY_SECONDS = registry.register(Gauge(
+    'standup_gateway_latency_seconds', 'Discord gateway heartbeat latency'))
+RATE_LIMIT_WAIT_SECONDS = registry.register(Counter(
+    'standup_rate_limit_wait_seconds_total', 'Time spent waiting out Discord 429 responses'))
+RATE_LIMIT_HITS = registry.register(Counter(
+    'standup_rate_limit_hits_total', 'Discord 429 responses'))
+REPORT_SECONDS = registry.register(Histogram(
+    'standup_report_seconds', 'Time to build and post the attendance report', ('team',)))
+EMAIL_SEND_SECONDS = registry.register(Histogram(
+    'standup_email_send_seconds', 'Email transport call duration', ('result',)))
+EMAIL_OUTBOX_DEPTH = registry.register(Gauge(
+    'standup_email_outbox_depth', 'Emails waiting for delivery'))
+STORAGE_WRITE_SECONDS = registry.register(Histogram(
+    'standup_storage_write_seconds', 'Attendance record write duration', ('sink',)))
+ATTENDANCE_MEMBERS = registry.register(Gauge(
+    'standup_attendance_members', 'Voice attendees in the current or last session', ('team',)))
+SCHEDULER_PENDING = registry.register(Gauge(
+    'standup_scheduler_pending_events', 'Scheduled events waiting to fire'))
+OUTBOUND_QUEUE_DEPTH = registry.register(Gauge(
+    'standup_outbound_queue_depth', 'Discord messages waiting to be sent', ('channel',)))
+RECORD_DURABLE_SECONDS = registry.register(Histogram(
+    'standup_record_durable_seconds', 'Time from the end of a standup to its record being on disk'))
+FINALIZE_SINK_SECONDS = registry.register(Histogram(
+    'standup_finalize_sink_seconds', 'End-of-standup fan-out duration per sink', ('sink', 'result')))
+
+
+def bind(bot):
+    """Point the scrape-time gauges at a running bot"""
+    # bot.latency is NaN/inf until the first heartbeat
+    GATEWAY_LATENCY_SECONDS.set_function(lambda: bot.latency if math.isfinite(bot.latency) else 0)
+    EMAIL_OUTBOX_DEPTH.set_function(bot.outbox.depth)
+    OUTBOUND_QUEUE_DEPTH.set_function(
+        lambda: {(channel_id,): depth for channel_id, depth in bot.outbound.depths().items()})
+    SCHEDULER_PENDING.set_function(lambda: bot.scheduler.pending() if bot.scheduler else 0)
+    ATTENDANCE_MEMBERS.set_function(
+        lambda: {(team.id,): len(team.tracker.attendance) for team in bot.teams.values()})
+
+
+class MetricsServer:
+    """Serves ``/metrics`` over HTTP with aiohttp (already a discord.py dependency)"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def start(self):
+        async def handle(request):
+            return web.Response(body=registry.render().encode(),
+                                headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+        app = web.Application()
+        app.router.add_get('/metrics', handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        log.info("📈 Metrics at http://%s:%d/metrics", self.host, self.port)
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def start_server(bot):
+    """Start the metrics endpoint if METRICS_PORT is set; returns the server or None"""
+    if not settings.metrics_port:
+        return None
+    bind(bot)
+    server = MetricsServer(settings.metrics_host, settings.metrics_port)
+    try:
+        await server.start()
+    except OSError as e:
+        log.warning("⚠️ Could not start metrics endpoint on port %d: %s", settings.metrics_port, e)
+        return None
+    return server
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+# Discord allows 10 embeds and 6000 embed characters per message
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+# Discord's per-channel message bucket is 5 messages per 5 seconds
+CHANNEL_BURST = 5
+CHANNEL_WINDOW = 5.0
+
+
+class _Outgoing:
+    def __init__(self, content, embeds, file, key):
+        self.content = content
+        self.embeds = embeds
+        self.file = file
+        self.key = key
+        self.future = asyncio.get_running_loop().create_future()
+        # Never warn about an exception nobody awaited (the caller may have timed out)
+        self.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.superseded = []  # futures of replaced messages, resolved with this one
+
+    @property
+    def embeds_only(self):
+        return self.content is None and self.file is None and bool(self.embeds)
+
+    def resolve(self, message=None, error=None):
+        for future in [self.future] + self.superseded:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(message)
+            else:
+                future.set_exception(error)
+
+
+class _ChannelQueue:
+    def __init__(self):
+        self.urgent = deque()  # command replies jump ahead of background posts
+        self.background = deque()
+        self.sent_at = deque()  # send times in the current rate-limit window
+        self.worker = None
+
+    def __len__(self):
+        return len(self.urgent) + len(self.background)
+
+    def find(self, key):
+        for pending in (self.urgent, self.background):
+            for outgoing in pending:
+                if outgoing.key == key:
+                    return outgoing
+        return None
+
+    def pop_batch(self):
+        """The next message, plus any embed-only messages queued right behind it that fit in with it"""
+        pending = self.urgent or self.background
+        size = 1
+        if pending[0].embeds_only:
+            # Sized before popping anything, so a failure here leaves the queue intact
+            size = count = chars = 0
+            for outgoing in pending:
+                count += len(outgoing.embeds)
+                chars += sum(len(embed) for embed in outgoing.embeds)
+                if size and (not outgoing.embeds_only or count > MAX_EMBEDS or chars > MAX_EMBED_CHARS):
+                    break
+                size += 1
+        return [pending.popleft() for _ in range(size)]
+
+    def drop_all(self):
+        dropped = list(self.urgent) + list(self.background)
+        self.urgent.clear()
+        self.background.clear()
+        return dropped
+
+
+def _message_kwargs(batch):
+    """``channel.send`` arguments for a batch (only the first message can carry content or a file)"""
+    first = batch[0]
+    kwargs = {}
+    embeds = [embed for outgoing in batch for embed in outgoing.embeds]
+    if embeds:
+        kwargs['embeds'] = embeds
+    if first.content is not None:
+        kwargs['content'] = first.content
+    if first.file is not None:
+        kwargs['file'] = first.file
+    return kwargs
+
+
+class OutboundQueue:
+    """Per-channel queue for the bot's own Discord messages.
+
+    Each channel is drained by one worker at most ``burst`` messages per
+    ``window`` seconds, so bursts around a standup's start and end wait
+    their turn instead of running into 429s. A message sent with a ``key``
+    replaces a queued message with the same key (a newer attendance
+    snapshot supersedes the old one). Embed-only messages queued back to
+    back go out as one message of up to 10 embeds. Urgent messages
+    (command replies) go ahead of background posts. ``burst=0`` disables
+    pacing (offline benchmarks and replays).
+    """
+
+    def __init__(self, burst=CHANNEL_BURST, window=CHANNEL_WINDOW):
+        self.burst = burst
+        self.window = window
+        self._channels = {}  # channel id -> _ChannelQueue
+        self.coalesced = 0
+        self.batched = 0
+
+    async def send(self, channel, content=None, embed=None, embeds=None, file=None, key=None, urgent=False):
+        """Queue a message and wait until it's sent; returns the Message (shared if coalesced or batched)"""
+        embeds = ([embed] if embed else []) + list(embeds or [])
+        queue = self._channels.setdefault(channel.id, _ChannelQueue())
+        outgoing = _Outgoing(content, embeds, file, key)
+
+        previous = queue.find(key) if key else None
+        if previous:
+            # Take over the superseded message's place in line
+            pending = queue.urgent if previous in queue.urgent else queue.background
+            pending[pending.index(previous)] = outgoing
+            outgoing.superseded = [previous.future] + previous.superseded
+            self.coalesced += 1
+        else:
+            (queue.urgent if urgent else queue.background).append(outgoing)
+
+        if queue.worker is None or queue.worker.done():
+            queue.worker = asyncio.create_task(self._drain(channel, queue))
+        # Shielded: a caller timing out doesn't take the message out of the queue
+        return await asyncio.shield(outgoing.future)
+
+    async def _drain(self, channel, queue):
+        try:
+            while queue:
+                await self._wait_for_slot(queue)
+                batch = queue.pop_batch()
+                try:
+                    message = await channel.send(**_message_kwargs(batch))
+                except Exception as e:
+                    log.error("❌ Could not send to #%s: %s", getattr(channel, 'name', channel.id), e)
+                    for outgoing in batch:
+                        outgoing.resolve(error=e)
+                    continue
+                finally:
+                    queue.sent_at.append(time.monotonic())
+                self.batched += len(batch) - 1
+                for outgoing in batch:
+                    outgoing.resolve(message)
+        except BaseException as e:
+            # Never leave senders waiting on a dead worker
+            for outgoing in queue.drop_all():
+                outgoing.resolve(error=e if isinstance(e, Exception) else RuntimeError('outbound queue stopped'))
+            raise
+
+    async def _wait_for_slot(self, queue):
+        if not self.burst:
+            return
+        while len(queue.sent_at) >= self.burst:
+            wait = queue.sent_at[0] + self.window - time.monotonic()
+            if wait <= 0:
+                queue.sent_at.popleft()
+            else:
+                await asyncio.sleep(wait)
+
+    def depth(self, channel_id=None):
+        """Messages waiting to be sent, in one channel or all of them"""
+        if channel_id is not None:
+            queue = self._channels.get(channel_id)
+            return len(queue) if queue else 0
+        return sum(len(queue) for queue in self._channels.values())
+
+    def depths(self):
+        """Waiting messages per channel ID, for channels that have any"""
+        return {channel_id: len(queue) for channel_id, queue in self._channels.items() if queue}
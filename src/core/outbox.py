@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+import resend
+from src.core import metrics
+
+log = logging.getLogger(__name__)
+
+OUTBOX_DIR = 'data/outbox'
+
+# Sent messages are kept this long to dedupe keys (a key names one session, so older ones never recur)
+SENT_RETENTION_DAYS = 30
+PRUNE_INTERVAL = 3600
+
+
+class ResendTransport:
+    """Delivers through the Resend API (blocking; always called from a worker thread)"""
+
+    def __init__(self, api_key):
+        resend.api_key = api_key
+
+    def send(self, params, idempotency_key):
+        email = resend.Emails.send(params)
+        return email['id']
+
+
+class StubTransport:
+    """Local transport that records messages instead of sending them.
+
+    ``fail_times`` makes the first N sends raise, to exercise the retry path.
+    """
+
+    def __init__(self, fail_times=0):
+        self.sent = []
+        self.fail_times = fail_times
+
+    def send(self, params, idempotency_key):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("stub transport failure")
+        self.sent.append((idempotency_key, params))
+        log.info("📭 [stub] Email '%s' to %s", params.get('subject'), ', '.join(params.get('to', [])))
+        return f"stub-{len(self.sent)}"
+
+
+class EmailOutbox:
+    """Disk-backed email queue delivered from a thread pool with exponential backoff.
+
+    Each message is a JSON file under ``pending/`` named by its idempotency key.
+    Delivered messages move to ``sent/`` and messages that exhaust their retries
+    move to ``failed/``, so a key that was already sent is never sent twice,
+    even across restarts. ``sent/`` entries older than ``retention_days`` are
+    pruned hourly.
+    """
+
+    def __init__(self, transport, directory=OUTBOX_DIR, max_workers=2, max_attempts=6, base_delay=30,
+                 retention_days=SENT_RETENTION_DAYS):
+        self.transport = transport
+        self.directory = directory
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.retention_days = retention_days
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='outbox')
+        self._in_flight = set()
+        self._deliveries = set()  # delivery tasks, referenced until done
+        self._pruned_at = 0
+        self._task = None
+        self._wakeup = None
+        for name in ('pending', 'sent', 'failed'):
+            os.makedirs(os.path.join(directory, name), exist_ok=True)
+
+    def _path(self, state, key):
+        safe_key = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in key)
+        return os.path.join(self.directory, state, f'{safe_key}.json')
+
+    def _write(self, path, message):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(message, f)
+        os.replace(tmp_path, path)
+
+    def enqueue(self, key, params):
+        """Queue a message for delivery; returns False if this key was already queued or sent"""
+        if any(os.path.exists(self._path(state, key)) for state in ('pending', 'sent')):
+            log.info("ℹ️ Email %s already queued or sent - skipping", key)
+            return False
+
+        self._write(self._path('pending', key), {
+            'key': key,
+            'params': params,
+            'attempts': 0,
+            'next_attempt_at': time.time(),
+            'last_error': None
+        })
+        if self._wakeup:
+            self._wakeup.set()
+        return True
+
+    def depth(self):
+        """Number of messages waiting for delivery"""
+        return len(os.listdir(os.path.join(self.directory, 'pending')))
+
+    def prune_sent(self, now=None):
+        """Delete ``sent/`` entries older than the retention period; returns how many were removed"""
+        cutoff = (now or time.time()) - self.retention_days * 86400
+        sent_dir = os.path.join(self.directory, 'sent')
+        removed = 0
+        for name in os.listdir(sent_dir):
+            path = os.path.join(sent_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            log.info("🧹 Pruned %d sent email record(s) older than %d days", removed, self.retention_days)
+        return removed
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            if time.time() - self._pruned_at >= PRUNE_INTERVAL:
+                self._pruned_at = time.time()
+                await asyncio.to_thread(self.prune_sent)
+
+            next_due = None
+            for message in self._load_pending():
+                if message['key'] in self._in_flight:
+                    continue
+                if message['next_attempt_at'] <= time.time():
+                    self._in_flight.add(message['key'])
+                    task = asyncio.create_task(self._deliver(message))
+                    self._deliveries.add(task)
+                    task.add_done_callback(self._deliveries.discard)
+                elif next_due is None or message['next_attempt_at'] < next_due:
+                    next_due = message['next_attempt_at']
+
+            timeout = min(max(next_due - time.time(), 0), PRUNE_INTERVAL) if next_due else PRUNE_INTERVAL
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _load_pending(self):
+        pending_dir = os.path.join(self.directory, 'pending')
+        messages = []
+        for name in os.listdir(pending_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(pending_dir, name), 'r') as f:
+                    messages.append(json.load(f))
+            except (OSError, ValueError) as e:
+                log.warning("⚠️ Skipping unreadable outbox entry %s: %s", name, e)
+        return messages
+
+    async def _deliver(self, message):
+        key = message['key']
+        pending_path = self._path('pending', key)
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            email_id = await loop.run_in_executor(self._executor, self.transport.send, message['params'], key)
+            metrics.EMAIL_SEND_SECONDS.observe(time.perf_counter() - started, 'sent')
+            message['email_id'] = email_id
+            message['sent_at'] = time.time()
+            self._write(self._path('sent', key), message)
+            os.remove(pending_path)
+            log.info("✅ Email %s sent (ID: %s)", key, email_id)
+        except Exception as e:
+            metrics.EMAIL_SEND_SECONDS.observe(time.perf_counter() - started, 'error')
+            message['attempts'] += 1
+            message['last_error'] = str(e)
+            if message['attempts'] >= self.max_attempts:
+                self._write(self._path('failed', key), message)
+                os.remove(pending_path)
+                log.error("❌ Email %s failed after %d attempts: %s", key, message['attempts'], e)
+            else:
+                # Exponential backoff with jitter so retries don't synchronize
+                delay = self.base_delay * (2 ** (message['attempts'] - 1))
+                message['next_attempt_at'] = time.time() + delay * random.uniform(0.8, 1.2)
+                self._write(pending_path, message)
+                log.warning("⚠️ Email %s attempt %d failed (%s); retrying in %.0fs", key, message['attempts'], e, delay)
+        finally:
+            self._in_flight.discard(key)
+            self._wakeup.set()
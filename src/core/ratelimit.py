@@ -0,0 +1,43 @@
+import logging
+from src.core import metrics
+from src.core.logs import require_level
+
+
+class RateLimitMonitor(logging.Handler):
+    """Totals the time discord.py spends waiting out 429 responses.
+
+    discord.py retries rate-limited requests internally and only reports them
+    through a warning on the ``discord.http`` logger, so this handler reads the
+    retry delay from those records. Only "Retrying in" warnings count: when the
+    delay is too long discord.py raises instead of waiting.
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.total_wait = 0.0
+        self.hits = 0
+
+    def emit(self, record):
+        if not isinstance(record.msg, str) or 'rate limited' not in record.msg or 'Retrying in' not in record.msg:
+            return
+        retry_after = record.args[-1] if isinstance(record.args, tuple) and record.args else None
+        if isinstance(retry_after, (int, float)):
+            self.total_wait += float(retry_after)
+            self.hits += 1
+            metrics.RATE_LIMIT_WAIT_SECONDS.inc(float(retry_after))
+            metrics.RATE_LIMIT_HITS.inc()
+
+
+monitor = RateLimitMonitor()
+
+
+def install():
+    """Attach the shared monitor to discord.py's HTTP logger (idempotent).
+
+    The logger is kept at WARNING or below, since a quieter level
+    (LOG_LEVELS=discord=ERROR) would drop the records before they get here.
+    """
+    logger = logging.getLogger('discord.http')
+    if monitor not in logger.handlers:
+        logger.addHandler(monitor)
+    require_level('discord.http', logging.WARNING)
@@ -0,0 +1,61 @@
+import json
+import logging
+import os
+from datetime import timezone
+from src.core import clock
+
+log = logging.getLogger(__name__)
+
+
+def _channel_id(voice_state):
+    return voice_state.channel.id if voice_state.channel else None
+
+
+class GatewayRecorder:
+    """Appends the gateway events the trackers consume to a JSONL file, for replay.
+
+    One line per event: voice state changes, async channel messages, edits and
+    deletes, plus connection events. ``benchmarks/replay.py`` feeds a recording
+    back through a bot on a simulated clock. Message content is recorded, so
+    treat the file like the async channel itself.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', buffering=1, encoding='utf-8')  # line-buffered
+        log.info("⏺️ Recording gateway events to %s", path)
+
+    def _write(self, event_type, **fields):
+        event = {'type': event_type, 'at': clock.now(timezone.utc).isoformat()}
+        event.update(fields)
+        try:
+            self._file.write(json.dumps(event, ensure_ascii=False) + '\n')
+        except (OSError, ValueError) as e:
+            log.warning("⚠️ Could not record %s event: %s", event_type, e)
+
+    def voice(self, member, before, after):
+        self._write('voice', member=member.id, name=member.display_name, bot=member.bot,
+                    before=_channel_id(before), after=_channel_id(after))
+
+    def message(self, message):
+        self._write('message', id=message.id, channel=message.channel.id, member=message.author.id,
+                    name=message.author.display_name, bot=message.author.bot, content=message.content,
+                    created_at=message.created_at.isoformat())
+
+    def edit(self, message):
+        self._write('edit', id=message.id, channel=message.channel.id, member=message.author.id,
+                    name=message.author.display_name, bot=message.author.bot, content=message.content,
+                    created_at=message.created_at.isoformat())
+
+    def delete(self, channel_id, message_ids):
+        self._write('delete', channel=channel_id, ids=list(message_ids))
+
+    def connection(self, event_type):
+        """'ready', 'disconnect' or 'resumed'"""
+        self._write(event_type)
+
+    def close(self):
+        self._file.close()
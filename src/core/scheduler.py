@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from config import settings
+from src.core import clock, metrics
+
+log = logging.getLogger(__name__)
+
+
+class ScheduledEvent:
+    """A single deadline in the scheduler's heap"""
+
+    __slots__ = ('when', 'seq', 'name', 'callback', 'expires', 'tag', 'cancelled')
+
+    def __init__(self, when, seq, name, callback, expires=None, tag=None):
+        self.when = when
+        self.seq = seq
+        self.name = name
+        self.callback = callback
+        self.expires = expires
+        self.tag = tag
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.when, self.seq) < (other.when, other.seq)
+
+
+class StandupScheduler:
+    """Sleeps until the next deadline instead of polling on a fixed interval.
+
+    Events live in a min-heap keyed by deadline, so scheduling and firing are
+    O(log n) and a single task serves any number of events. Deadlines that were
+    missed (slow tick, stalled loop, restart) still fire on the next wake-up
+    unless they passed their ``expires`` time.
+
+    Each due callback runs in its own task, so one team's slow start or end
+    never holds back another team's. Events whose tags share a team prefix
+    (``team_id:...``) run one after another, in deadline order.
+    """
+
+    # Upper bound on a single sleep so wall-clock jumps (suspend, NTP step) are noticed
+    MAX_SLEEP = 300
+
+    def __init__(self):
+        self._queue = []
+        self._seq = itertools.count()
+        self._task = None
+        self._wakeup = None
+        self._running = set()  # callback tasks in flight
+        self._lanes = {}       # team prefix of a tag -> that team's latest callback task
+
+    def schedule(self, when, name, callback, expires=None, tag=None):
+        """Schedule ``callback()`` (a coroutine function) to run at ``when``"""
+        event = ScheduledEvent(when, next(self._seq), name, callback, expires, tag)
+        heapq.heappush(self._queue, event)
+        if self._wakeup and self._queue[0] is event:
+            self._wakeup.set()
+        return event
+
+    def cancel(self, tag):
+        """Cancel every pending event carrying ``tag``; returns how many were cancelled"""
+        count = 0
+        for event in self._queue:
+            if event.tag == tag and not event.cancelled:
+                event.cancelled = True
+                count += 1
+        return count
+
+    def pending(self):
+        """Number of live events still waiting to fire"""
+        return sum(1 for event in self._queue if not event.cancelled)
+
+    def next_deadline(self):
+        """When the next live event fires, or None"""
+        self._drop_cancelled()
+        return self._queue[0].when if self._queue else None
+
+    def is_running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _drop_cancelled(self):
+        while self._queue and self._queue[0].cancelled:
+            heapq.heappop(self._queue)
+
+    async def run_due(self, now=None):
+        """Start the callback of every event whose deadline has passed; returns the number started"""
+        now = now or clock.now(settings.timezone)
+        fired = 0
+        while self._queue and self._queue[0].when <= now:
+            event = heapq.heappop(self._queue)
+            if event.cancelled:
+                continue
+            if event.expires and now >= event.expires:
+                log.warning("⏭️ Skipping missed %s (was due %s)", event.name, event.when.strftime('%H:%M:%S'))
+                continue
+
+            lag = (now - event.when).total_seconds()
+            metrics.SCHEDULER_DRIFT_SECONDS.observe(lag, event.name)
+            if lag > 1:
+                log.warning("⏰ Catching up on %s, %.0fs late", event.name, lag)
+            self._spawn(event)
+            fired += 1
+        return fired
+
+    def _spawn(self, event):
+        """Run an event's callback in a task, after the previous callback of the same team finishes"""
+        lane = event.tag.split(':', 1)[0] if event.tag else None
+        task = asyncio.create_task(self._fire(event, self._lanes.get(lane)))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        if lane is not None:
+            self._lanes[lane] = task
+            task.add_done_callback(lambda done: self._lanes.get(lane) is done and self._lanes.pop(lane))
+
+    async def _fire(self, event, previous):
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            await event.callback()
+        except Exception as e:
+            log.exception("❌ Scheduled %s failed: %s", event.name, e)
+
+    async def join(self):
+        """Wait until every callback started so far (and any they schedule and fire) has finished"""
+        while self._running:
+            await asyncio.wait(set(self._running))
+
+    async def _run(self):
+        while True:
+            await self.run_due()
+            self._drop_cancelled()
+
+            self._wakeup.clear()
+            if self._queue:
+                delay = (self._queue[0].when - clock.now(settings.timezone)).total_seconds()
+                timeout = min(max(delay, 0), self.MAX_SLEEP)
+            else:
+                timeout = self.MAX_SLEEP
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,47 @@
+import logging
+import time
+from src.core import ratelimit
+from src.core.tasks import create_tasks
+from src.core.teams import load_teams
+from src.core.tracker import StandupTracker
+
+log = logging.getLogger(__name__)
+
+
+def boot(bot, teams=None):
+    """Bring a freshly built bot's storage and teams up to date and plan the schedule.
+
+    Shared by standup_bot.main and benchmarks/replay.py, so a replayed
+    restart goes through the same steps as a real one. ``teams`` defaults to
+    load_teams().
+    """
+    # Import any monthly JSON history into the SQLite store (first run only)
+    bot.store.migrate_json_files()
+
+    # Replay records a previous run journaled but never compacted
+    pending = bot.journal.recover()
+    if pending:
+        log.info("♻️ Recovering %d journaled attendance record(s)", len(pending))
+        for record in pending:
+            bot.store.save_record(record)
+        bot.journal.compact()
+
+    # Initialize one tracker per team
+    for team in load_teams() if teams is None else teams:
+        team.tracker = StandupTracker(bot, team)
+        team.tracker.restore_async_index()
+
+        # Pick up a standup that was running when the previous process stopped
+        restore_started = time.perf_counter()
+        if team.tracker.restore_session():
+            team.is_standup_active = True
+            log.info("♻️ Restored %s standup started %s (%d attendee(s), %.1f ms)",
+                     team.name, team.tracker.start_time.strftime('%H:%M'), len(team.tracker.attendance),
+                     (time.perf_counter() - restore_started) * 1000)
+        bot.add_team(team)
+
+    # Measure time spent waiting out Discord rate limits
+    ratelimit.install()
+
+    # Create the standup scheduler bound to bot
+    bot.scheduler = create_tasks(bot)
@@ -0,0 +1,288 @@
+import glob
+import json
+import logging
+import os
+import re
+import sqlite3
+from src.core.teams import DEFAULT_TEAM_ID
+
+log = logging.getLogger(__name__)
+
+DB_FILE = 'data/standup.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    team TEXT NOT NULL,
+    date TEXT NOT NULL,
+    day TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    voice_count INTEGER NOT NULL DEFAULT 0,
+    async_count INTEGER NOT NULL DEFAULT 0,
+    total_participation INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (team, date, start_time)
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_team_date ON sessions (team, date);
+
+CREATE TABLE IF NOT EXISTS session_members (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    member_id INTEGER NOT NULL,
+    voice INTEGER NOT NULL DEFAULT 0,
+    async INTEGER NOT NULL DEFAULT 0,
+    duration_seconds INTEGER,
+    late_seconds INTEGER,
+    PRIMARY KEY (session_id, member_id)
+);
+CREATE INDEX IF NOT EXISTS idx_session_members_member ON session_members (member_id, session_id);
+
+CREATE TABLE IF NOT EXISTS async_updates (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    member_id INTEGER NOT NULL,
+    name TEXT,
+    time TEXT,
+    message TEXT,
+    PRIMARY KEY (session_id, member_id)
+);
+
+-- Daily rollups, maintained on every save so range stats never touch raw records
+CREATE TABLE IF NOT EXISTS team_daily (
+    team TEXT NOT NULL,
+    date TEXT NOT NULL,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    voice_count INTEGER NOT NULL DEFAULT 0,
+    async_count INTEGER NOT NULL DEFAULT 0,
+    total_participation INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (team, date)
+);
+
+CREATE TABLE IF NOT EXISTS member_daily (
+    team TEXT NOT NULL,
+    member_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    voice INTEGER NOT NULL DEFAULT 0,
+    async INTEGER NOT NULL DEFAULT 0,
+    duration_seconds INTEGER NOT NULL DEFAULT 0,
+    late_seconds INTEGER,
+    PRIMARY KEY (team, member_id, date)
+);
+CREATE INDEX IF NOT EXISTS idx_member_daily_date ON member_daily (team, date);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_JSON_FILE_RE = re.compile(r'attendance_(?:(?P<team>.+)_)?(?P<month>\d{4}_\d{2})\.json$')
+
+
+class AttendanceStore:
+    """SQLite-backed attendance history with indexed per-team and per-member lookups"""
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+        if not self.get_meta('rollups_built'):
+            self.rebuild_rollups()
+
+    def close(self):
+        self.conn.close()
+
+    def save_record(self, record):
+        """Insert one session record (the dict written by save_attendance_record)"""
+        with self.conn:
+            self._insert_record(record)
+
+    def _insert_record(self, record):
+        team = record.get('team', DEFAULT_TEAM_ID)
+        cursor = self.conn.execute(
+            """INSERT OR IGNORE INTO sessions
+               (team, date, day, start_time, end_time, voice_count, async_count, total_participation)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (team, record['date'], record.get('day'), record.get('start_time'), record.get('end_time'),
+             record.get('voice_count', 0), record.get('async_count', 0), record.get('total_participation', 0))
+        )
+        if cursor.rowcount == 0:
+            return None  # already stored
+        session_id = cursor.lastrowid
+
+        durations = record.get('voice_durations', {})
+        late_joins = record.get('late_joins', {})
+        async_updates = record.get('async_updates', {})
+        voice = {int(member_id) for member_id in record.get('voice_attendance', [])}
+        members = voice | {int(member_id) for member_id in async_updates}
+        member_rows = [
+            (member_id,
+             int(member_id in voice),
+             int(str(member_id) in async_updates),
+             durations.get(str(member_id)),
+             late_joins.get(str(member_id)))
+            for member_id in members
+        ]
+
+        self.conn.executemany(
+            """INSERT INTO session_members (session_id, member_id, voice, async, duration_seconds, late_seconds)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            [(session_id,) + row for row in member_rows]
+        )
+        self._add_to_rollups(team, record, member_rows)
+        self.conn.executemany(
+            """INSERT INTO async_updates (session_id, member_id, name, time, message)
+               VALUES (?, ?, ?, ?, ?)""",
+            [
+                (session_id, int(member_id), data.get('name'), data.get('time'), data.get('message'))
+                for member_id, data in async_updates.items()
+            ]
+        )
+        return session_id
+
+    def _add_to_rollups(self, team, record, member_rows):
+        self.conn.execute(
+            """INSERT INTO team_daily (team, date, sessions, voice_count, async_count, total_participation)
+               VALUES (?, ?, 1, ?, ?, ?)
+               ON CONFLICT (team, date) DO UPDATE SET
+                   sessions = sessions + 1,
+                   voice_count = voice_count + excluded.voice_count,
+                   async_count = async_count + excluded.async_count,
+                   total_participation = total_participation + excluded.total_participation""",
+            (team, record['date'], record.get('voice_count', 0), record.get('async_count', 0),
+             record.get('total_participation', 0))
+        )
+        self.conn.executemany(
+            """INSERT INTO member_daily (team, member_id, date, voice, async, duration_seconds, late_seconds)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (team, member_id, date) DO UPDATE SET
+                   voice = MAX(voice, excluded.voice),
+                   async = MAX(async, excluded.async),
+                   duration_seconds = duration_seconds + excluded.duration_seconds,
+                   late_seconds = CASE
+                       WHEN late_seconds IS NULL THEN excluded.late_seconds
+                       WHEN excluded.late_seconds IS NULL THEN late_seconds
+                       ELSE MIN(late_seconds, excluded.late_seconds)
+                   END""",
+            [
+                (team, member_id, record['date'], voice, is_async, duration or 0, late)
+                for member_id, voice, is_async, duration, late in member_rows
+            ]
+        )
+
+    def rebuild_rollups(self):
+        """Recompute the daily rollups from the session tables"""
+        with self.conn:
+            self.conn.execute('DELETE FROM team_daily')
+            self.conn.execute('DELETE FROM member_daily')
+            self.conn.execute(
+                """INSERT INTO team_daily (team, date, sessions, voice_count, async_count, total_participation)
+                   SELECT team, date, COUNT(*), SUM(voice_count), SUM(async_count), SUM(total_participation)
+                   FROM sessions GROUP BY team, date"""
+            )
+            self.conn.execute(
+                """INSERT INTO member_daily (team, member_id, date, voice, async, duration_seconds, late_seconds)
+                   SELECT s.team, m.member_id, s.date, MAX(m.voice), MAX(m.async),
+                          SUM(COALESCE(m.duration_seconds, 0)), MIN(m.late_seconds)
+                   FROM session_members m JOIN sessions s ON s.id = m.session_id
+                   GROUP BY s.team, m.member_id, s.date"""
+            )
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('rollups_built', '1')")
+
+    def team_stats(self, team, start_date, end_date):
+        """Totals and per-day rows for a team between two ISO dates (inclusive), from the rollups"""
+        daily = [
+            dict(row) for row in self.conn.execute(
+                """SELECT date, sessions, voice_count, async_count, total_participation FROM team_daily
+                   WHERE team = ? AND date BETWEEN ? AND ? ORDER BY date""",
+                (team, start_date, end_date)
+            )
+        ]
+        return {
+            'days': len(daily),
+            'total_voice': sum(row['voice_count'] for row in daily),
+            'total_async': sum(row['async_count'] for row in daily),
+            'total_participation': sum(row['total_participation'] for row in daily),
+            'daily': daily
+        }
+
+    def member_stats(self, team, member_id, start_date, end_date):
+        """One member's participation totals between two ISO dates (inclusive), from the rollups"""
+        row = self.conn.execute(
+            """SELECT COUNT(*) AS days, SUM(voice) AS voice_days, SUM(async) AS async_days,
+                      SUM(duration_seconds) AS duration_seconds
+               FROM member_daily WHERE team = ? AND member_id = ? AND date BETWEEN ? AND ?""",
+            (team, member_id, start_date, end_date)
+        ).fetchone()
+        return {key: row[key] or 0 for key in row.keys()}
+
+    def standup_dates(self, team):
+        """ISO dates on which the team held at least one standup, ascending"""
+        return [row[0] for row in self.conn.execute(
+            'SELECT date FROM team_daily WHERE team = ? ORDER BY date', (team,)
+        )]
+
+    def sessions(self, team):
+        """(date, day, start_time, end_time, voice_count, async_count) of every stored session, ascending"""
+        return self.conn.execute(
+            """SELECT date, day, start_time, end_time, voice_count, async_count FROM sessions
+               WHERE team = ? ORDER BY date, start_time""", (team,)
+        ).fetchall()
+
+    def member_daily_rows(self, team):
+        """(member_id, date, voice, async, late_seconds) for every member-day of a team"""
+        return self.conn.execute(
+            'SELECT member_id, date, voice, async, late_seconds FROM member_daily WHERE team = ?', (team,)
+        ).fetchall()
+
+    def session_count(self, team=None):
+        if team is None:
+            return self.conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+        return self.conn.execute('SELECT COUNT(*) FROM sessions WHERE team = ?', (team,)).fetchone()[0]
+
+    def get_meta(self, key):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def migrate_json_files(self, directory='data', force=False):
+        """One-shot import of the monthly attendance_*.json files; returns sessions imported"""
+        if self.get_meta('json_migrated') and not force:
+            return 0
+
+        imported = 0
+        for filename in sorted(glob.glob(os.path.join(directory, 'attendance_*.json'))):
+            match = _JSON_FILE_RE.search(os.path.basename(filename))
+            if not match:
+                continue
+            team = match.group('team') or DEFAULT_TEAM_ID
+
+            try:
+                with open(filename, 'r') as f:
+                    records = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning("⚠️ Skipping unreadable %s: %s", filename, e)
+                continue
+
+            with self.conn:
+                for record in records:
+                    record.setdefault('team', team)
+                    if self._insert_record(record):
+                        imported += 1
+
+        self.set_meta('json_migrated', '1')
+        if imported:
+            log.info("🗄️ Migrated %d attendance record(s) from JSON into %s", imported, self.path)
+        return imported
+
+
+if __name__ == '__main__':
+    store = AttendanceStore()
+    count = store.migrate_json_files(force=True)
+    print(f"✅ Imported {count} session(s) into {store.path}")
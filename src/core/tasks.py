@@ -1,69 +1,118 @@
-from discord.ext import tasks
-from datetime import datetime, time
-from config import (
-    TIMEZONE,
-    STANDUP_START_HOUR,
-    STANDUP_START_MINUTE,
-    STANDUP_END_HOUR,
-    STANDUP_END_MINUTE,
-    PRECHECK_HOUR,
-    PRECHECK_MINUTE
-)
+import logging
+from datetime import datetime, time, timedelta
+from src.core import clock
+from src.core.scheduler import StandupScheduler
 
+log = logging.getLogger(__name__)
 
-def create_tasks(bot):
-    """Create task loops bound to the bot instance"""
+
+# Minutes between attendance reconciliations during a standup
+ATTENDANCE_SAMPLE_MINUTES = 5
+
+
+def _at(team, day, hour, minute):
+    """Timezone-aware datetime for a wall-clock time on a given date in the team's timezone"""
+    return team.timezone.localize(datetime.combine(day, time(hour, minute)))
+
+
+def plan_day(bot, scheduler, team, day):
+    """Schedule the precheck, start, attendance samples and end for one team and day"""
     from src.core.utils import start_standup, end_standup
 
-    @tasks.loop(seconds=30)
-    async def minute_checker():
-        """Check every 30 seconds for standup time"""
-        now = datetime.now(TIMEZONE)
-        current_time = now.time()
+    async def precheck():
+        log.info("🔍 [%s] Checking for async updates before standup...", team.name)
+        team.tracker.async_updates_today = await team.tracker.check_day_highlights()
+        log.info("📝 [%s] Found %d async updates", team.name, len(team.tracker.async_updates_today))
 
-        # Skip weekends (Saturday=5, Sunday=6)
-        if now.weekday() >= 5:
+    async def start():
+        if team.is_standup_active:
             return
+        log.info("🎯 [%s] Starting standup at %s", team.name, clock.now(team.timezone).strftime('%H:%M:%S'))
+        team.is_standup_active = True
+        await start_standup(bot, team)
 
-        # Debug logging
-        if bot.is_standup_active:
-            print(f"🕐 Standup active - Current time: {current_time.strftime('%H:%M:%S')}")
-
-        # Check if it's standup start time
-        if (current_time.hour == STANDUP_START_HOUR and
-            current_time.minute == STANDUP_START_MINUTE and
-            current_time.second < 30 and
-            not bot.is_standup_active):
-
-            print(f"🎯 Starting standup at {current_time.strftime('%H:%M:%S')}")
-            bot.is_standup_active = True
-            await start_standup(bot)
-
-        # Track attendance during standup (every 5 minutes)
-        elif bot.is_standup_active and current_time.minute % 5 == 0 and current_time.second < 30:
-            await bot.tracker.track_attendance()
-            print(f"📊 Attendance update: {len(bot.tracker.attendance)} members")
-
-        # Check if it's standup end time - FIXED: Check if we're past the end time
-        elif (bot.is_standup_active and 
-              (current_time.hour > STANDUP_END_HOUR or 
-               (current_time.hour == STANDUP_END_HOUR and current_time.minute >= STANDUP_END_MINUTE))):
-            
-            print(f"🏁 Ending standup at {current_time.strftime('%H:%M:%S')} (past end time {STANDUP_END_HOUR:02d}:{STANDUP_END_MINUTE:02d})")
-            await end_standup(bot)
-            bot.is_standup_active = False
-
-    @tasks.loop(time=time(PRECHECK_HOUR, PRECHECK_MINUTE, tzinfo=TIMEZONE))
-    async def standup_scheduler():
-        """Pre-standup check for async updates"""
-        now = datetime.now(TIMEZONE)
-
-        # Skip weekends
-        if now.weekday() >= 5:
+    async def sample():
+        if team.is_standup_active:
+            team.tracker.sync_voice_channel()
+            await team.tracker.session_snapshot.flush()
+
+    async def end():
+        if not team.is_standup_active:
             return
+        if team.tracker.ends_at and clock.now(team.timezone) < team.tracker.ends_at:
+            return  # a session restored or re-timed by a reload ends on its own end event
+        log.info("🏁 [%s] Ending standup at %s (end time %02d:%02d)", team.name,
+                 clock.now(team.timezone).strftime('%H:%M:%S'), team.end_hour, team.end_minute)
+        try:
+            await end_standup(bot, team)
+        finally:
+            team.is_standup_active = False  # a failed end must not block the next day's standups
+
+    start_at = _at(team, day, team.start_hour, team.start_minute)
+    end_at = _at(team, day, team.end_hour, team.end_minute)
+    tag = f"{team.id}:{day.isoformat()}"
+
+    # Skip weekends (Saturday=5, Sunday=6)
+    if day.weekday() < 5:
+        # A missed precheck is pointless once the standup has started (it rescans anyway),
+        # and a missed start still runs as long as we're inside the standup window
+        scheduler.schedule(_at(team, day, team.precheck_hour, team.precheck_minute), 'precheck', precheck,
+                           expires=start_at, tag=tag)
+        scheduler.schedule(start_at, 'start', start, expires=end_at, tag=tag)
+
+        sample_at = start_at + timedelta(minutes=ATTENDANCE_SAMPLE_MINUTES)
+        while sample_at < end_at:
+            next_sample = sample_at + timedelta(minutes=ATTENDANCE_SAMPLE_MINUTES)
+            scheduler.schedule(sample_at, 'attendance sample', sample,
+                               expires=min(next_sample, end_at), tag=tag)
+            sample_at = next_sample
+
+        scheduler.schedule(end_at, 'end', end, tag=tag)
+
+    # Plan the following day once this one is over
+    next_day = day + timedelta(days=1)
 
-        print("🔍 Checking for async updates before standup...")
-        bot.tracker.async_updates_today = await bot.tracker.check_day_highlights()
-        print(f"📝 Found {len(bot.tracker.async_updates_today)} async updates")
+    async def plan_next():
+        plan_day(bot, scheduler, team, next_day)
 
-    return minute_checker, standup_scheduler
+    scheduler.schedule(_at(team, next_day, 0, 0), 'plan', plan_next, tag=tag)
+
+
+def resume_session(bot, scheduler, team):
+    """Finish a running standup restored from a snapshot or re-timed by a reload.
+
+    Rejoins voice until the session is due to end, then finalizes it. If the
+    end time already passed (the bot was down, or the new schedule ends
+    earlier), the end event is due and finalizes the session right away.
+    """
+    from src.core.utils import end_standup
+
+    tracker = team.tracker
+    tag = f"{team.id}:restored"
+    scheduler.cancel(tag)
+
+    async def rejoin():
+        if team.is_standup_active:
+            await tracker.join_standup_channel()
+
+    async def end():
+        if not team.is_standup_active:
+            return
+        log.info("🏁 [%s] Finalizing standup from %s", team.name, tracker.start_time.strftime('%Y-%m-%d %H:%M'))
+        try:
+            await end_standup(bot, team)
+        finally:
+            team.is_standup_active = False  # a failed end must not block the next day's standups
+
+    scheduler.schedule(clock.now(team.timezone), 'rejoin', rejoin, expires=tracker.ends_at, tag=tag)
+    scheduler.schedule(tracker.ends_at, 'end', end, tag=tag)
+
+
+def create_tasks(bot):
+    """Create the shared deadline scheduler and plan today's standup for every team"""
+    scheduler = StandupScheduler()
+    for team in bot.teams.values():
+        if team.is_standup_active:
+            resume_session(bot, scheduler, team)
+        plan_day(bot, scheduler, team, clock.now(team.timezone).date())
+    return scheduler
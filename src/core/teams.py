@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+import pytz
+from datetime import timedelta
+from config import settings, ConfigError
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TEAM_ID = 'default'
+
+# Fields that define a team's daily schedule; changing any of them re-arms it
+SCHEDULE_FIELDS = (
+    'timezone', 'start_hour', 'start_minute', 'end_hour', 'end_minute',
+    'precheck_hour', 'precheck_minute', 'cutoff_hour', 'cutoff_minute'
+)
+CHANNEL_FIELDS = ('standup_channel_id', 'async_channel_id', 'report_channel_id')
+CONFIG_FIELDS = ('name',) + CHANNEL_FIELDS + SCHEDULE_FIELDS + ('member_ids', 'to_emails')
+
+
+class Team:
+    """One standup team: its channels, schedule, roster and email list.
+
+    Each team gets its own StandupTracker and active flag, while sharing the
+    bot's gateway connection and member cache with every other team.
+    """
+
+    def __init__(self, team_id, name, standup_channel_id, async_channel_id, report_channel_id,
+                 timezone=None,
+                 start=None,
+                 end=None,
+                 precheck=None,
+                 async_cutoff=None,
+                 member_ids=None,
+                 to_emails=None):
+        self.id = team_id
+        self.name = name
+        self.standup_channel_id = standup_channel_id
+        self.async_channel_id = async_channel_id
+        self.report_channel_id = report_channel_id
+        # Anything not set per team falls back to the env settings
+        self.timezone = timezone or settings.timezone
+        self.start_hour, self.start_minute = start or settings.standup_start
+        self.end_hour, self.end_minute = end or settings.standup_end
+        self.precheck_hour, self.precheck_minute = precheck or settings.precheck
+        self.cutoff_hour, self.cutoff_minute = async_cutoff or start or settings.async_cutoff
+        self.member_ids = list(member_ids or [])
+        self.to_emails = list(to_emails or [])
+
+        # Runtime state
+        self.tracker = None
+        self.is_standup_active = False
+        self.finalize_lock = asyncio.Lock()
+
+    @property
+    def duration_minutes(self):
+        return (self.end_hour * 60 + self.end_minute) - (self.start_hour * 60 + self.start_minute)
+
+    @property
+    def schedule_label(self):
+        return (f"{self.start_hour:02d}:{self.start_minute:02d} - "
+                f"{self.end_hour:02d}:{self.end_minute:02d} ({self.timezone.zone})")
+
+    def session_end(self, start_time):
+        """When a standup started at start_time should end: today's end time, or a full duration later"""
+        end = start_time.replace(hour=self.end_hour, minute=self.end_minute, second=0, microsecond=0)
+        if end <= start_time:
+            end = start_time + timedelta(minutes=self.duration_minutes)
+        return end
+
+    def update_from(self, other):
+        """Take over another Team's configuration, keeping runtime state; returns the changed fields"""
+        changed = set()
+        for field in CONFIG_FIELDS:
+            value = getattr(other, field)
+            if getattr(self, field) != value:
+                setattr(self, field, value)
+                changed.add(field)
+        return changed
+
+    def channel_ids(self):
+        return {self.standup_channel_id, self.async_channel_id, self.report_channel_id}
+
+    def __repr__(self):
+        return f"<Team {self.id!r}>"
+
+
+def _parse_time(value):
+    """Parse 'HH:MM' into an (hour, minute) tuple"""
+    hour, minute = value.split(':')
+    hour, minute = int(hour), int(minute)
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"Invalid time {value!r}")
+    return hour, minute
+
+
+def team_from_dict(data):
+    """Build a Team from one entry of the teams file, defaulting to the env settings"""
+    kwargs = {}
+    if 'timezone' in data:
+        kwargs['timezone'] = pytz.timezone(data['timezone'])
+    for key in ('start', 'end', 'precheck', 'async_cutoff'):
+        if key in data:
+            kwargs[key] = _parse_time(data[key])
+
+    return Team(
+        team_id=str(data['id']),
+        name=data.get('name', data['id']),
+        standup_channel_id=int(data['standup_channel_id']),
+        async_channel_id=int(data['async_channel_id']),
+        report_channel_id=int(data['report_channel_id']),
+        member_ids=[int(member_id) for member_id in data.get('member_ids', [])],
+        to_emails=data.get('to_emails', []),
+        **kwargs
+    )
+
+
+def default_team():
+    """The single team described by the environment variables"""
+    return Team(
+        team_id=DEFAULT_TEAM_ID,
+        name='Standup',
+        standup_channel_id=settings.standup_channel_id,
+        async_channel_id=settings.async_update_channel_id,
+        report_channel_id=settings.report_channel_id,
+        async_cutoff=settings.async_cutoff,
+        member_ids=settings.team_member_ids,
+        to_emails=settings.to_emails
+    )
+
+
+def load_teams(path=None):
+    """Load team definitions from the JSON teams file, or the env-configured single team"""
+    path = path or settings.teams_file
+    if not path:
+        return [default_team()]
+
+    try:
+        with open(path, 'r') as f:
+            entries = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Can't read teams file {path}: {e}") from None
+
+    teams = []
+    for number, entry in enumerate(entries, 1):
+        try:
+            team = team_from_dict(entry)
+        except pytz.UnknownTimeZoneError as e:
+            raise ConfigError(f"Team {number} in {path} has an unknown timezone {e}") from None
+        except KeyError as e:
+            raise ConfigError(f"Team {number} in {path} is missing {e}") from None
+        except (TypeError, ValueError) as e:
+            raise ConfigError(f"Team {number} in {path} is invalid: {e}") from None
+        if team.duration_minutes <= 0:
+            raise ConfigError(f"Team {team.id!r} in {path} must end after it starts")
+        teams.append(team)
+    ids = [team.id for team in teams]
+    if len(set(ids)) != len(ids):
+        raise ConfigError(f"Duplicate team ids in {path}")
+    if not teams:
+        raise ConfigError(f"No teams defined in {path}")
+    log.info("👥 Loaded %d team(s) from %s: %s", len(teams), path, ', '.join(ids))
+    return teams
@@ -0,0 +1,134 @@
+import contextvars
+import itertools
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from config import settings
+
+_current = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """One timed stage; spans started inside it (same task or child tasks) become its children"""
+
+    __slots__ = ('name', 'attrs', 'span_id', 'parent_id', 'trace_id', 'start_ns', 'end_ns', 'error')
+
+    def __init__(self, name, span_id, parent, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.span_id = span_id
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else span_id
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+        self.error = None
+
+
+class Tracer:
+    """Keeps the most recent finished spans in a ring buffer for export as a Chrome trace.
+
+    Spans cost two perf_counter calls and a deque append, so they stay on in
+    production; a ``capacity`` of 0 turns tracing off.
+    """
+
+    def __init__(self, capacity):
+        self.spans = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        # perf_counter has no epoch; remember one pairing so exports can show wall-clock times
+        self._epoch_ns = time.perf_counter_ns()
+        self._epoch_wall = time.time()
+
+    @property
+    def enabled(self):
+        return self.spans.maxlen > 0
+
+    def resize(self, capacity):
+        """Change the buffer size, keeping the newest spans"""
+        if capacity != self.spans.maxlen:
+            self.spans = deque(self.spans, maxlen=capacity)
+
+    def start(self, name, **attrs):
+        """Open a span under the current one; close it with ``finish()``. Returns None when tracing is off"""
+        if not self.enabled:
+            return None
+        parent = _current.get()
+        if parent and parent.end_ns is not None:
+            parent = None  # an activated span that has since finished
+        return Span(name, next(self._ids), parent, attrs)
+
+    def activate(self, span):
+        """Make ``span`` the parent of spans started later in this task (for spans closed elsewhere)"""
+        if span:
+            _current.set(span)
+
+    def finish(self, span, error=None):
+        if span is None or span.end_ns is not None:
+            return
+        span.end_ns = time.perf_counter_ns()
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        self.spans.append(span)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the ``with`` block; works in sync and async code"""
+        span = self.start(name, **attrs)
+        if span is None:
+            yield None
+            return
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            self.finish(span)
+
+    def chrome_trace(self):
+        """The buffered spans in Chrome's Trace Event format (load in chrome://tracing or Perfetto).
+
+        Each trace (a standup, a command, a history scan) gets its own row,
+        named after its root span.
+        """
+        spans = list(self.spans)
+        events = []
+        roots = {}
+        for span in spans:
+            if span.parent_id is None:
+                roots[span.trace_id] = span.name
+            args = dict(span.attrs)
+            if span.error:
+                args['error'] = span.error
+            events.append({
+                'name': span.name,
+                'cat': span.name.split('.')[0],
+                'ph': 'X',
+                'ts': (span.start_ns - self._epoch_ns) / 1000,
+                'dur': (span.end_ns - span.start_ns) / 1000,
+                'pid': 1,
+                'tid': span.trace_id,
+                'args': args
+            })
+        for trace_id in sorted({span.trace_id for span in spans}):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': trace_id,
+                           'args': {'name': f"{roots.get(trace_id, 'trace')} #{trace_id}"}})
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'exported_at': datetime.now(timezone.utc).isoformat(),
+                'clock_origin': datetime.fromtimestamp(self._epoch_wall, timezone.utc).isoformat(),
+                'spans': len(spans)
+            }
+        }
+
+    def export(self):
+        """Chrome trace JSON as bytes"""
+        return json.dumps(self.chrome_trace()).encode()
+
+
+tracer = Tracer(settings.trace_buffer_size)
@@ -1,122 +1,439 @@
+import asyncio
 import discord
+import json
+import logging
+import os
 from datetime import datetime
-import pytz
-from config import (
-    STANDUP_CHANNEL_ID,
-    ASYNC_UPDATE_CHANNEL_ID,
-    TIMEZONE,
-    ASYNC_CUTOFF_HOUR,
-    ASYNC_CUTOFF_MINUTE
-)
+from config import settings
+from src.core import clock
+from src.core.async_index import AsyncUpdateIndex
+from src.core.tracing import tracer
+
+log = logging.getLogger(__name__)
+
+# Seconds of changes (voice, async edits and deletes) batched into one rewrite of a snapshot
+SNAPSHOT_DELAY = 5
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+class DeferredSnapshot:
+    """A JSON file rewritten at most once per ``delay`` seconds, in a worker thread.
+
+    ``mark_dirty()`` is O(1) and can be called on every event; ``build()`` runs
+    on the event loop when the flush happens and returns the data to write
+    (None to skip the write).
+    """
+
+    def __init__(self, path, build, delay=SNAPSHOT_DELAY):
+        self.path = path
+        self.build = build
+        self.delay = delay
+        self._handle = None
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    def mark_dirty(self):
+        if self._handle:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            data = self.build()  # no event loop (CLI tools): write right away
+            if data is not None:
+                _write_json(self.path, data)
+            return
+        self._handle = loop.call_later(self.delay, self._start_flush)
+
+    def _start_flush(self):
+        self._handle = None
+        self._task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """Write now, replacing any pending delayed write"""
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        async with self._lock:
+            data = self.build()
+            if data is not None:
+                await asyncio.to_thread(_write_json, self.path, data)
+
+    async def remove(self):
+        """Cancel any pending write and delete the file (waits for a write in progress)"""
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        async with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
 
 
 class StandupTracker:
-    def __init__(self, bot):
+    def __init__(self, bot, team):
         self.bot = bot
+        self.team = team
+        self.log = logging.LoggerAdapter(log, {'team': team.id})
         self.attendance = set()
         self.async_updates_today = {}
         self.voice_channel = None
         self.start_time = None
         self.end_time = None
+        self.ends_at = None      # when the running session is due to end
+        self.in_session = False
+
+        # Live voice state, fed by on_voice_state_update
+        self.present = {}        # member_id -> joined_at for members currently in the channel
+        self.member_names = {}   # member_id -> display name seen at last join
+        self.timeline = {}       # member_id -> [[joined_at, left_at], ...] for the current session
+
+        # Live async update index, fed by on_message
+        self.async_index = AsyncUpdateIndex(team.timezone, bot.update_parser)
+        self.async_index_snapshot = DeferredSnapshot(self._index_path, self._async_index_data)
+
+        # Voice changes only mark the snapshot dirty; it's rewritten off the loop, at most every few seconds
+        self.session_snapshot = DeferredSnapshot(self._session_path, self._session_data)
 
     async def join_standup_channel(self):
-        """Join the standup voice channel"""
+        """Join the standup voice channel (or just check it exists, in observer mode)"""
         try:
-            channel = self.bot.get_channel(STANDUP_CHANNEL_ID)
+            channel = self.bot.get_channel(self.team.standup_channel_id)
             if channel and isinstance(channel, discord.VoiceChannel):
-                if not any(vc.channel.id == STANDUP_CHANNEL_ID for vc in self.bot.voice_clients):
+                if settings.voice_mode == 'observer':
+                    # Attendance comes from gateway voice states; no voice connection needed
+                    self.log.info("👀 Observing voice channel: %s", channel.name)
+                    return True
+                if not any(vc.channel.id == self.team.standup_channel_id for vc in self.bot.voice_clients):
                     self.voice_channel = await channel.connect()
-                    print(f"🔊 Joined voice channel: {channel.name}")
+                    self.log.info("🔊 Joined voice channel: %s", channel.name)
                     return True
         except Exception as e:
-            print(f"❌ Error joining channel: {e}")
+            self.log.error("❌ Error joining channel: %s", e)
         return False
 
     async def leave_standup_channel(self):
         """Leave the standup voice channel"""
         try:
             for vc in self.bot.voice_clients:
-                if vc.channel.id == STANDUP_CHANNEL_ID:
+                if vc.channel.id == self.team.standup_channel_id:
                     await vc.disconnect()
-                    print("🔇 Left standup channel")
+                    self.log.info("🔇 Left standup channel")
         except Exception as e:
-            print(f"❌ Error leaving channel: {e}")
+            self.log.error("❌ Error leaving channel: %s", e)
+
+    def sync_voice_channel(self):
+        """Reconcile the live state with the channel's member list (on connect/reconnect)"""
+        channel = self.bot.get_channel(self.team.standup_channel_id)
+        if not channel or not isinstance(channel, discord.VoiceChannel):
+            return
+
+        now = clock.now(self.team.timezone)
+        in_channel = {member.id: member for member in channel.members if not member.bot}
+
+        for member_id in list(self.present):
+            if member_id not in in_channel:
+                self._mark_left(member_id, now)
+
+        for member_id, member in in_channel.items():
+            if member_id not in self.present:
+                self._mark_joined(member_id, member.display_name, now)
+
+        if self.in_session:
+            self.session_snapshot.mark_dirty()
+
+    def handle_voice_state_update(self, member, before, after):
+        """Apply a single voice state change to the live attendance state"""
+        if member.bot:
+            return
+
+        was_in = before.channel is not None and before.channel.id == self.team.standup_channel_id
+        is_in = after.channel is not None and after.channel.id == self.team.standup_channel_id
+        if was_in == is_in:
+            return  # mute/deafen/stream changes, or movement elsewhere
+
+        now = clock.now(self.team.timezone)
+        if is_in:
+            self._mark_joined(member.id, member.display_name, now)
+        else:
+            self._mark_left(member.id, now)
+
+        if self.in_session:
+            self.session_snapshot.mark_dirty()
+
+    def _mark_joined(self, member_id, name, when):
+        if member_id in self.present:
+            return
+        self.present[member_id] = when
+        self.member_names[member_id] = name
+        # A session restored after its end time only waits to be finalized
+        if self.in_session and (self.ends_at is None or when < self.ends_at):
+            self.attendance.add(member_id)
+            self.timeline.setdefault(member_id, []).append([when, None])
+
+    def _mark_left(self, member_id, when):
+        if self.present.pop(member_id, None) is None:
+            return
+        if self.in_session:
+            intervals = self.timeline.get(member_id)
+            if intervals and intervals[-1][1] is None:
+                intervals[-1][1] = min(when, self.ends_at) if self.ends_at else when
+
+    def begin_session(self, start_time, ends_at=None):
+        """Start recording a session, opening intervals for everyone already present"""
+        self.start_time = start_time
+        self.end_time = None
+        self.ends_at = ends_at
+        self.attendance.clear()
+        self.timeline = {}
+        self.in_session = True
+
+        self.sync_voice_channel()
+        for member_id in self.present:
+            self.attendance.add(member_id)
+            self.timeline[member_id] = [[start_time, None]]
+
+    def end_session(self, end_time):
+        """Stop recording and close any intervals still open at end_time (or the due end, if earlier)"""
+        if self.ends_at and end_time > self.ends_at:
+            end_time = self.ends_at
+        self.end_time = end_time
+        for intervals in self.timeline.values():
+            if intervals and intervals[-1][1] is None:
+                intervals[-1][1] = end_time
+        self.in_session = False
+
+    @property
+    def _session_path(self):
+        return f'data/session_{self.team.id}.json'
+
+    @property
+    def _session_updates_path(self):
+        return f'data/session_{self.team.id}_updates.json'
+
+    def _session_data(self):
+        """The part of the session that changes as people come and go (None once the session ended)"""
+        if not self.in_session:
+            return None
+        return {
+            'start_time': self.start_time.isoformat(),
+            'ends_at': self.ends_at.isoformat() if self.ends_at else None,
+            'attendance': sorted(self.attendance),
+            'member_names': {member_id: self.member_names.get(member_id) for member_id in self.timeline},
+            'timeline': {
+                member_id: [[joined_at.isoformat(), left_at.isoformat() if left_at else None]
+                            for joined_at, left_at in intervals]
+                for member_id, intervals in self.timeline.items()
+            }
+        }
+
+    async def save_session(self):
+        """Snapshot a newly started session so a restart can resume or finalize it.
+
+        The async updates seen at the start don't change during the session,
+        so they're written once, to their own file; voice changes later only
+        rewrite the (small) attendance snapshot.
+        """
+        await asyncio.to_thread(_write_json, self._session_updates_path, self.async_updates_today)
+        await self.session_snapshot.flush()
+
+    async def clear_session(self):
+        """Drop the snapshot once the session's record is saved"""
+        await self.session_snapshot.remove()
+        try:
+            os.remove(self._session_updates_path)
+        except FileNotFoundError:
+            pass
+
+    def restore_session(self):
+        """Reload a session snapshot left by a previous run; returns True if one was restored.
+
+        Members with an open interval are assumed to still be in the channel;
+        the first voice sync after connecting closes the intervals of anyone
+        who left in the meantime.
+        """
+        if not os.path.exists(self._session_path):
+            return False
+        try:
+            with open(self._session_path, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            self.log.warning("⚠️ Ignoring unreadable session snapshot %s: %s", self._session_path, e)
+            return False
+
+        def parse(value):
+            return datetime.fromisoformat(value).astimezone(self.team.timezone) if value else None
+
+        self.start_time = parse(snapshot['start_time'])
+        self.ends_at = parse(snapshot.get('ends_at')) or self.team.session_end(self.start_time)
+        self.end_time = None
+        self.attendance = {int(member_id) for member_id in snapshot['attendance']}
+        self.member_names = {int(member_id): name for member_id, name in snapshot['member_names'].items()}
+        self.timeline = {
+            int(member_id): [[parse(joined_at), parse(left_at)] for joined_at, left_at in intervals]
+            for member_id, intervals in snapshot['timeline'].items()
+        }
+        self.async_updates_today = {int(member_id): data for member_id, data in self._read_session_updates(snapshot).items()}
+        self.present = {
+            member_id: intervals[-1][0]
+            for member_id, intervals in self.timeline.items() if intervals and intervals[-1][1] is None
+        }
+        self.in_session = True
+        return True
+
+    def _read_session_updates(self, snapshot):
+        if 'async_updates' in snapshot:
+            return snapshot['async_updates']  # snapshot written before the updates got their own file
+        try:
+            with open(self._session_updates_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def is_present(self, member_id):
+        """Whether a member is in the standup channel right now"""
+        return member_id in self.present
+
+    def presence_durations(self):
+        """Seconds each attendee spent in the channel during the session"""
+        end = self.end_time or clock.now(self.team.timezone)
+        durations = {}
+        for member_id, intervals in self.timeline.items():
+            total = 0.0
+            for joined_at, left_at in intervals:
+                total += ((left_at or end) - joined_at).total_seconds()
+            durations[member_id] = round(total)
+        return durations
+
+    def late_joins(self):
+        """Seconds after the session start that each attendee first joined (0 if on time)"""
+        if not self.start_time:
+            return {}
+        return {
+            member_id: round(max((intervals[0][0] - self.start_time).total_seconds(), 0))
+            for member_id, intervals in self.timeline.items() if intervals
+        }
 
     async def track_attendance(self):
-        """Track who's in the voice channel during standup"""
-        channel = self.bot.get_channel(STANDUP_CHANNEL_ID)
-        if channel and isinstance(channel, discord.VoiceChannel):
-            members_in_vc = []
-            for member in channel.members:
-                if not member.bot:
-                    self.attendance.add(member.id)
-                    members_in_vc.append({
-                        'id': member.id,
-                        'name': member.display_name,
-                        'joined_at': datetime.now(TIMEZONE)
-                    })
-            return members_in_vc
-        return []
+        """Return who's in the voice channel right now (from live voice state)"""
+        return [
+            {
+                'id': member_id,
+                'name': self.member_names.get(member_id, str(member_id)),
+                'joined_at': joined_at
+            }
+            for member_id, joined_at in self.present.items()
+        ]
+
+    def handle_message(self, message):
+        """Index a newly posted message from the async update channel"""
+        if self.async_index.add(message):
+            self.log.debug("📝 Indexed async update from %s", message.author.display_name)
+
+    def handle_message_edit(self, payload):
+        """Re-parse an edited message from the async update channel (raw event, cached or not)"""
+        if self.async_index.edit(payload.message):
+            self.log.debug("✏️ Updated async update %s from %s", payload.message_id, payload.message.author.display_name)
+            self.async_index_snapshot.mark_dirty()
+
+    def handle_message_delete(self, message_ids):
+        """Drop deleted messages from the async update index"""
+        removed = [message_id for message_id in message_ids if self.async_index.remove(message_id)]
+        if removed:
+            self.log.debug("🗑️ Removed %d deleted async update(s)", len(removed))
+            self.async_index_snapshot.mark_dirty()
 
     async def check_day_highlights(self):
         """Check who sent their day highlights before cutoff"""
-        channel = self.bot.get_channel(ASYNC_UPDATE_CHANNEL_ID)
-        if not channel:
-            print("❌ Async update channel not found")
-            return {}
-
-        now = datetime.now(TIMEZONE)
+        now = clock.now(self.team.timezone)
         today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        cutoff_time = now.replace(hour=ASYNC_CUTOFF_HOUR, minute=ASYNC_CUTOFF_MINUTE, second=0, microsecond=0)
 
-        print(f"🔍 Scanning async updates...")
-        print(f"   Current time: {now.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-        print(f"   Today start: {today_start.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"   Cutoff time: {cutoff_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        # Live on_message events keep the index current; only fetch history for
+        # stretches we didn't see (before first connect, or across a reconnect)
+        missing = self.async_index.missing_ranges(today_start, now)
+        with tracer.span('check_day_highlights', team=self.team.id, missing_ranges=len(missing)):
+            if missing:
+                await self._backfill_async_updates(missing, now)
+            return self.current_day_highlights(now)
+
+    def refresh_day_highlights(self):
+        """Re-read the session's highlights from the index, if it saw the whole day live"""
+        day_start = self.start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.async_index.missing_ranges(day_start, self.end_time):
+            return  # keep what the start of the session saw
+        self.async_updates_today = self.current_day_highlights(self.end_time)
 
-        async_updates = {}
-        messages_checked = 0
+    def current_day_highlights(self, now=None):
+        """Day highlights from the live index alone (no history calls)"""
+        now = now or clock.now(self.team.timezone)
+        cutoff_time = now.replace(hour=self.team.cutoff_hour, minute=self.team.cutoff_minute, second=0, microsecond=0)
+        return self.async_index.updates_for(now.date(), cutoff_time)
+
+    @property
+    def _history_key(self):
+        return f"{self.team.id}:{self.team.async_channel_id}"
+
+    @property
+    def _index_path(self):
+        return f'data/async_index_{self.team.id}.json'
+
+    def restore_async_index(self):
+        """Reload the async index saved with the last history scan, so the next scan resumes from its cursor"""
+        cursor = self.bot.history.get_cursor(self._history_key)
+        if not cursor or not os.path.exists(self._index_path):
+            return
+        try:
+            with open(self._index_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.log.warning("⚠️ Ignoring unreadable async index %s: %s", self._index_path, e)
+            return
+        self.async_index.restore(data, discord.utils.snowflake_time(cursor).astimezone(self.team.timezone))
+
+    def reset_async_index(self):
+        """Forget everything indexed from the old async channel; the next check backfills the new one from midnight"""
+        self.async_index = AsyncUpdateIndex(self.team.timezone, self.bot.update_parser)
+        self.async_index.mark_connected(clock.now(self.team.timezone))
+        self.async_index_snapshot.mark_dirty()  # overwrite the saved copy too
+
+    def _async_index_data(self):
+        return self.async_index.to_dict()
+
+    async def flush_snapshots(self):
+        """Write pending snapshot changes now (on shutdown)"""
+        await self.session_snapshot.flush()
+        await self.async_index_snapshot.flush()
+
+    async def _backfill_async_updates(self, ranges, now):
+        """Fetch channel history for ranges the live index missed"""
+        channel = self.bot.get_channel(self.team.async_channel_id)
+        if not channel:
+            self.log.error("❌ Async update channel not found")
+            return
+
+        scanner = self.bot.history
         messages_matched = 0
 
         try:
-            async for message in channel.history(after=today_start, limit=100):
-                messages_checked += 1
-                msg_time = message.created_at.replace(tzinfo=pytz.UTC).astimezone(TIMEZONE)
-
-                # Debug first 3 messages
-                if messages_checked <= 3:
-                    print(f"   Message {messages_checked}: {message.author.display_name} at {msg_time.strftime('%H:%M')}")
-                    print(f"      Content preview: {message.content[:50]}...")
-
-                # Skip if after cutoff time
-                if msg_time >= cutoff_time:
-                    if messages_checked <= 3:
-                        print(f"      ⏰ After cutoff - skipped")
-                    continue
-
-                # Skip bots
-                if message.author.bot:
-                    continue
-
-                # Check if message contains "yesterday" and "today" keywords (without colons)
-                content_lower = message.content.lower()
-                if 'yesterday' in content_lower and 'today' in content_lower:
-                    if message.author.id not in async_updates:
+            for start, end in ranges:
+                self.log.debug("🔍 Backfilling async updates %s - %s", start, end)
+                async for message in scanner.scan(channel, after=start, before=end, key=self._history_key):
+                    if self.async_index.add(message):
                         messages_matched += 1
-                        async_updates[message.author.id] = {
-                            'name': message.author.display_name,
-                            'message': message.content[:200],
-                            'time': msg_time.strftime("%H:%M")
-                        }
-                        print(f"   ✅ Found async update from {message.author.display_name}")
-                elif messages_checked <= 3:
-                    print(f"      ❌ Missing yesterday/today keywords")
+                self.log.info("📊 Scanned %s, found %d async updates", scanner.last_stats, messages_matched)
 
-            print(f"📊 Scanned {messages_checked} messages, found {messages_matched} async updates")
+            self.async_index.mark_covered(ranges[0][0], now)
 
-        except Exception as e:
-            print(f"❌ Error checking highlights: {e}")
-            import traceback
-            traceback.print_exc()
+            # Index first, then cursor: a crash in between only means rescanning a few messages
+            await self.async_index_snapshot.flush()
+            scanner.save()
 
-        return async_updates
+        except Exception as e:
+            self.log.exception("❌ Error checking highlights: %s", e)
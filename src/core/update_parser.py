@@ -0,0 +1,158 @@
+import re
+
+# Section keywords per language. Longer phrases win over their prefixes.
+DEFAULT_KEYWORDS = {
+    'en': {
+        'yesterday': ['yesterday', 'yday', "y'day", 'last working day', 'previous day'],
+        'today': ['today', "today's plan", 'todays plan', 'plan for today'],
+        'blockers': ['blockers', 'blocker', 'blocked by', 'impediments'],
+    },
+    'es': {
+        'yesterday': ['ayer'],
+        'today': ['hoy'],
+        'blockers': ['bloqueos', 'bloqueantes', 'impedimentos'],
+    },
+    'pt': {
+        'yesterday': ['ontem'],
+        'today': ['hoje'],
+        'blockers': ['bloqueios', 'impedimentos'],
+    },
+    'de': {
+        'yesterday': ['gestern'],
+        'today': ['heute'],
+        'blockers': ['blocker', 'hindernisse'],
+    },
+    'fr': {
+        'yesterday': ['hier'],
+        'today': ["aujourd'hui"],
+        'blockers': ['blocages', 'bloquants'],
+    },
+    'bn': {
+        'yesterday': ['গতকাল'],
+        'today': ['আজ'],
+        'blockers': ['বাধা'],
+    },
+}
+
+SECTIONS = ('yesterday', 'today', 'blockers')
+
+_APOSTROPHES = str.maketrans({'’': "'", '‘': "'"})
+_CLAUSE_MARKS = '.,;!?\n'
+_MARKUP = r"(?:\*\*|__|\*|_)?"
+# Bullets, emoji, quote/heading markers and list numbering in front of a keyword
+_LINE_PREFIX = r"(?:(?:[^\w\s]+|\d+[.)])[ \t]*)*"
+_CONJUNCTIONS = r"(?:and|then|but|&)"
+# Punctuation left over around a section body ("Yesterday, I did X", "a,")
+_BODY_NOISE = re.compile(r"^[\s,;:]+|[\s,;]+$")
+
+
+class ParsedUpdate:
+    """Sections extracted from one message"""
+
+    __slots__ = ('yesterday', 'today', 'blockers')
+
+    def __init__(self, yesterday=None, today=None, blockers=None):
+        self.yesterday = yesterday
+        self.today = today
+        self.blockers = blockers
+
+    @property
+    def is_update(self):
+        """A day highlight needs both a yesterday and a today section with content"""
+        return bool(self.yesterday) and bool(self.today)
+
+    def to_dict(self):
+        return {'yesterday': self.yesterday, 'today': self.today, 'blockers': self.blockers}
+
+
+class UpdateParser:
+    """Single-pass Yesterday/Today/Blockers section parser.
+
+    All keywords compile into one regex, so a message is scanned once. A
+    keyword opens a section when:
+
+    - it leads a clause: the start of the message or a line (after optional
+      bullets, emoji, list numbering or markdown markers), or right after
+      ``. , ; ! ?``;
+    - it is followed by ``:`` or a dash, wherever it sits ("What I did
+      yesterday: ...", "Plan today - ..."). Words in front of it on its own
+      line are part of the label, not of the previous section;
+    - it follows "and", "then" or "but" ("... and today I will ...").
+
+    The section then runs to the next keyword. A keyword that ends a clause
+    ("Completed task A yesterday, ...") labels that clause instead. Keywords
+    inside a clause or used as a possessive don't count, so "today is
+    yesterday's rerun" is not an update.
+    """
+
+    def __init__(self, languages=('en',), extra_keywords=None):
+        self.section_of = {}
+        for language in languages:
+            for section, words in DEFAULT_KEYWORDS.get(language, {}).items():
+                for word in words:
+                    self.section_of[word.translate(_APOSTROPHES).lower()] = section
+        for section, words in (extra_keywords or {}).items():
+            if section not in SECTIONS:
+                raise ValueError(f"Unknown update section {section!r}")
+            for word in words:
+                self.section_of[word.translate(_APOSTROPHES).lower()] = section
+
+        alternation = '|'.join(re.escape(word) for word in sorted(self.section_of, key=len, reverse=True))
+        self._pattern = re.compile(
+            # Keyword leading a clause
+            rf"(?:^|(?<=[.,;!?]))[ \t]*{_LINE_PREFIX}{_MARKUP}(?P<lead>{alternation})(?![\w'])"
+            rf"{_MARKUP}(?:[ \t]*[:\-–—])?{_MARKUP}"
+            # Any other keyword; parse() keeps it when it labels, joins or ends a clause
+            rf"|(?<![\w'])(?P<conjunction>{_CONJUNCTIONS}[ \t]+)?{_MARKUP}(?P<word>{alternation})(?![\w'])"
+            rf"(?:(?P<ends_clause>(?=[ \t]*(?:[.,;!]|$)))|{_MARKUP}(?P<colon>[ \t]*[:\-–—]){_MARKUP})?",
+            re.IGNORECASE | re.MULTILINE
+        )
+
+    @classmethod
+    def from_config(cls):
+        """Parser for the languages and extra keywords set in config"""
+        from config import settings
+
+        return cls(languages=settings.update_languages, extra_keywords=settings.update_keywords)
+
+    def parse(self, content):
+        """Extract sections from a message; the first occurrence of each section wins"""
+        text = content.translate(_APOSTROPHES)
+
+        # (section, section start, body start, body end or None to run to the next section)
+        found = []
+        previous_end = 0
+        for match in self._pattern.finditer(text):
+            lead, word, conjunction, ends_clause, colon = match.group('lead', 'word', 'conjunction', 'ends_clause', 'colon')
+            if lead is not None:
+                found.append((self.section_of[lead.lower()], match.start(), match.end(), None))
+            elif colon is not None:
+                section_start = match.start()
+                # "What I will do today:" on its own line: the whole line is the label
+                line_start = text.rfind('\n', 0, section_start) + 1
+                if line_start >= previous_end:
+                    section_start = line_start
+                found.append((self.section_of[word.lower()], section_start, match.end(), None))
+            elif ends_clause is not None and text[match.start('word') - 1].isspace():
+                word_start = match.start('word')
+                clause_start = max(text.rfind(mark, previous_end, word_start) for mark in _CLAUSE_MARKS) + 1
+                clause_start = max(clause_start, previous_end)
+                found.append((self.section_of[word.lower()], clause_start, clause_start, word_start))
+            elif conjunction is not None:
+                found.append((self.section_of[word.lower()], match.start(), match.end(), None))
+            else:
+                continue  # inside a clause
+            previous_end = match.end()
+
+        sections = {}
+        for i, (section, _, body_start, body_end) in enumerate(found):
+            if section in sections:
+                continue
+            if body_end is None:
+                body_end = found[i + 1][1] if i + 1 < len(found) else len(text)
+            body = _BODY_NOISE.sub('', content[body_start:body_end])
+            sections[section] = body or None
+        return ParsedUpdate(**sections)
+
+    def is_update(self, content):
+        return self.parse(content).is_update
@@ -1,54 +1,68 @@
 import discord
-import json
-import os
-from datetime import datetime
-from config import TIMEZONE, REPORT_CHANNEL_ID, TEAM_MEMBER_IDS, STANDUP_START_HOUR, STANDUP_START_MINUTE, STANDUP_END_HOUR, STANDUP_END_MINUTE
+import logging
+import time
+from datetime import timedelta
+from src.core import clock, finalize, metrics
 from src.core.email_service import EmailService
+from src.core.tracing import tracer
 
+log = logging.getLogger(__name__)
 
-async def start_standup(bot):
-    """Start the standup session"""
-    print("\n" + "="*50)
-    print("🎯 STARTING DAILY STANDUP")
-    print("="*50)
 
-    bot.tracker.start_time = datetime.now(TIMEZONE)
-    bot.tracker.attendance.clear()
+def last_n_days(team, days):
+    """ISO start and end dates covering the last N calendar days (including today) for a team"""
+    today = clock.now(team.timezone).date()
+    return (today - timedelta(days=max(days, 1) - 1)).isoformat(), today.isoformat()
+
+
+async def start_standup(bot, team):
+    """Start the standup session for a team"""
+    with tracer.span('start_standup', team=team.id):
+        await _start_standup(bot, team)
+
+
+async def _start_standup(bot, team):
+    tracker = team.tracker
+    log.info("🎯 STARTING DAILY STANDUP - %s", team.name)
+
+    # Start recording voice presence (seeds everyone already in the channel)
+    start_time = clock.now(team.timezone)
+    with tracer.span('start_standup.begin_session'):
+        tracker.begin_session(start_time, team.session_end(start_time))
 
     # Join voice channel
-    await bot.tracker.join_standup_channel()
+    with tracer.span('start_standup.join_standup_channel'):
+        await tracker.join_standup_channel()
 
     # Check async updates
-    bot.tracker.async_updates_today = await bot.tracker.check_day_highlights()
-
-    # Initial attendance check
-    await bot.tracker.track_attendance()
+    with tracer.span('start_standup.check_day_highlights'):
+        tracker.async_updates_today = await tracker.check_day_highlights()
+    with tracer.span('start_standup.save_session'):
+        await tracker.save_session()
 
     # Calculate duration from config
-    start_minutes = STANDUP_START_HOUR * 60 + STANDUP_START_MINUTE
-    end_minutes = STANDUP_END_HOUR * 60 + STANDUP_END_MINUTE
-    duration_minutes = end_minutes - start_minutes
-    
+    duration_minutes = team.duration_minutes
+
     # Send start notification
-    report_channel = bot.get_channel(REPORT_CHANNEL_ID)
+    report_channel = bot.get_channel(team.report_channel_id)
     if report_channel:
         embed = discord.Embed(
             title="🎯 Daily Standup Started",
-            description=f"**Time:** {bot.tracker.start_time.strftime('%I:%M %p')}\n"
+            description=f"**Time:** {tracker.start_time.strftime('%I:%M %p')}\n"
                        f"**Duration:** {duration_minutes} minutes\n"
                        f"**Status:** Tracking attendance...",
             color=discord.Color.green(),
-            timestamp=bot.tracker.start_time
+            timestamp=tracker.start_time
         )
 
         # Add async updates preview
-        if bot.tracker.async_updates_today:
+        if tracker.async_updates_today:
             async_list = []
-            for user_id, data in list(bot.tracker.async_updates_today.items())[:5]:
+            for user_id, data in list(tracker.async_updates_today.items())[:5]:
                 async_list.append(f"✅ **{data['name']}** at {data['time']}")
 
             embed.add_field(
-                name=f"📝 Day Highlights Received ({len(bot.tracker.async_updates_today)})",
+                name=f"📝 Day Highlights Received ({len(tracker.async_updates_today)})",
                 value="\n".join(async_list) or "None yet",
                 inline=False
             )
@@ -59,42 +73,71 @@ async def start_standup(bot):
                 inline=False
             )
 
-        embed.set_footer(text="Standup Bot | Asia/Dhaka")
-        await report_channel.send(embed=embed)
+        embed.set_footer(text=f"Standup Bot | {team.name} | {team.timezone.zone}")
+        with tracer.span('start_standup.send_notification'):
+            await bot.outbound.send(report_channel, embed=embed)
 
 
-async def end_standup(bot):
+async def end_standup(bot, team):
     """End the standup session and generate report"""
-    print("\n" + "="*50)
-    print("🏁 ENDING DAILY STANDUP")
-    print("="*50)
-
-    bot.tracker.end_time = datetime.now(TIMEZONE)
-
-    # Final attendance check
-    await bot.tracker.track_attendance()
-
-    # Leave voice channel
-    await bot.tracker.leave_standup_channel()
-
-    # Generate and send report
-    await generate_attendance_report(bot)
+    tracker = team.tracker
+
+    # force_end_standup can overlap the scheduled end; only one of them may finalize
+    async with team.finalize_lock:
+        if not tracker.in_session:
+            log.info("ℹ️ Standup for %s already ended", team.name)
+            return
+
+        with tracer.span('end_standup', team=team.id):
+            await _end_standup(bot, team)
+
+
+async def _end_standup(bot, team):
+    tracker = team.tracker
+    log.info("🏁 ENDING DAILY STANDUP - %s", team.name)
+
+    # Close every open voice interval at the end time
+    ended = time.perf_counter()
+    with tracer.span('end_standup.end_session'):
+        tracker.end_session(clock.now(team.timezone))
+
+    # Pick up updates edited or deleted since the start (edit/delete events keep the index current)
+    with tracer.span('end_standup.refresh_day_highlights'):
+        tracker.refresh_day_highlights()
+
+    # Save the record before any network call, so a hung Discord or email call can't delay or lose it
+    sinks = finalize.default_sinks(bot, team)
+    try:
+        with tracer.span('end_standup.save_attendance_record', attendees=len(tracker.attendance)):
+            record = await save_attendance_record(bot, team)
+        metrics.RECORD_DURABLE_SECONDS.observe(time.perf_counter() - ended)
+    except Exception:
+        # Still leave voice and post the report; the kept snapshot finalizes (and saves) again on restart
+        log.exception("❌ Failed to save %s attendance record; keeping the session snapshot for retry", team.name)
+        record = attendance_record(team)
+        await finalize.fan_out(record, [sink for sink in sinks if sink.kind in ('voice', 'report')])
+        return
 
-    # Send email summary
-    await send_email_summary(bot)
+    # Leave voice, post the report, queue the email and feed any extra sinks, all at once
+    await finalize.fan_out(record, sinks)
 
-    # Save records
-    await save_attendance_record(bot)
+    # The snapshot goes last: a crash mid fan-out finalizes again on restart (saving is idempotent)
+    with tracer.span('end_standup.clear_session'):
+        await tracker.clear_session()
 
 
-async def generate_attendance_report(bot):
+async def generate_attendance_report(bot, team):
     """Generate comprehensive attendance report"""
-    report_channel = bot.get_channel(REPORT_CHANNEL_ID)
+    tracker = team.tracker
+    report_channel = bot.get_channel(team.report_channel_id)
     if not report_channel:
         return
 
     guild = report_channel.guild
-    duration = (bot.tracker.end_time - bot.tracker.start_time).total_seconds() / 60
+    duration = (tracker.end_time - tracker.start_time).total_seconds() / 60
+
+    # Attendees who already left and roster members may not be cached (lean member cache)
+    await bot.member_cache.resolve(guild, tracker.attendance | set(team.member_ids))
 
     # Categorize members
     voice_attendees = []
@@ -102,21 +145,21 @@ async def generate_attendance_report(bot):
     no_participation = []
 
     # Get voice attendees
-    for member_id in bot.tracker.attendance:
+    for member_id in tracker.attendance:
         member = guild.get_member(member_id)
         if member:
             voice_attendees.append(member.display_name)
 
     # Get async-only participants
-    for member_id, data in bot.tracker.async_updates_today.items():
-        if member_id not in bot.tracker.attendance:
+    for member_id, data in tracker.async_updates_today.items():
+        if member_id not in tracker.attendance:
             async_only.append(data['name'])
 
     # Check for team members with no participation (if configured)
-    if TEAM_MEMBER_IDS:
-        for member_id in TEAM_MEMBER_IDS:
-            if (member_id not in bot.tracker.attendance and
-                member_id not in bot.tracker.async_updates_today):
+    if team.member_ids:
+        for member_id in team.member_ids:
+            if (member_id not in tracker.attendance and
+                member_id not in tracker.async_updates_today):
                 member = guild.get_member(member_id)
                 if member:
                     no_participation.append(member.display_name)
@@ -124,11 +167,11 @@ async def generate_attendance_report(bot):
     # Create report embed
     embed = discord.Embed(
         title="📊 Daily Standup Report",
-        description=f"**Date:** {bot.tracker.end_time.strftime('%B %d, %Y')}\n"
+        description=f"**Date:** {tracker.end_time.strftime('%B %d, %Y')}\n"
                    f"**Duration:** {duration:.0f} minutes\n"
                    f"**Total Participation:** {len(voice_attendees) + len(async_only)}",
         color=discord.Color.blue(),
-        timestamp=bot.tracker.end_time
+        timestamp=tracker.end_time
     )
 
     # Add attendance fields
@@ -154,14 +197,14 @@ async def generate_attendance_report(bot):
         )
 
     # Add summary
-    total_team = len(TEAM_MEMBER_IDS) if TEAM_MEMBER_IDS else len(voice_attendees) + len(async_only)
+    total_team = len(team.member_ids) if team.member_ids else len(voice_attendees) + len(async_only)
     participation_rate = ((len(voice_attendees) + len(async_only)) / total_team * 100) if total_team > 0 else 0
 
     embed.add_field(
         name="📈 Statistics",
         value=f"**Participation Rate:** {participation_rate:.1f}%\n"
               f"**Voice Attendees:** {len(voice_attendees)}\n"
-              f"**Async Updates:** {len(bot.tracker.async_updates_today)}\n"
+              f"**Async Updates:** {len(tracker.async_updates_today)}\n"
               f"**No Shows:** {len(no_participation)}",
         inline=False
     )
@@ -177,61 +220,108 @@ async def generate_attendance_report(bot):
         embed.color = discord.Color.red()
         status = "🔴 Needs Improvement"
 
-    embed.set_footer(text=f"Status: {status} | Standup Bot")
+    embed.set_footer(text=f"Status: {status} | {team.name} | Standup Bot")
 
-    await report_channel.send(embed=embed)
+    await bot.outbound.send(report_channel, embed=embed)
 
 
-async def save_attendance_record(bot):
-    """Save attendance data for historical tracking"""
-    today = datetime.now(TIMEZONE).strftime("%Y-%m-%d")
+def attendance_record(team):
+    """The day's attendance record for the team's session, as saved by save_attendance_record"""
+    tracker = team.tracker
+    # Filed under the day the session started: a restored session may be finalized the next day
+    session_day = (tracker.start_time or clock.now(team.timezone)).astimezone(team.timezone)
+    durations = tracker.presence_durations()
+    late_joins = tracker.late_joins()
 
     record = {
-        'date': today,
-        'day': datetime.now(TIMEZONE).strftime("%A"),
-        'start_time': bot.tracker.start_time.isoformat() if bot.tracker.start_time else None,
-        'end_time': bot.tracker.end_time.isoformat() if bot.tracker.end_time else None,
-        'voice_attendance': list(bot.tracker.attendance),
-        'voice_count': len(bot.tracker.attendance),
+        'team': team.id,
+        'date': session_day.strftime("%Y-%m-%d"),
+        'day': session_day.strftime("%A"),
+        'start_time': tracker.start_time.isoformat() if tracker.start_time else None,
+        'end_time': tracker.end_time.isoformat() if tracker.end_time else None,
+        'voice_attendance': list(tracker.attendance),
+        'voice_count': len(tracker.attendance),
+        'voice_durations': {str(k): v for k, v in durations.items()},
+        'late_joins': {str(k): v for k, v in late_joins.items()},
         'async_updates': {
-            str(k): v for k, v in bot.tracker.async_updates_today.items()
+            str(k): v for k, v in tracker.async_updates_today.items()
         },
-        'async_count': len(bot.tracker.async_updates_today),
-        'total_participation': len(bot.tracker.attendance) + len([
-            uid for uid in bot.tracker.async_updates_today
-            if uid not in bot.tracker.attendance
+        'async_count': len(tracker.async_updates_today),
+        'total_participation': len(tracker.attendance) + len([
+            uid for uid in tracker.async_updates_today
+            if uid not in tracker.attendance
         ])
     }
+    return record
 
-    # Create data directory if it doesn't exist
-    os.makedirs('data', exist_ok=True)
 
-    filename = f'data/attendance_{datetime.now(TIMEZONE).strftime("%Y_%m")}.json'
+async def save_attendance_record(bot, team):
+    """Save attendance data for historical tracking; returns the saved record"""
+    record = attendance_record(team)
 
-    # Load existing records
-    if os.path.exists(filename):
-        with open(filename, 'r') as f:
-            records = json.load(f)
-    else:
-        records = []
+    # Durable O(1) append; the monthly snapshot is rebuilt by background compaction
+    with metrics.STORAGE_WRITE_SECONDS.time('journal'):
+        bot.journal.append(record)
+
+    # Index the record for stats queries
+    with metrics.STORAGE_WRITE_SECONDS.time('sqlite'):
+        bot.store.save_record(record)
+    bot.analytics.record_saved(record)
 
-    records.append(record)
+    bot.journal.schedule_compaction()
+    log.info("💾 Attendance saved to %s", bot.journal.path)
+    return record
 
-    # Save updated records
-    with open(filename, 'w') as f:
-        json.dump(records, f, indent=2)
 
-    print(f"💾 Attendance saved to {filename}")
+async def send_email_summary(bot, team):
+    """Queue the email with dev team updates only (never waits on delivery)"""
+    log.info("📧 Queueing dev team updates email for %s...", team.name)
 
+    email_service = EmailService(team)
+    success = email_service.queue_async_updates_email(bot.outbox)
 
-async def send_email_summary(bot):
-    """Send email with dev team updates only"""
-    print("\n📧 Sending dev team updates email...")
-    
-    email_service = EmailService()
-    success = await email_service.send_async_updates_email(bot)
-    
     if success:
-        print("✅ Dev team updates email sent successfully!")
+        log.info("✅ Dev team updates email queued (%d pending)", bot.outbox.depth())
     else:
-        print("⚠️ Dev team updates email failed or was skipped")
+        log.warning("⚠️ Dev team updates email skipped")
+
+
+def build_member_stats_embed(name, stats, days):
+    """Embed for one member's participation analytics"""
+    embed = discord.Embed(
+        title=f"👤 {name} - Last {days} days",
+        description=f"**Standups Held:** {stats['standups']}",
+        color=discord.Color.blue()
+    )
+    embed.add_field(
+        name="Participation",
+        value=f"**Rate:** {stats['participation_rate']:.1f}% ({stats['participated']}/{stats['standups']})\n"
+              f"**Voice:** {stats['voice']}\n"
+              f"**Async Only:** {stats['async_only']}",
+        inline=True
+    )
+    lateness = stats['avg_lateness']
+    embed.add_field(
+        name="Habits",
+        value=f"**Current Streak:** {stats['current_streak']}\n"
+              f"**Longest Streak:** {stats['longest_streak']}\n"
+              f"**Avg. Join Lateness:** {f'{lateness / 60:.1f} min' if lateness is not None else 'n/a'}",
+        inline=True
+    )
+    return embed
+
+
+def build_leaderboard_embed(guild, ranked, days):
+    """Embed ranking members by participation rate"""
+    lines = []
+    for position, (member_id, stats) in enumerate(ranked, 1):
+        member = guild.get_member(member_id) if guild else None
+        name = member.display_name if member else str(member_id)
+        lines.append(f"**{position}.** {name} - {stats['participation_rate']:.0f}% "
+                     f"(🔥 {stats['current_streak']})")
+
+    return discord.Embed(
+        title=f"🏆 Team Leaderboard - Last {days} days",
+        description="\n".join(lines) or "No participation recorded yet.",
+        color=discord.Color.gold()
+    )
@@ -1,16 +1,24 @@
 import discord
-from config import DISCORD_TOKEN
+import logging
+from config import settings
 from src.core.bot import StandupBot
-from src.core.tracker import StandupTracker
-from src.core.tasks import create_tasks
+from src.core.startup import boot
+from src.core.logs import setup_logging, shutdown_logging
 from src.commands.prefix_commands import register_commands
 from src.commands.slash_commands import register_slash_commands
 
+log = logging.getLogger(__name__)
+
 
 def main():
     """Initialize and run the bot"""
-    if not DISCORD_TOKEN:
-        print("❌ ERROR: Discord token not found in .env file!")
+    # Everything (including discord.py) logs through a queue drained off the event loop
+    setup_logging()
+    settings.warn_missing()
+
+    if not settings.discord_token:
+        log.critical("❌ ERROR: Discord token not found in .env file!")
+        shutdown_logging()
         exit(1)
 
     # Initialize bot
@@ -20,21 +28,19 @@ def main():
     register_commands(bot)
     register_slash_commands(bot)
 
-    # Initialize tracker
-    bot.tracker = StandupTracker(bot)
-
-    # Create and assign tasks bound to bot
-    minute_checker, standup_scheduler = create_tasks(bot)
-    bot.minute_checker = minute_checker
-    bot.standup_scheduler = standup_scheduler
+    # Storage recovery, teams and trackers, then the schedule
+    boot(bot)
 
     # Run the bot
     try:
-        bot.run(DISCORD_TOKEN)
+        # log_handler=None: discord.py logs through the root queue handler instead of its own
+        bot.run(settings.discord_token, log_handler=None)
     except discord.LoginFailure:
-        print("❌ ERROR: Invalid Discord token!")
+        log.critical("❌ ERROR: Invalid Discord token!")
     except Exception as e:
-        print(f"❌ ERROR: {e}")
+        log.exception("❌ ERROR: %s", e)
+    finally:
+        shutdown_logging()
 
 
 if __name__ == "__main__":